@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from databases.database import Base
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+
+    name = Column(String, primary_key=True)  # e.g. "overdue_sweeper"
+    holder = Column(String, nullable=True)  # host:pid:nonce of the worker holding the lease
+    lease_expires_at = Column(DateTime, nullable=True)
+    leader_since = Column(DateTime, nullable=True)
+    stopped_at = Column(DateTime, nullable=True)  # when the last leader released the lease
+    last_run_started_at = Column(DateTime, nullable=True)
+    last_run_finished_at = Column(DateTime, nullable=True)
+    last_run_count = Column(Integer, nullable=True)  # rows the last run changed
+    last_error = Column(Text, nullable=True)
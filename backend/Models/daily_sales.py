@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Float, Date
+from databases.database import Base
+
+class DailySales(Base):
+    """Per-day revenue rollup, kept current by Views/daily_sales.py"""
+    __tablename__ = "daily_sales"
+
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)  # orders placed that day, not cancelled
+    gross_amount = Column(Float, nullable=False, default=0)  # their total_amount
+    tax = Column(Float, nullable=False, default=0)  # invoices issued that day
+    discount = Column(Float, nullable=False, default=0)
+    paid_amount = Column(Float, nullable=False, default=0)  # total_amount of invoices paid that day
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from databases.database import Base
 from sqlalchemy.sql import func
@@ -17,7 +17,7 @@ class Invoice(Base):
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String, unique=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), unique=True)
-    user_id = Column(Integer, ForeignKey("users.id"))  # User who generated
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)  # User who generated
     amount = Column(Float)  # Subtotal before tax
     tax = Column(Float, default=0)
     discount = Column(Float, default=0)
@@ -28,9 +28,22 @@ class Invoice(Base):
     due_date = Column(DateTime(timezone=True), nullable=True)
     issued_date = Column(DateTime(timezone=True), server_default=func.now())
     paid_date = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Define relationships (using string references to avoid circular imports)
     order = relationship("Order", back_populates="invoice")
-    user = relationship("User", back_populates="invoices")
\ No newline at end of file
+    user = relationship("User", back_populates="invoices")
+
+    __table_args__ = (
+        # Serves the overdue lookups: status filter plus due_date range
+        Index("ix_invoices_status_due_date", "status", "due_date"),
+    )
+
+
+class InvoiceSequence(Base):
+    """Next unreserved invoice number per year (see Views/invoice_numbers.py)"""
+    __tablename__ = "invoice_sequences"
+
+    year = Column(Integer, primary_key=True)
+    next_value = Column(Integer, nullable=False)
@@ -13,9 +13,9 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
     total_amount = Column(Float, default=0)
-    order_date = Column(DateTime(timezone=True), server_default=func.now())
+    order_date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING)
     
     # Define relationships
@@ -27,8 +27,8 @@ class OrderMedicine(Base):
     __tablename__ = "order_medicines"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    medicine_id = Column(Integer, ForeignKey("medicines.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), index=True)
     quantity = Column(Integer, default=1)
     unit_price = Column(Float)
     
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Query
+
+from databases import slow_queries
+from Views.overdue_sweeper import sweeper_status
+from Views.render_cache import render_cache
+
+router = APIRouter()
+
+#Gives the slowest statement shapes seen since startup (or the last reset)
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|count)$"),
+):
+    return {
+        "threshold_ms": slow_queries.SLOW_QUERY_MS,
+        "queries": slow_queries.worst_shapes(limit=limit, order_by=order_by),
+    }
+
+#Clears the slow-query statistics
+@router.delete("/slow-queries")
+def reset_slow_queries():
+    slow_queries.reset()
+    return {"detail": "Slow query statistics cleared"}
+
+#Gives the invoice render cache size and hit rates
+@router.get("/render-cache")
+def get_render_cache_stats():
+    return render_cache.stats()
+
+#Empties the invoice render cache and resets its counters
+@router.delete("/render-cache")
+def reset_render_cache():
+    render_cache.clear()
+    render_cache.reset_stats()
+    return {"detail": "Render cache cleared"}
+
+#Gives the overdue sweeper's leader, lease and last run times
+@router.get("/overdue-sweeper")
+def get_overdue_sweeper_status():
+    return sweeper_status()
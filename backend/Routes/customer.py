@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from databases.database import get_db
+from databases.database import get_db, get_read_db
+from databases.pagination import PageParams, approximate_total, set_page_headers
 
-from Models.customer import Customer
+from Models.customer import Customer as CustomerModel
 from Schemas.customer import CustomerCreate, CustomerUpdate, Customer, CustomerWithOrders
 
 router = APIRouter()
 
 from Views.customer import (
-    fetch_all_customers,
+    fetch_customers_page,
     fetch_customer_by_id,
     fetch_customer_with_orders,
     create_customer,
@@ -18,17 +19,20 @@ from Views.customer import (
 
 #Gives all customers
 @router.get("", response_model=list[Customer])
-def get_all_customers(db: Session = Depends(get_db)):
-    return fetch_all_customers(db)
+def get_all_customers(request: Request, response: Response, page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    customers, next_cursor = fetch_customers_page(db, page.limit, page.after)
+    total = approximate_total(db, CustomerModel) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return customers
 
 #Gives customer by id
 @router.get("/{customer_id}", response_model=Customer)
-def get_customer_by_id(customer_id: int, db: Session = Depends(get_db)):
+def get_customer_by_id(customer_id: int, db: Session = Depends(get_read_db)):
     return fetch_customer_by_id(db, customer_id)
 
 #Gives customer with orders by id
 @router.get("/{customer_id}/orders", response_model=CustomerWithOrders)
-def get_customer_with_orders(customer_id: int, db: Session = Depends(get_db)):
+def get_customer_with_orders(customer_id: int, db: Session = Depends(get_read_db)):
     return fetch_customer_with_orders(db, customer_id)
 
 #Creates a new customer
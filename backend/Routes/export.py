@@ -0,0 +1,29 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from Views.export import EXPORT_FORMATS, build_export, stream_export
+
+router = APIRouter()
+
+#Streams invoices (one row per line), orders or stock as CSV or NDJSON
+@router.get("/{resource}")
+def export_resource(
+    resource: str,
+    format: Literal["csv", "ndjson"] = "csv",
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status: Optional[str] = Query(None, description="Comma-separated statuses"),
+):
+    spec, stmt = build_export(resource, date_from, date_to, status)
+
+    filename = resource
+    if date_from or date_to:
+        filename += f"_{date_from or ''}_{date_to or ''}"
+    return StreamingResponse(
+        stream_export(spec, stmt, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
@@ -1,40 +1,97 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse
+from datetime import date
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from databases.database import get_db
+from databases.database import get_db, get_read_db, get_async_db, USE_ASYNC_DB
+from databases.pagination import PageParams, approximate_total, approximate_total_async, set_page_headers
 
 from Models.invoice import Invoice
-from Schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceOut, InvoiceWithDetails, InvoicePrintData
+from Schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceOut, InvoiceWithDetails, InvoicePrintData, InvoicePrintBatch, InvoiceStats
 from Views.invoice import (
     fetch_invoice_by_id,
     fetch_invoice_by_order_id,
-    fetch_all_invoices,
+    fetch_invoices_page,
     create_invoice,
     update_invoice,
     delete_invoice,
     fetch_invoice_with_details,
+    fetch_invoices_for_print,
     mark_invoice_as_paid,
     get_overdue_invoices,
-    update_overdue_invoices,
+    fetch_invoices_page_async,
+    fetch_invoice_with_details_async,
+    get_overdue_invoices_async,
+    create_invoice_async,
+    mark_invoice_as_paid_async,
 )
+from Views.idempotency import run_idempotent, run_idempotent_async
+from Views.invoice_pdf import invoice_pdf
+from Views.invoice_stats import fetch_invoice_stats, fetch_invoice_stats_async
+from Views.invoice_render import render_invoice_batch, render_invoice_html, stream_invoice_zip
+from Views.render_cache import cached_render, etag_matches, etag_response
 
 router = APIRouter()
 
-@router.get("", response_model=List[InvoiceOut])
-def get_all_invoices(db: Session = Depends(get_db)) -> List[InvoiceOut]:
-    """Get all invoices"""
-    return fetch_all_invoices(db)
+def get_all_invoices(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+) -> List[InvoiceOut]:
+    """Get invoices, newest first, one cursor page at a time"""
+    invoices, next_cursor = fetch_invoices_page(db, page.limit, page.after)
+    total = approximate_total(db, Invoice) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return invoices
 
-@router.get("/overdue", response_model=List[InvoiceOut])
-def get_overdue_invoices_route(db: Session = Depends(get_db)) -> List[InvoiceOut]:
-    """Get all overdue invoices"""
-    # Update overdue statuses first
-    update_overdue_invoices(db)
+async def get_all_invoices_async(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[InvoiceOut]:
+    """Get invoices, newest first, one cursor page at a time"""
+    invoices, next_cursor = await fetch_invoices_page_async(db, page.limit, page.after)
+    total = await approximate_total_async(db, Invoice) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return invoices
+
+router.get("", response_model=List[InvoiceOut])(get_all_invoices_async if USE_ASYNC_DB else get_all_invoices)
+
+def get_overdue_invoices_route(db: Session = Depends(get_read_db)) -> List[InvoiceOut]:
+    """Get all overdue invoices (statuses are kept current by the overdue sweeper)"""
     return get_overdue_invoices(db)
 
+async def get_overdue_invoices_route_async(db: AsyncSession = Depends(get_async_db)) -> List[InvoiceOut]:
+    """Get all overdue invoices (statuses are kept current by the overdue sweeper)"""
+    return await get_overdue_invoices_async(db)
+
+router.get("/overdue", response_model=List[InvoiceOut])(
+    get_overdue_invoices_route_async if USE_ASYNC_DB else get_overdue_invoices_route
+)
+
+def get_invoice_stats(
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+) -> InvoiceStats:
+    """Invoice counts and amounts per status, optionally for invoices created in a date range"""
+    return fetch_invoice_stats(db, created_from, created_to)
+
+async def get_invoice_stats_async(
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> InvoiceStats:
+    """Invoice counts and amounts per status, optionally for invoices created in a date range"""
+    return await fetch_invoice_stats_async(db, created_from, created_to)
+
+router.get("/stats", response_model=InvoiceStats)(get_invoice_stats_async if USE_ASYNC_DB else get_invoice_stats)
+
 @router.get("/{invoice_id}", response_model=InvoiceOut)
-def get_invoice_by_id(invoice_id: int, db: Session = Depends(get_db)) -> InvoiceOut:
+def get_invoice_by_id(invoice_id: int, db: Session = Depends(get_read_db)) -> InvoiceOut:
     """Get invoice by ID"""
     invoice = fetch_invoice_by_id(db, invoice_id)
     if not invoice:
@@ -42,356 +99,160 @@ def get_invoice_by_id(invoice_id: int, db: Session = Depends(get_db)) -> Invoice
     return invoice
 
 @router.get("/order/{order_id}", response_model=InvoiceOut)
-def get_invoice_by_order_id(order_id: int, db: Session = Depends(get_db)) -> InvoiceOut:
+def get_invoice_by_order_id(order_id: int, db: Session = Depends(get_read_db)) -> InvoiceOut:
     """Get invoice by order ID"""
     invoice = fetch_invoice_by_order_id(db, order_id)
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
     return invoice
 
-@router.get("/{invoice_id}/details", response_model=InvoiceWithDetails)
-def get_invoice_details(invoice_id: int, db: Session = Depends(get_db)) -> InvoiceWithDetails:
+def get_invoice_details(invoice_id: int, db: Session = Depends(get_read_db)) -> InvoiceWithDetails:
     """Get detailed invoice information including customer and order details"""
     invoice = fetch_invoice_with_details(db, invoice_id)
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
     return invoice
 
+async def get_invoice_details_async(invoice_id: int, db: AsyncSession = Depends(get_async_db)) -> InvoiceWithDetails:
+    """Get detailed invoice information including customer and order details"""
+    invoice = await fetch_invoice_with_details_async(db, invoice_id)
+    if not invoice:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
+    return invoice
+
+router.get("/{invoice_id}/details", response_model=InvoiceWithDetails)(
+    get_invoice_details_async if USE_ASYNC_DB else get_invoice_details
+)
+
 @router.get("/{invoice_id}/print-data", response_model=InvoicePrintData)
-def get_invoice_print_data(invoice_id: int, db: Session = Depends(get_db)) -> InvoicePrintData:
+def get_invoice_print_data(invoice_id: int, request: Request, db: Session = Depends(get_read_db)) -> Response:
     """Get invoice data formatted for printing"""
-    invoice_details = fetch_invoice_with_details(db, invoice_id)
-    if not invoice_details:
+    def render() -> Optional[bytes]:
+        invoice_details = fetch_invoice_with_details(db, invoice_id)
+        if not invoice_details:
+            return None
+        return InvoicePrintData(invoice=invoice_details).model_dump_json().encode()
+
+    entry = cached_render(db, "print-data", invoice_id, render)
+    if entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
-    
-    return InvoicePrintData(invoice=invoice_details)
+    return etag_response(request, "print-data", entry, "application/json")
 
 @router.get("/{invoice_id}/print", response_class=HTMLResponse)
-def get_invoice_html(invoice_id: int, db: Session = Depends(get_db)) -> str:
+def get_invoice_html(invoice_id: int, request: Request, db: Session = Depends(get_read_db)) -> Response:
     """Get invoice as HTML for printing"""
-    invoice_details = fetch_invoice_with_details(db, invoice_id)
-    if not invoice_details:
+    # Absolute, because the frontend writes this HTML into a blank window
+    static_url = str(request.url_for("static", path=""))
+
+    def render() -> Optional[bytes]:
+        invoice_details = fetch_invoice_with_details(db, invoice_id)
+        if not invoice_details:
+            return None
+        return render_invoice_html(invoice_details, static_url).encode()
+
+    entry = cached_render(db, "print", invoice_id, render, variant=static_url)
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
+    return etag_response(request, "print", entry, "text/html; charset=utf-8")
+
+@router.get("/{invoice_id}/pdf", response_class=FileResponse, responses={200: {"content": {"application/pdf": {}}}})
+async def get_invoice_pdf(invoice_id: int, request: Request, db: Session = Depends(get_read_db)) -> Response:
+    """Get invoice as a PDF document"""
+    pdf = await invoice_pdf(db, invoice_id)
+    if pdf is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
-    
-    # Generate HTML invoice
-    html_content = generate_invoice_html(invoice_details)
-    return html_content
 
-@router.post("", response_model=InvoiceOut)
-def create_new_invoice(invoice: InvoiceCreate, db: Session = Depends(get_db), user_id: int = 1) -> InvoiceOut:
+    headers = {"ETag": pdf.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), pdf.etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(pdf.path, media_type="application/pdf", filename=pdf.filename,
+                        content_disposition_type="inline", headers=headers)
+
+@router.post("/print-batch", response_class=HTMLResponse)
+def print_invoice_batch(batch: InvoicePrintBatch, request: Request, db: Session = Depends(get_read_db)) -> StreamingResponse:
+    """Render many invoices as one printable HTML document, or as a zip of one file each"""
+    invoices = fetch_invoices_for_print(db, batch)
+    headers = {"X-Total-Count": str(len(invoices))}
+    if batch.format == "zip":
+        headers["Content-Disposition"] = 'attachment; filename="invoices.zip"'
+        return StreamingResponse(stream_invoice_zip(invoices), media_type="application/zip", headers=headers)
+
+    static_url = str(request.url_for("static", path=""))
+    return StreamingResponse(
+        render_invoice_batch(invoices, static_url),
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
+
+def _invoice_body(invoice: Invoice) -> dict:
+    return InvoiceOut.model_validate(invoice).model_dump(mode="json")
+
+def create_new_invoice(
+    invoice: InvoiceCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    user_id: int = 1,
+    idempotency_key: Optional[str] = Header(None),
+) -> InvoiceOut:
+    """Create a new invoice"""
+    return run_idempotent(
+        idempotency_key, "POST /invoices", {"invoice": invoice.model_dump(mode="json"), "user_id": user_id},
+        lambda: _invoice_body(create_invoice(db, invoice, user_id, commit=False)), response, db,
+    )
+
+async def create_new_invoice_async(
+    invoice: InvoiceCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = 1,
+    idempotency_key: Optional[str] = Header(None),
+) -> InvoiceOut:
     """Create a new invoice"""
-    return create_invoice(db, invoice, user_id)
+    async def handler():
+        return _invoice_body(await create_invoice_async(db, invoice, user_id, commit=False))
+
+    return await run_idempotent_async(
+        idempotency_key, "POST /invoices", {"invoice": invoice.model_dump(mode="json"), "user_id": user_id},
+        handler, response, db,
+    )
+
+router.post("", response_model=InvoiceOut)(create_new_invoice_async if USE_ASYNC_DB else create_new_invoice)
 
 @router.put("/{invoice_id}", response_model=InvoiceOut)
 def update_existing_invoice(invoice_id: int, invoice: InvoiceUpdate, db: Session = Depends(get_db)) -> InvoiceOut:
     """Update an existing invoice"""
     return update_invoice(db, invoice_id, invoice)
 
-@router.post("/{invoice_id}/mark-paid", response_model=InvoiceOut)
-def mark_as_paid(invoice_id: int, db: Session = Depends(get_db)) -> InvoiceOut:
+def mark_as_paid(
+    invoice_id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+) -> InvoiceOut:
+    """Mark an invoice as paid"""
+    return run_idempotent(
+        idempotency_key, f"POST /invoices/{invoice_id}/mark-paid", None,
+        lambda: _invoice_body(mark_invoice_as_paid(db, invoice_id, commit=False)), response, db,
+    )
+
+async def mark_as_paid_async(
+    invoice_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None),
+) -> InvoiceOut:
     """Mark an invoice as paid"""
-    return mark_invoice_as_paid(db, invoice_id)
+    async def handler():
+        return _invoice_body(await mark_invoice_as_paid_async(db, invoice_id, commit=False))
+
+    return await run_idempotent_async(
+        idempotency_key, f"POST /invoices/{invoice_id}/mark-paid", None, handler, response, db,
+    )
+
+router.post("/{invoice_id}/mark-paid", response_model=InvoiceOut)(mark_as_paid_async if USE_ASYNC_DB else mark_as_paid)
 
 @router.delete("/{invoice_id}")
 def delete_existing_invoice(invoice_id: int, db: Session = Depends(get_db)) -> dict:
     """Delete an invoice"""
     result = delete_invoice(db, invoice_id)
     return result
-
-def generate_invoice_html(invoice: InvoiceWithDetails) -> str:
-    """Generate HTML content for invoice printing"""
-    
-    # Calculate subtotal
-    subtotal = sum(item.total_price for item in invoice.order_medicines)
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Invoice #{invoice.invoice_number}</title>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                margin: 0;
-                padding: 20px;
-                color: #333;
-                line-height: 1.6;
-            }}
-            .invoice-container {{
-                max-width: 800px;
-                margin: 0 auto;
-                background: white;
-                padding: 30px;
-                border-radius: 8px;
-                box-shadow: 0 0 10px rgba(0,0,0,0.1);
-            }}
-            .header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: flex-start;
-                margin-bottom: 30px;
-                padding-bottom: 20px;
-                border-bottom: 2px solid #2563eb;
-            }}
-            .company-info h1 {{
-                color: #2563eb;
-                margin: 0;
-                font-size: 28px;
-            }}
-            .company-info p {{
-                margin: 5px 0;
-                color: #666;
-            }}
-            .invoice-title {{
-                text-align: right;
-            }}
-            .invoice-title h2 {{
-                color: #2563eb;
-                margin: 0;
-                font-size: 24px;
-            }}
-            .invoice-details {{
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 30px;
-                margin-bottom: 30px;
-            }}
-            .section h3 {{
-                color: #2563eb;
-                margin-bottom: 10px;
-                font-size: 16px;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }}
-            .info-table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-bottom: 30px;
-            }}
-            .info-table th,
-            .info-table td {{
-                padding: 12px;
-                text-align: left;
-                border-bottom: 1px solid #e5e7eb;
-            }}
-            .info-table th {{
-                background-color: #f8fafc;
-                font-weight: 600;
-                color: #374151;
-            }}
-            .amount-column {{
-                text-align: right !important;
-            }}
-            .totals {{
-                margin-top: 20px;
-                padding-top: 20px;
-                border-top: 2px solid #e5e7eb;
-            }}
-            .totals-table {{
-                width: 300px;
-                margin-left: auto;
-                border-collapse: collapse;
-            }}
-            .totals-table td {{
-                padding: 8px 12px;
-                border: none;
-            }}
-            .totals-table .total-row {{
-                font-weight: bold;
-                font-size: 18px;
-                color: #2563eb;
-                border-top: 2px solid #2563eb;
-            }}
-            .notes {{
-                margin-top: 30px;
-                padding: 20px;
-                background-color: #f8fafc;
-                border-radius: 6px;
-            }}
-            .notes h4 {{
-                margin-top: 0;
-                color: #374151;
-            }}
-            .footer {{
-                margin-top: 40px;
-                text-align: center;
-                color: #6b7280;
-                font-size: 14px;
-                border-top: 1px solid #e5e7eb;
-                padding-top: 20px;
-            }}
-            .status {{
-                display: inline-block;
-                padding: 4px 12px;
-                border-radius: 20px;
-                font-size: 12px;
-                font-weight: bold;
-                text-transform: uppercase;
-            }}
-            .status-paid {{
-                background-color: #d1fae5;
-                color: #065f46;
-            }}
-            .status-sent {{
-                background-color: #dbeafe;
-                color: #1e40af;
-            }}
-            .status-overdue {{
-                background-color: #fee2e2;
-                color: #991b1b;
-            }}
-            .status-draft {{
-                background-color: #f3f4f6;
-                color: #374151;
-            }}
-            @media print {{
-                body {{
-                    padding: 0;
-                }}
-                .invoice-container {{
-                    box-shadow: none;
-                    padding: 0;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="invoice-container">
-            <!-- Header -->
-            <div class="header">
-                <div class="company-info">
-                    <h1>MediQ Pharmacy</h1>
-                    <p>123 Health Street, Medical City, MC 12345</p>
-                    <p>Phone: +1 (555) 123-4567</p>
-                    <p>Email: info@mediq.com</p>
-                    <p>Website: www.mediq.com</p>
-                </div>
-                <div class="invoice-title">
-                    <h2>INVOICE</h2>
-                    <p><strong>{invoice.invoice_number}</strong></p>
-                    <span class="status status-{invoice.status.value}">{invoice.status.value}</span>
-                </div>
-            </div>
-            
-            <!-- Invoice Details -->
-            <div class="invoice-details">
-                <div class="section">
-                    <h3>Bill To:</h3>
-                    <p><strong>{invoice.customer_name}</strong></p>
-                    {f'<p>{invoice.customer_email}</p>' if invoice.customer_email else ''}
-                    {f'<p>{invoice.customer_phone}</p>' if invoice.customer_phone else ''}
-                    {f'<p>{invoice.customer_address}</p>' if invoice.customer_address else ''}
-                </div>
-                <div class="section">
-                    <h3>Invoice Information:</h3>
-                    <p><strong>Invoice Date:</strong> {invoice.issued_date.strftime('%B %d, %Y')}</p>
-                    {f'<p><strong>Due Date:</strong> {invoice.due_date.strftime("%B %d, %Y")}</p>' if invoice.due_date else ''}
-                    <p><strong>Order ID:</strong> #{invoice.order_id}</p>
-                    <p><strong>Order Date:</strong> {invoice.order_date.strftime('%B %d, %Y')}</p>
-                    {f'<p><strong>Payment Date:</strong> {invoice.paid_date.strftime("%B %d, %Y")}</p>' if invoice.paid_date else ''}
-                </div>
-            </div>
-            
-            <!-- Items Table -->
-            <table class="info-table">
-                <thead>
-                    <tr>
-                        <th>Medicine</th>
-                        <th>Quantity</th>
-                        <th class="amount-column">Unit Price</th>
-                        <th class="amount-column">Total</th>
-                    </tr>
-                </thead>
-                <tbody>
-    """
-    
-    # Add items
-    for item in invoice.order_medicines:
-        html += f"""
-                    <tr>
-                        <td>{item.medicine_name}</td>
-                        <td>{item.quantity}</td>
-                        <td class="amount-column">₹{item.unit_price:.2f}</td>
-                        <td class="amount-column">₹{item.total_price:.2f}</td>
-                    </tr>
-        """
-    
-    html += f"""
-                </tbody>
-            </table>
-            
-            <!-- Totals -->
-            <div class="totals">
-                <table class="totals-table">
-                    <tr>
-                        <td>Subtotal:</td>
-                        <td class="amount-column">₹{subtotal:.2f}</td>
-                    </tr>
-    """
-    
-    if invoice.discount > 0:
-        html += f"""
-                    <tr>
-                        <td>Discount:</td>
-                        <td class="amount-column">-₹{invoice.discount:.2f}</td>
-                    </tr>
-        """
-    
-    if invoice.tax > 0:
-        html += f"""
-                    <tr>
-                        <td>Tax:</td>
-                        <td class="amount-column">₹{invoice.tax:.2f}</td>
-                    </tr>
-        """
-    
-    html += f"""
-                    <tr class="total-row">
-                        <td>Total Amount:</td>
-                        <td class="amount-column">₹{invoice.total_amount:.2f}</td>
-                    </tr>
-                </table>
-            </div>
-    """
-    
-    # Add notes if available
-    if invoice.notes:
-        html += f"""
-            <div class="notes">
-                <h4>Notes:</h4>
-                <p>{invoice.notes}</p>
-            </div>
-        """
-    
-    # Add terms if available
-    if invoice.terms:
-        html += f"""
-            <div class="notes">
-                <h4>Terms & Conditions:</h4>
-                <p>{invoice.terms}</p>
-            </div>
-        """
-    
-    html += """
-            <!-- Footer -->
-            <div class="footer">
-                <p>Thank you for your business!</p>
-                <p>If you have any questions about this invoice, please contact us at info@mediq.com</p>
-            </div>
-        </div>
-        
-        <script>
-            // Auto-print when opened in new window
-            window.onload = function() {
-                if (window.location.search.includes('print=true')) {
-                    window.print();
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
-    
-    return html
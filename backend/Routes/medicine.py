@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from databases.database import get_db
+from databases.database import get_db, get_read_db
+from databases.pagination import PageParams, approximate_total, set_page_headers
 from Models.medicine import Medicine
 from Schemas.medicine import MedicineCreate, MedicineUpdate,MedicineOut
 from Views.medicine import (
     fetch_medicine_by_id,
     fetch_medicine_by_name,
-    fetch_all_medicines,
+    fetch_medicines_page,
     create_new_medicine,
     update_existing_medicine,
     delete_medicine_by_id,
@@ -16,12 +17,15 @@ router = APIRouter()
 
 #Gives all medicines
 @router.get("", response_model=list[MedicineOut])
-def get_all_medicines(db: Session = Depends(get_db)):
-    return fetch_all_medicines(db)
+def get_all_medicines(request: Request, response: Response, page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    medicines, next_cursor = fetch_medicines_page(db, page.limit, page.after)
+    total = approximate_total(db, Medicine) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return medicines
 
 #Gives medicine by id
 @router.get("/{medicine_id}", response_model=MedicineOut)
-def get_medicine_by_id(medicine_id: int, db: Session = Depends(get_db)):
+def get_medicine_by_id(medicine_id: int, db: Session = Depends(get_read_db)):
     med = fetch_medicine_by_id(db, medicine_id)
     if not med:
         raise HTTPException(status_code=404, detail="Medicine not found")
@@ -29,7 +33,7 @@ def get_medicine_by_id(medicine_id: int, db: Session = Depends(get_db)):
 
 #Gives medicine by name
 @router.get("/name/{medicine_name}", response_model=MedicineOut)
-def get_medicine_by_name(medicine_name: str, db: Session = Depends(get_db)):
+def get_medicine_by_name(medicine_name: str, db: Session = Depends(get_read_db)):
     med = fetch_medicine_by_name(db, medicine_name)
     if not med:
         raise HTTPException(status_code=404, detail="Medicine not found")
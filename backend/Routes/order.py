@@ -1,125 +1,187 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import Any, AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from databases.database import get_db
+from databases.database import get_db, get_read_db, get_async_db, USE_ASYNC_DB
+from databases.pagination import PageParams, approximate_total, approximate_total_async, set_page_headers
 
 from Models.order import Order
-from Schemas.order import OrderCreate, OrderUpdate
-from Views.order import fetch_all_orders, fetch_order_by_id, create_order, update_order, delete_order, fetch_order_with_details
+from Schemas.order import OrderCancel, OrderCreate, OrderUpdate
+from Views.order import (
+    fetch_order_summaries_page,
+    fetch_order_summary,
+    fetch_order_by_id,
+    create_order,
+    update_order,
+    delete_order,
+    cancel_orders,
+    fetch_order_with_details,
+    ingest_order_chunk,
+    ORDER_BULK_CHUNK_SIZE,
+    fetch_order_summaries_page_async,
+    fetch_order_summary_async,
+    create_order_async,
+    update_order_async,
+    delete_order_async,
+    cancel_orders_async,
+)
+from Views.idempotency import run_idempotent, run_idempotent_async
 
 router = APIRouter()
 
+
 @router.get("/test")
 def test_orders():
     return {"message": "Orders endpoint is working"}
 
-@router.get("")
-def get_all_orders(db: Session = Depends(get_db)):
-    orders = fetch_all_orders(db)
-    result = []
-
-    for order in orders:
-        customer = None
-        if getattr(order, "customer", None):
-            customer = {
-                "id": order.customer.id,
-                "name": order.customer.name,
-                "email": order.customer.email,
-                "phone": order.customer.phone,
-                "address": order.customer.address,
-            }
-
-        order_medicines = []
-        for item in getattr(order, "order_medicines", []) or []:
-            med = getattr(item, "medicine", None)
-            order_medicines.append(
-                {
-                    "id": item.id,
-                    "order_id": item.order_id,
-                    "medicine_id": item.medicine_id,
-                    "quantity": item.quantity,
-                    "unit_price": item.unit_price,
-                    "medicine": (
-                        {"id": med.id, "name": med.name, "price": med.price} if med else None
-                    ),
-                }
-            )
-
-        result.append(
-            {
-                "id": order.id,
-                "customer_id": order.customer_id,
-                "total_amount": order.total_amount,
-                "order_date": order.order_date,
-                "status": getattr(order.status, "value", order.status),
-                "customer": customer,
-                "order_medicines": order_medicines,
-                "invoice": getattr(order, "invoice", None),
-            }
-        )
+_NEWEST_FIRST = Query(False, description="Newest orders first; pass it again with the cursor")
 
-    return result
+def get_all_orders(request: Request, response: Response, page: PageParams = Depends(),
+                   newest_first: bool = _NEWEST_FIRST, db: Session = Depends(get_read_db)):
+    orders, next_cursor = fetch_order_summaries_page(db, page.limit, page.after, newest_first)
+    total = approximate_total(db, Order) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return orders
 
-@router.get("/{order_id}")
-def get_order_by_id(order_id: int, db: Session = Depends(get_db)):
-    order = fetch_order_with_details(db, order_id)
+async def get_all_orders_async(request: Request, response: Response, page: PageParams = Depends(),
+                               newest_first: bool = _NEWEST_FIRST, db: AsyncSession = Depends(get_async_db)):
+    orders, next_cursor = await fetch_order_summaries_page_async(db, page.limit, page.after, newest_first)
+    total = await approximate_total_async(db, Order) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return orders
+
+router.get("")(get_all_orders_async if USE_ASYNC_DB else get_all_orders)
+
+def get_order_by_id(order_id: int, db: Session = Depends(get_read_db)):
+    order = fetch_order_summary(db, order_id)
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    return order
 
-    customer = None
-    if getattr(order, "customer", None):
-        customer = {
-            "id": order.customer.id,
-            "name": order.customer.name,
-            "email": order.customer.email,
-            "phone": order.customer.phone,
-            "address": order.customer.address,
-        }
-
-    order_medicines = []
-    for item in getattr(order, "order_medicines", []) or []:
-        med = getattr(item, "medicine", None)
-        order_medicines.append(
-            {
-                "id": item.id,
-                "order_id": item.order_id,
-                "medicine_id": item.medicine_id,
-                "quantity": item.quantity,
-                "unit_price": item.unit_price,
-                "medicine": (
-                    {"id": med.id, "name": med.name, "price": med.price} if med else None
-                ),
-            }
-        )
+async def get_order_by_id_async(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    order = await fetch_order_summary_async(db, order_id)
+    if not order:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    return order
 
-    return {
-        "id": order.id,
-        "customer_id": order.customer_id,
-        "total_amount": order.total_amount,
-        "order_date": order.order_date,
-        "status": getattr(order.status, "value", order.status),
-        "customer": customer,
-        "order_medicines": order_medicines,
-        "invoice": getattr(order, "invoice", None),
-    }
+router.get("/{order_id}")(get_order_by_id_async if USE_ASYNC_DB else get_order_by_id)
 
 @router.get("/details/{order_id}")
-def get_order_with_details(order_id: int, db: Session = Depends(get_db)):
+def get_order_with_details(order_id: int, db: Session = Depends(get_read_db)):
     order = fetch_order_with_details(db, order_id)
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
     return order
 
-@router.post("")
-def create_new_order(order: OrderCreate, db: Session = Depends(get_db)):
-    return create_order(db, order)
+def create_new_order(
+    order: OrderCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+):
+    return run_idempotent(
+        idempotency_key, "POST /orders", order.model_dump(mode="json"),
+        lambda: jsonable_encoder(create_order(db, order, commit=False)), response, db,
+    )
+
+async def create_new_order_async(
+    order: OrderCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None),
+):
+    async def handler():
+        return jsonable_encoder(await create_order_async(db, order, commit=False))
+
+    return await run_idempotent_async(
+        idempotency_key, "POST /orders", order.model_dump(mode="json"), handler, response, db,
+    )
+
+router.post("")(create_new_order_async if USE_ASYNC_DB else create_new_order)
+
+async def _bulk_payload_chunks(request: Request, chunk_size: int) -> AsyncIterator[List[Any]]:
+    """Yield order payloads in chunks from a JSON array or an NDJSON stream"""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        chunk: List[Any] = []
+        buffer = b""
+        async for data in request.stream():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    chunk.append(json.loads(line))
+                except ValueError as e:
+                    chunk.append(e)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if buffer.strip():
+            try:
+                chunk.append(json.loads(buffer))
+            except ValueError as e:
+                chunk.append(e)
+        if chunk:
+            yield chunk
+        return
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Body must be valid JSON")
+    if not isinstance(payload, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Body must be a JSON array of orders or an NDJSON stream",
+        )
+    for start in range(0, len(payload), chunk_size):
+        yield payload[start:start + chunk_size]
+
+@router.post("/bulk")
+async def create_orders_bulk(request: Request, db: Session = Depends(get_db)):
+    """Create many orders at once (JSON array, or NDJSON with Content-Type application/x-ndjson).
+
+    Each chunk of orders is committed in its own transaction; the response has one
+    result per submitted order, in submission order.
+    """
+    results = []
+    async for chunk in _bulk_payload_chunks(request, ORDER_BULK_CHUNK_SIZE):
+        results.extend(await run_in_threadpool(ingest_order_chunk, db, chunk, len(results)))
+    created = sum(1 for result in results if result["status"] == "created")
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+def cancel_orders_route(request: OrderCancel, db: Session = Depends(get_db)):
+    return cancel_orders(db, request)
+
+async def cancel_orders_route_async(request: OrderCancel, db: AsyncSession = Depends(get_async_db)):
+    return await cancel_orders_async(db, request)
+
+router.post("/cancel")(cancel_orders_route_async if USE_ASYNC_DB else cancel_orders_route)
 
-@router.put("/{order_id}")
 def update_existing_order(order_id: int, order: OrderUpdate, db: Session = Depends(get_db)):
     return update_order(db, order_id, order)
 
-@router.delete("/{order_id}")
+async def update_existing_order_async(order_id: int, order: OrderUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await update_order_async(db, order_id, order)
+
+router.put("/{order_id}")(update_existing_order_async if USE_ASYNC_DB else update_existing_order)
+
 def delete_order_by_id(order_id: int, db: Session = Depends(get_db)):
     order = delete_order(db, order_id)
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
-    return {"detail": "Order deleted successfully"}
\ No newline at end of file
+    return {"detail": "Order deleted successfully"}
+
+async def delete_order_by_id_async(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    order = await delete_order_async(db, order_id)
+    if not order:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    return {"detail": "Order deleted successfully"}
+
+router.delete("/{order_id}")(delete_order_by_id_async if USE_ASYNC_DB else delete_order_by_id)
@@ -0,0 +1,32 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from databases.database import get_read_db, get_async_db, USE_ASYNC_DB
+
+from Schemas.report import RevenueReport
+from Views.daily_sales import fetch_revenue_report, fetch_revenue_report_async
+
+router = APIRouter()
+
+def get_revenue_report(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    bucket: Literal["day", "week", "month"] = "day",
+    db: Session = Depends(get_read_db),
+) -> RevenueReport:
+    """Orders, tax, discount and payments per day, week or month, read from the daily_sales rollup"""
+    return fetch_revenue_report(db, date_from, date_to, bucket)
+
+async def get_revenue_report_async(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    bucket: Literal["day", "week", "month"] = "day",
+    db: AsyncSession = Depends(get_async_db),
+) -> RevenueReport:
+    """Orders, tax, discount and payments per day, week or month, read from the daily_sales rollup"""
+    return await fetch_revenue_report_async(db, date_from, date_to, bucket)
+
+router.get("/revenue", response_model=RevenueReport)(get_revenue_report_async if USE_ASYNC_DB else get_revenue_report)
@@ -1,45 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from databases.database import get_db
+from databases.database import get_db, get_read_db, get_async_db, USE_ASYNC_DB
+from databases.pagination import PageParams, approximate_total, approximate_total_async, set_page_headers
 
 from Models.stock import Stock
 from Schemas.stock import StockCreate, StockUpdate, StockOut
 from Views.stock import (
     fetch_stock_by_id,
-    fetch_all_stocks,
+    fetch_stocks_page,
     fetch_stock_by_medicine_id,
     fetch_stock_by_medicine,
     create_stock,
     update_stock,
     delete_stock,
+    fetch_stocks_page_async,
+    fetch_stock_by_id_async,
+    fetch_stock_by_medicine_id_async,
 )
 
 router = APIRouter()
 
 #Gives all stocks
-@router.get("", response_model=list[StockOut])
-def get_all_stocks(db: Session = Depends(get_db)):
-    return fetch_all_stocks(db)
+def get_all_stocks(request: Request, response: Response, page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    stocks, next_cursor = fetch_stocks_page(db, page.limit, page.after)
+    total = approximate_total(db, Stock) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return stocks
+
+async def get_all_stocks_async(request: Request, response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    stocks, next_cursor = await fetch_stocks_page_async(db, page.limit, page.after)
+    total = await approximate_total_async(db, Stock) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return stocks
+
+router.get("", response_model=list[StockOut])(get_all_stocks_async if USE_ASYNC_DB else get_all_stocks)
 
 #Gives stock by id
-@router.get("/{stock_id}", response_model=StockOut)
-def get_stock_by_id(stock_id: int, db: Session = Depends(get_db)):
+def get_stock_by_id(stock_id: int, db: Session = Depends(get_read_db)):
     stock = fetch_stock_by_id(db, stock_id)
     if not stock:
         raise HTTPException(status_code=404, detail="Stock not found")
     return stock
 
+async def get_stock_by_id_async(stock_id: int, db: AsyncSession = Depends(get_async_db)):
+    stock = await fetch_stock_by_id_async(db, stock_id)
+    if not stock:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    return stock
+
+router.get("/{stock_id}", response_model=StockOut)(get_stock_by_id_async if USE_ASYNC_DB else get_stock_by_id)
+
 #Gives stock by medicine id
-@router.get("/medicine/{medicine_id}", response_model=StockOut)
-def get_stock_by_medicine_id(medicine_id: int, db: Session = Depends(get_db)):
+def get_stock_by_medicine_id(medicine_id: int, db: Session = Depends(get_read_db)):
     stock = fetch_stock_by_medicine_id(db, medicine_id)
     if not stock:
         raise HTTPException(status_code=404, detail="Stock not found")
     return stock
 
+async def get_stock_by_medicine_id_async(medicine_id: int, db: AsyncSession = Depends(get_async_db)):
+    stock = await fetch_stock_by_medicine_id_async(db, medicine_id)
+    if not stock:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    return stock
+
+router.get("/medicine/{medicine_id}", response_model=StockOut)(
+    get_stock_by_medicine_id_async if USE_ASYNC_DB else get_stock_by_medicine_id
+)
+
 #Gives stock with medicine name
 @router.get("/medicine/name/{medicine_name}", response_model=StockOut)
-def get_stock_by_medicine_name(medicine_name: str, db: Session = Depends(get_db)):
+def get_stock_by_medicine_name(medicine_name: str, db: Session = Depends(get_read_db)):
     stock = fetch_stock_by_medicine(db, medicine_name)
     if not stock:
         raise HTTPException(status_code=404, detail="Stock not found")
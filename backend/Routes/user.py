@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from databases.database import get_db
+from databases.database import get_db, get_read_db
+from databases.pagination import PageParams, approximate_total, set_page_headers
 
 from Models.user import User
 from Schemas.user import UserCreate, UserUpdate, UserOut
 from Views.user import (
     fetch_user_by_id,
-    fetch_all_users,
+    fetch_users_page,
     fetch_user_by_email,
     create_user,
     update_user,
@@ -17,25 +18,28 @@ from Views.user import (
 router = APIRouter()
 
 @router.get("", response_model=list[UserOut])
-def get_all_users(db: Session = Depends(get_db)):
-    return fetch_all_users(db)
+def get_all_users(request: Request, response: Response, page: PageParams = Depends(), db: Session = Depends(get_read_db)):
+    users, next_cursor = fetch_users_page(db, page.limit, page.after)
+    total = approximate_total(db, User) if page.include_total else None
+    set_page_headers(request, response, next_cursor, total)
+    return users
 
 @router.get("/{user_id}", response_model=UserOut)
-def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
+def get_user_by_id(user_id: int, db: Session = Depends(get_read_db)):
     user = fetch_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.get("/email/{email}", response_model=UserOut)
-def get_user_by_email(email: str, db: Session = Depends(get_db)):
+def get_user_by_email(email: str, db: Session = Depends(get_read_db)):
     user = fetch_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.get("/username/{username}", response_model=UserOut)
-def get_user_by_username(username: str, db: Session = Depends(get_db)):
+def get_user_by_username(username: str, db: Session = Depends(get_read_db)):
     user = fetch_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,5 +1,5 @@
-from typing import Optional, Any, List
-from datetime import datetime
+from typing import Optional, Any, List, Literal
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 from Models.invoice import InvoiceStatus
 
@@ -64,4 +64,27 @@ class InvoicePrintData(BaseModel):
         "phone": "+1 (555) 123-4567",
         "email": "info@mediq.com",
         "website": "www.mediq.com"
-    }
\ No newline at end of file
+    }
+
+# Selects invoices for POST /invoices/print-batch: explicit ids, a filter, or both
+class InvoicePrintBatch(BaseModel):
+    invoice_ids: Optional[List[int]] = None
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+    status: Optional[List[InvoiceStatus]] = None
+    format: Literal["html", "zip"] = "html"
+
+class InvoiceStatusTotals(BaseModel):
+    status: InvoiceStatus
+    count: int
+    total_amount: float
+
+# GET /invoices/stats; overdue counts OVERDUE plus sent/draft invoices past due
+class InvoiceStats(BaseModel):
+    created_from: Optional[date] = None
+    created_to: Optional[date] = None
+    count: int
+    total_amount: float
+    overdue_count: int
+    overdue_amount: float
+    by_status: List[InvoiceStatusTotals]
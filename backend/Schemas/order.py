@@ -36,6 +36,10 @@ class OrderUpdate(OrderBase):
     status: Optional[OrderStatus] = None
     order_medicines: Optional[List[OrderMedicineCreate]] = None
 
+class OrderCancel(BaseModel):
+    order_ids: Optional[List[int]] = None
+    placed_before: Optional[datetime] = Field(None, description="Cancel pending orders placed before this time")
+
 class OrderInDBBase(OrderBase):
     id: int
     total_amount: float
@@ -0,0 +1,21 @@
+from typing import List, Literal, Optional
+from datetime import date
+from pydantic import BaseModel
+
+class RevenueTotals(BaseModel):
+    order_count: int = 0
+    gross_amount: float = 0
+    tax: float = 0
+    discount: float = 0
+    paid_amount: float = 0
+
+class RevenuePeriod(RevenueTotals):
+    period_start: date  # the day, the Monday of the week, or the 1st of the month
+
+# GET /reports/revenue; periods without any sales are left out
+class RevenueReport(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    bucket: Literal["day", "week", "month"]
+    periods: List[RevenuePeriod]
+    total: RevenueTotals
@@ -1,14 +1,17 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 
+from databases.pagination import keyset_page
+
 from Models.customer import Customer
 
 from Schemas.customer import CustomerCreate, CustomerUpdate
 
 
-def fetch_all_customers(db: Session) -> List[Customer]:
-    return db.query(Customer).options(joinedload(Customer.orders)).all()
+def fetch_customers_page(db: Session, limit: int, after: Optional[list] = None) -> Tuple[List[Customer], Optional[str]]:
+    query = db.query(Customer).options(joinedload(Customer.orders))
+    return keyset_page(db, query, [Customer.id], limit, after)
 
 
 def fetch_customer_by_id(db: Session, customer_id: int) -> Customer:
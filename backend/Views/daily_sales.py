@@ -0,0 +1,189 @@
+"""Per-day revenue rollup in ``daily_sales``, and GET /reports/revenue on top of it.
+
+A day's row holds the orders placed that day that aren't cancelled (count and
+total_amount), the tax and discount of invoices created that day, and the
+total_amount of invoices paid that day. A day is the database's ``DATE()`` of the
+stored timestamp, the same expression the rebuild groups on.
+
+Writes keep the table current inside their own transaction. Before a change the
+affected orders or invoices have their contribution taken off (``sign=-1``) and after
+it added back, as ``UPDATE daily_sales SET col = col + delta`` on each day's row; a
+day without a row yet gets one inserted under a savepoint. ``rebuild_daily_sales``
+recomputes the whole table with three grouped queries; ``python rebuild_daily_sales.py``
+runs it by hand. Migration 5 backfilled the table with the same three queries as fixed SQL.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from Models.daily_sales import DailySales
+from Models.invoice import Invoice, InvoiceStatus
+from Models.order import Order, OrderStatus
+from Schemas.report import RevenuePeriod, RevenueReport, RevenueTotals
+
+FIELDS = ("order_count", "gross_amount", "tax", "discount", "paid_amount")
+
+_sales = DailySales.__table__
+_ORDER_DAY = func.date(Order.order_date, type_=Date)
+_INVOICE_DAY = func.date(Invoice.created_at, type_=Date)
+_PAID_DAY = func.date(Invoice.paid_date, type_=Date)
+_OPEN_ORDER = Order.status != OrderStatus.CANCELLED
+
+# day -> field -> amount
+Deltas = Dict[date, Dict[str, float]]
+
+
+def _add(deltas: Deltas, day: Optional[date], **amounts: Optional[float]) -> None:
+    if day is None:
+        return
+    entry = deltas.setdefault(day, dict.fromkeys(FIELDS, 0))
+    for name, value in amounts.items():
+        entry[name] += value or 0
+
+
+def _apply(db: Session, deltas: Deltas, sign: int) -> None:
+    # Days in ascending order, so concurrent writers lock rows in the same order
+    for day, amounts in sorted(deltas.items()):
+        changes = {name: sign * value for name, value in amounts.items() if value}
+        if not changes:
+            continue
+        bump = update(_sales).where(_sales.c.day == day).values(
+            {name: _sales.c[name] + value for name, value in changes.items()}
+        )
+        if db.execute(bump).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(insert(_sales).values(day=day, **{name: changes.get(name, 0) for name in FIELDS}))
+        except IntegrityError:
+            # Another transaction inserted the day first
+            db.execute(bump)
+
+
+def apply_orders(db: Session, order_ids: Iterable[int], sign: int = 1, include_cancelled: bool = False) -> None:
+    """Add (``sign=1``) or take off (``sign=-1``) the orders' count and total on their days.
+
+    Cancelled orders count for nothing, so they are skipped unless
+    ``include_cancelled``, which is for taking off orders this transaction just cancelled.
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return
+    # Sessions don't autoflush, and the select below must see pending changes
+    db.flush()
+    stmt = select(_ORDER_DAY, Order.total_amount).where(Order.id.in_(order_ids))
+    if not include_cancelled:
+        stmt = stmt.where(_OPEN_ORDER)
+    deltas: Deltas = {}
+    for day, total in db.execute(stmt):
+        _add(deltas, day, order_count=1, gross_amount=total)
+    _apply(db, deltas, sign)
+
+
+def apply_invoices(db: Session, invoice_ids: Iterable[int], sign: int = 1, payments_only: bool = False) -> None:
+    """Add or take off the invoices' tax, discount and (once paid) total on their days.
+
+    ``payments_only`` leaves tax and discount alone, for an invoice that was just paid.
+    """
+    invoice_ids = list(invoice_ids)
+    if not invoice_ids:
+        return
+    db.flush()
+    deltas: Deltas = {}
+    rows = db.execute(
+        select(_INVOICE_DAY, _PAID_DAY, Invoice.status, Invoice.tax, Invoice.discount, Invoice.total_amount)
+        .where(Invoice.id.in_(invoice_ids))
+    )
+    for created_day, paid_day, invoice_status, tax, discount, total in rows:
+        if not payments_only:
+            _add(deltas, created_day, tax=tax, discount=discount)
+        if invoice_status == InvoiceStatus.PAID:
+            _add(deltas, paid_day, paid_amount=total)
+    _apply(db, deltas, sign)
+
+
+def rebuild_daily_sales(db) -> int:
+    """Recompute every row from orders and invoices and return the number of days.
+
+    ``db`` is a Session or a Connection; the rows are replaced in its transaction.
+    """
+    deltas: Deltas = {}
+    for day, count, gross in db.execute(
+        select(_ORDER_DAY, func.count(), func.sum(Order.total_amount)).where(_OPEN_ORDER).group_by(_ORDER_DAY)
+    ):
+        _add(deltas, day, order_count=count, gross_amount=gross)
+    for day, tax, discount in db.execute(
+        select(_INVOICE_DAY, func.sum(Invoice.tax), func.sum(Invoice.discount)).group_by(_INVOICE_DAY)
+    ):
+        _add(deltas, day, tax=tax, discount=discount)
+    for day, paid in db.execute(
+        select(_PAID_DAY, func.sum(Invoice.total_amount))
+        .where(Invoice.status == InvoiceStatus.PAID)
+        .group_by(_PAID_DAY)
+    ):
+        _add(deltas, day, paid_amount=paid)
+
+    db.execute(delete(_sales))
+    if deltas:
+        db.execute(insert(_sales), [{"day": day, **amounts} for day, amounts in sorted(deltas.items())])
+    return len(deltas)
+
+
+def _period_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _rounded(amounts: Dict[str, float]) -> dict:
+    return {name: round(value, 2) if name != "order_count" else int(value) for name, value in amounts.items()}
+
+
+def fetch_revenue_report(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                         bucket: str = "day") -> RevenueReport:
+    """Rollup rows from ``date_from`` to ``date_to`` (inclusive) summed per day, week or month.
+
+    A week or month cut by the range only covers the days inside it.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must not be after 'to'")
+
+    stmt = select(_sales).order_by(_sales.c.day)
+    if date_from:
+        stmt = stmt.where(_sales.c.day >= date_from)
+    if date_to:
+        stmt = stmt.where(_sales.c.day <= date_to)
+
+    periods: Deltas = {}
+    for row in db.execute(stmt).mappings():
+        _add(periods, _period_start(row["day"], bucket), **{name: row[name] for name in FIELDS})
+
+    total = dict.fromkeys(FIELDS, 0)
+    results = []
+    for start, amounts in periods.items():
+        amounts = _rounded(amounts)
+        if not any(amounts.values()):
+            continue  # every order that day was cancelled or deleted
+        results.append(RevenuePeriod(period_start=start, **amounts))
+        for name in FIELDS:
+            total[name] += amounts[name]
+    return RevenueReport(
+        date_from=date_from,
+        date_to=date_to,
+        bucket=bucket,
+        periods=results,
+        total=RevenueTotals(**_rounded(total)),
+    )
+
+
+# Async variant used when USE_ASYNC_DB is enabled
+async def fetch_revenue_report_async(db: AsyncSession, date_from: Optional[date] = None,
+                                     date_to: Optional[date] = None, bucket: str = "day") -> RevenueReport:
+    return await db.run_sync(fetch_revenue_report, date_from, date_to, bucket)
@@ -0,0 +1,219 @@
+"""Streaming CSV / NDJSON exports for invoices, orders and stock.
+
+Each export is one ``select()`` read in EXPORT_BATCH_SIZE partitions with
+``yield_per`` (and so ``stream_results``: a server-side cursor where the driver has
+one). Every partition is formatted and handed to the response before the next one is
+fetched, so memory stays flat however many rows the export covers.
+"""
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select
+
+from databases.database import ReadSessionLocal
+from Models.customer import Customer
+from Models.invoice import Invoice, InvoiceStatus
+from Models.medicine import Medicine
+from Models.order import Order, OrderMedicine, OrderStatus
+from Models.stock import Stock
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """What one export resource selects and which columns it filters on"""
+
+    columns: Sequence[Tuple[str, Any]]  # (output field, column expression)
+    from_clause: Callable[[Select], Select]
+    order_by: Sequence[Any]
+    date_column: Any
+    status_column: Any = None
+    status_enum: Optional[type] = None
+
+    @property
+    def fields(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+    def statement(self) -> Select:
+        stmt = select(*[column.label(name) for name, column in self.columns])
+        return self.from_clause(stmt).order_by(*self.order_by)
+
+
+# One row per invoice line, with the invoice and customer columns repeated on each
+_INVOICE_LINES = ExportSpec(
+    columns=[
+        ("invoice_id", Invoice.id),
+        ("invoice_number", Invoice.invoice_number),
+        ("invoice_status", Invoice.status),
+        ("created_at", Invoice.created_at),
+        ("due_date", Invoice.due_date),
+        ("paid_date", Invoice.paid_date),
+        ("amount", Invoice.amount),
+        ("tax", Invoice.tax),
+        ("discount", Invoice.discount),
+        ("invoice_total", Invoice.total_amount),
+        ("order_id", Order.id),
+        ("customer_id", Customer.id),
+        ("customer_name", Customer.name),
+        ("line_id", OrderMedicine.id),
+        ("medicine_id", OrderMedicine.medicine_id),
+        ("medicine_name", Medicine.name),
+        ("quantity", OrderMedicine.quantity),
+        ("unit_price", OrderMedicine.unit_price),
+        ("line_total", OrderMedicine.quantity * OrderMedicine.unit_price),
+    ],
+    from_clause=lambda stmt: (
+        stmt.select_from(Invoice)
+        .join(Order, Order.id == Invoice.order_id)
+        .outerjoin(Customer, Customer.id == Order.customer_id)
+        .outerjoin(OrderMedicine, OrderMedicine.order_id == Order.id)
+        .outerjoin(Medicine, Medicine.id == OrderMedicine.medicine_id)
+    ),
+    order_by=[Invoice.id, OrderMedicine.id],
+    date_column=Invoice.created_at,
+    status_column=Invoice.status,
+    status_enum=InvoiceStatus,
+)
+
+_ORDERS = ExportSpec(
+    columns=[
+        ("order_id", Order.id),
+        ("order_date", Order.order_date),
+        ("status", Order.status),
+        ("customer_id", Order.customer_id),
+        ("customer_name", Customer.name),
+        ("customer_email", Customer.email),
+        ("total_amount", Order.total_amount),
+    ],
+    from_clause=lambda stmt: stmt.select_from(Order).outerjoin(Customer, Customer.id == Order.customer_id),
+    order_by=[Order.id],
+    date_column=Order.order_date,
+    status_column=Order.status,
+    status_enum=OrderStatus,
+)
+
+_STOCK = ExportSpec(
+    columns=[
+        ("stock_id", Stock.id),
+        ("medicine_id", Stock.medicine_id),
+        ("medicine_name", Medicine.name),
+        ("quantity", Stock.quantity),
+        ("batch_number", Stock.batch_number),
+        ("expiry_date", Stock.expiry_date),
+        ("last_updated", Stock.last_updated),
+    ],
+    from_clause=lambda stmt: stmt.select_from(Stock).outerjoin(Medicine, Medicine.id == Stock.medicine_id),
+    order_by=[Stock.id],
+    date_column=Stock.expiry_date,
+)
+
+EXPORTS = {
+    "invoices": _INVOICE_LINES,
+    "orders": _ORDERS,
+    "stock": _STOCK,
+}
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def format_csv(fields: Sequence[str], batches: Iterator[Sequence[tuple]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for rows in batches:
+        writer.writerows([["" if v is None else _value(v) for v in row] for row in rows])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def format_ndjson(fields: Sequence[str], batches: Iterator[Sequence[tuple]]) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps({field: _value(v) for field, v in zip(fields, row)}) + "\n"
+            for row in rows
+        )
+
+
+FORMATTERS = {
+    "csv": format_csv,
+    "ndjson": format_ndjson,
+}
+
+
+def _parse_statuses(spec: ExportSpec, status_filter: Optional[str]) -> Optional[list]:
+    if not status_filter:
+        return None
+    if spec.status_enum is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This export has no status filter")
+    statuses = []
+    for raw in status_filter.split(","):
+        try:
+            statuses.append(spec.status_enum(raw.strip().lower()))
+        except ValueError:
+            allowed = ", ".join(s.value for s in spec.status_enum)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown status '{raw}'. Allowed: {allowed}",
+            )
+    return statuses
+
+
+def build_export(
+    resource: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status_filter: Optional[str] = None,
+) -> Tuple[ExportSpec, Select]:
+    """Validate the filters and return the spec and statement for an export"""
+    spec = EXPORTS.get(resource)
+    if spec is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export '{resource}'. Available: {', '.join(EXPORTS)}",
+        )
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must not be after 'to'")
+
+    stmt = spec.statement()
+    if date_from:
+        stmt = stmt.where(spec.date_column >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        # inclusive of the whole 'to' day
+        stmt = stmt.where(spec.date_column < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    statuses = _parse_statuses(spec, status_filter)
+    if statuses:
+        stmt = stmt.where(spec.status_column.in_(statuses))
+    return spec, stmt
+
+
+def stream_export(spec: ExportSpec, stmt: Select, export_format: str) -> Iterator[str]:
+    """Run ``stmt`` on its own read session and yield formatted chunks.
+
+    The session belongs to the generator rather than the request, because the
+    response body is produced after the route function has returned.
+    """
+    with ReadSessionLocal() as db:
+        result = db.execute(stmt, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+        yield from FORMATTERS[export_format](spec.fields, result.partitions())
@@ -0,0 +1,348 @@
+"""Idempotency-Key support for POST endpoints that create orders and invoices.
+
+A client that retries a request with the same ``Idempotency-Key`` header gets the
+original response back instead of a second order or invoice. Each key is claimed by
+inserting an ``in_progress`` row into ``idempotency_keys``; the winner runs the
+handler and stores the serialized response in the handler's own transaction, so the
+order or invoice and the record of it commit together. Duplicates that arrive
+meanwhile wait for that response instead of racing the first request. Completed
+responses are also kept in a bounded in-process LRU so replays usually skip the
+database.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Union
+
+from fastapi import HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from databases.database import SessionLocal
+from Models.idempotency import IdempotencyRecord
+
+logger = logging.getLogger("mediq.idempotency")
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+# An in_progress claim older than this is treated as abandoned (worker crashed)
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+
+MAX_KEY_LENGTH = 255
+_POLL_SECONDS = 0.05
+_PURGE_EVERY = 500
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: Any
+    expires_at: datetime
+
+
+class _ResponseCache:
+    """Bounded LRU of completed responses keyed by idempotency key"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= datetime.now():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: StoredResponse) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _ResponseCache(IDEMPOTENCY_CACHE_SIZE)
+
+# Keys claimed by this process, so local duplicates can wait on an Event instead of polling
+_inflight_lock = threading.Lock()
+_inflight: Dict[str, threading.Event] = {}
+_claims = 0
+
+
+def request_fingerprint(scope: str, payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{scope}\n{canonical}".encode()).hexdigest()
+
+
+def _check_fingerprint(stored_fingerprint: str, fingerprint: str) -> None:
+    if stored_fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key has already been used with a different request",
+        )
+
+
+def _purge_expired(db) -> None:
+    db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= datetime.now()))
+    db.commit()
+
+
+def _try_claim(key: str, scope: str, fingerprint: str) -> Union[StoredResponse, datetime]:
+    """One claim attempt: returns the stored response, raises, or returns the claim time once owned.
+
+    Raises LookupError when another request currently holds the key.
+    """
+    global _claims
+    with _inflight_lock:
+        _claims += 1
+        purge = _claims % _PURGE_EVERY == 0
+    with SessionLocal() as db:
+        if purge:
+            _purge_expired(db)
+
+        now = datetime.now()
+        record = db.get(IdempotencyRecord, key)
+        values = {
+            "scope": scope,
+            "fingerprint": fingerprint,
+            "status": "in_progress",
+            "response_status": None,
+            "response_body": None,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+        }
+
+        if record is None:
+            db.add(IdempotencyRecord(key=key, **values))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                raise LookupError(key)  # claimed by a concurrent request first
+            return now
+
+        expired = record.expires_at <= now
+        if not expired:
+            _check_fingerprint(record.fingerprint, fingerprint)
+            if record.status == "completed":
+                stored = StoredResponse(
+                    record.fingerprint,
+                    record.response_status,
+                    json.loads(record.response_body),
+                    record.expires_at,
+                )
+                _cache.put(key, stored)
+                return stored
+            if record.created_at > now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS):
+                raise LookupError(key)
+            logger.warning("Reclaiming abandoned idempotency key %s", key)
+
+        # Expired or abandoned: take it over, guarded on the row we just read
+        result = db.execute(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.key == key, IdempotencyRecord.created_at == record.created_at)
+            .values(**values)
+        )
+        db.commit()
+        if result.rowcount != 1:
+            raise LookupError(key)
+        return now
+
+
+def claim_key(key: str, scope: str, fingerprint: str) -> Union[StoredResponse, datetime]:
+    """Claim ``key`` for this request, or return the response already stored for it.
+
+    The claim is identified by the returned time; ``complete_key`` and
+    ``release_key`` only touch the row while it still carries it.
+
+    A duplicate of a request that is still running blocks for up to
+    IDEMPOTENCY_WAIT_SECONDS and then replays that request's response.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters",
+        )
+
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        cached = _cache.get(key)
+        if cached is not None:
+            _check_fingerprint(cached.fingerprint, fingerprint)
+            return cached
+
+        with _inflight_lock:
+            local = _inflight.get(key)
+        if local is None:
+            try:
+                claim = _try_claim(key, scope, fingerprint)
+            except LookupError:
+                pass
+            else:
+                if not isinstance(claim, StoredResponse):
+                    with _inflight_lock:
+                        _inflight[key] = threading.Event()
+                return claim
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed",
+            )
+        if local is not None:
+            local.wait(remaining)
+        else:
+            time.sleep(min(_POLL_SECONDS, remaining))
+
+
+def _finish(key: str) -> None:
+    with _inflight_lock:
+        event = _inflight.pop(key, None)
+    if event is not None:
+        event.set()
+
+
+def complete_key(db: Session, key: str, claimed_at: datetime, fingerprint: str,
+                 status_code: int, body: Any) -> StoredResponse:
+    """Store the response for a claimed key in ``db``'s transaction, without committing.
+
+    Raises 409 when the claim's lease ran out and another request took the key over,
+    so the caller rolls back instead of committing a second order or invoice.
+    """
+    result = db.execute(
+        update(IdempotencyRecord)
+        .where(
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.created_at == claimed_at,
+            IdempotencyRecord.status == "in_progress",
+        )
+        .values(status="completed", response_status=status_code, response_body=json.dumps(body))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This request took too long and its Idempotency-Key was claimed by a retry",
+        )
+    return StoredResponse(fingerprint, status_code, body, claimed_at + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS))
+
+
+def cache_completed(key: str, stored: StoredResponse) -> None:
+    """Remember a committed response and wake up any waiting duplicates"""
+    _cache.put(key, stored)
+    _finish(key)
+
+
+def release_key(key: str, claimed_at: datetime) -> None:
+    """Drop an in_progress claim after a failed request so the client can retry it"""
+    try:
+        with SessionLocal() as db:
+            db.execute(
+                delete(IdempotencyRecord)
+                .where(
+                    IdempotencyRecord.key == key,
+                    IdempotencyRecord.created_at == claimed_at,
+                    IdempotencyRecord.status == "in_progress",
+                )
+            )
+            db.commit()
+    finally:
+        _finish(key)
+
+
+def _replay(stored: StoredResponse, response: Response) -> Any:
+    response.status_code = stored.status_code
+    response.headers["Idempotent-Replayed"] = "true"
+    return stored.body
+
+
+def run_idempotent(
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Any],
+    response: Response,
+    db: Session,
+) -> Any:
+    """Run ``handler`` at most once per Idempotency-Key.
+
+    ``handler`` writes through ``db`` without committing and returns the JSON-ready
+    response body; that is what gets stored and replayed. The writes and the stored
+    response are committed here together, so a crash can't leave one without the
+    other. Requests without a key just run the handler and commit.
+    """
+    if not key:
+        body = handler()
+        db.commit()
+        return body
+
+    fingerprint = request_fingerprint(scope, payload)
+    claim = claim_key(key, scope, fingerprint)
+    if isinstance(claim, StoredResponse):
+        return _replay(claim, response)
+
+    try:
+        body = handler()
+        stored = complete_key(db, key, claim, fingerprint, response.status_code or status.HTTP_200_OK, body)
+        db.commit()
+    except BaseException:
+        # Nothing is stored for a failed request, so a retry runs again
+        db.rollback()
+        release_key(key, claim)
+        raise
+    cache_completed(key, stored)
+    return body
+
+
+async def run_idempotent_async(
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    response: Response,
+    db: AsyncSession,
+) -> Any:
+    if not key:
+        body = await handler()
+        await db.commit()
+        return body
+
+    fingerprint = request_fingerprint(scope, payload)
+    claim = await run_in_threadpool(claim_key, key, scope, fingerprint)
+    if isinstance(claim, StoredResponse):
+        return _replay(claim, response)
+
+    try:
+        body = await handler()
+        stored = await db.run_sync(
+            complete_key, key, claim, fingerprint, response.status_code or status.HTTP_200_OK, body,
+        )
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        await run_in_threadpool(release_key, key, claim)
+        raise
+    cache_completed(key, stored)
+    return body
@@ -1,14 +1,23 @@
-from typing import List, Optional
+import os
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException, status
-import uuid
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from databases.pagination import keyset_page, keyset_page_async
 
 from Models.invoice import Invoice, InvoiceStatus
 from Models.order import Order, OrderStatus, OrderMedicine
 from Models.customer import Customer
 from Models.medicine import Medicine
-from Schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceWithDetails, OrderMedicineDetail
+from Schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceWithDetails, InvoicePrintBatch, OrderMedicineDetail
+from Views.daily_sales import apply_invoices
+from Views.invoice_numbers import next_invoice_number
+
+PRINT_BATCH_MAX = int(os.getenv("PRINT_BATCH_MAX", "1000"))
 
 def fetch_invoice_by_id(db: Session, invoice_id: int) -> Optional[Invoice]:
     return db.query(Invoice).filter(Invoice.id == invoice_id).first()
@@ -16,63 +25,120 @@ def fetch_invoice_by_id(db: Session, invoice_id: int) -> Optional[Invoice]:
 def fetch_invoice_by_order_id(db: Session, order_id: int) -> Optional[Invoice]:
     return db.query(Invoice).filter(Invoice.order_id == order_id).first()
 
-def fetch_all_invoices(db: Session) -> List[Invoice]:
-    return db.query(Invoice).order_by(Invoice.created_at.desc()).all()
+def fetch_invoices_page(db: Session, limit: int, after: Optional[list] = None) -> Tuple[List[Invoice], Optional[str]]:
+    """Newest first, keyed on the indexed created_at with id as tie-breaker"""
+    return keyset_page(db, db.query(Invoice), [Invoice.created_at, Invoice.id], limit, after, descending=True)
+
+# Invoice, order and customer columns, labelled as InvoiceWithDetails fields
+_DETAIL_COLUMNS = (
+    *Invoice.__table__.c,
+    Order.order_date,
+    Customer.name.label("customer_name"),
+    Customer.email.label("customer_email"),
+    Customer.phone.label("customer_phone"),
+    Customer.address.label("customer_address"),
+)
+
+# Line columns labelled as OrderMedicineDetail fields, with the line total worked out in SQL
+_LINE_COLUMNS = (
+    Medicine.name.label("medicine_name"),
+    OrderMedicine.quantity,
+    OrderMedicine.unit_price,
+    (OrderMedicine.quantity * OrderMedicine.unit_price).label("total_price"),
+)
+
+_INVOICE_FIELDS = tuple(name for name in InvoiceWithDetails.model_fields if name != "order_medicines")
+_LINE_FIELDS = tuple(OrderMedicineDetail.model_fields)
+
+# One row per line (a single row with NULL line columns when the order has none)
+_INVOICE_DETAILS = (
+    select(*_DETAIL_COLUMNS, OrderMedicine.id.label("line_id"), *_LINE_COLUMNS)
+    .select_from(Invoice)
+    .join(Order, Order.id == Invoice.order_id)
+    .join(Customer, Customer.id == Order.customer_id)
+    .outerjoin(OrderMedicine, OrderMedicine.order_id == Order.id)
+    .outerjoin(Medicine, Medicine.id == OrderMedicine.medicine_id)
+    .order_by(OrderMedicine.id)
+)
+
+def _line_detail(row) -> OrderMedicineDetail:
+    return OrderMedicineDetail.model_construct(**{name: row[name] for name in _LINE_FIELDS})
+
+def _invoice_details(row, lines: List[OrderMedicineDetail]) -> InvoiceWithDetails:
+    # Built without validation: every value comes straight from typed columns
+    return InvoiceWithDetails.model_construct(**{name: row[name] for name in _INVOICE_FIELDS}, order_medicines=lines)
 
 def fetch_invoice_with_details(db: Session, invoice_id: int) -> Optional[InvoiceWithDetails]:
-    # Get invoice with related order and customer information
-    invoice = db.query(Invoice).filter(Invoice.id == invoice_id).first()
-    if not invoice:
-        return None
-    
-    # Get order with customer and medicines
-    order = db.query(Order).options(
-        joinedload(Order.customer),
-        joinedload(Order.order_medicines).joinedload(OrderMedicine.medicine)
-    ).filter(Order.id == invoice.order_id).first()
-    
-    if not order or not order.customer:
+    """The invoice with its order, customer and lines, in one query.
+
+    The result is what /details returns and what /print-data and /print render, so
+    it is built once per request and never round-trips through ORM objects.
+    """
+    rows = db.execute(_INVOICE_DETAILS.where(Invoice.id == invoice_id)).mappings().all()
+    if not rows:
         return None
-    
-    # Prepare order medicines details
-    order_medicines = []
-    for order_med in order.order_medicines:
-        order_medicines.append(OrderMedicineDetail(
-            medicine_name=order_med.medicine.name,
-            quantity=order_med.quantity,
-            unit_price=order_med.unit_price,
-            total_price=order_med.quantity * order_med.unit_price
-        ))
-    
-    # Create detailed invoice
-    invoice_details = InvoiceWithDetails(
-        id=invoice.id,
-        invoice_number=invoice.invoice_number,
-        order_id=invoice.order_id,
-        user_id=invoice.user_id,
-        amount=invoice.amount,
-        tax=invoice.tax,
-        discount=invoice.discount,
-        total_amount=invoice.total_amount,
-        status=invoice.status,
-        notes=invoice.notes,
-        terms=invoice.terms,
-        due_date=invoice.due_date,
-        issued_date=invoice.issued_date,
-        paid_date=invoice.paid_date,
-        created_at=invoice.created_at,
-        updated_at=invoice.updated_at,
-        customer_name=order.customer.name,
-        customer_email=order.customer.email,
-        customer_phone=order.customer.phone,
-        customer_address=order.customer.address,
-        order_date=order.order_date,
-        order_medicines=order_medicines
-    )
-    
-    return invoice_details
+    lines = [_line_detail(row) for row in rows if row["line_id"] is not None]
+    return _invoice_details(rows[0], lines)
+
+# A batch reads invoices and lines separately so the invoice columns aren't repeated on every line
+_PRINT_INVOICES = (
+    select(*_DETAIL_COLUMNS)
+    .select_from(Invoice)
+    .join(Order, Order.id == Invoice.order_id)
+    .join(Customer, Customer.id == Order.customer_id)
+)
+
+_PRINT_LINES = (
+    select(OrderMedicine.order_id, *_LINE_COLUMNS)
+    .join(Medicine, Medicine.id == OrderMedicine.medicine_id)
+    .order_by(OrderMedicine.order_id, OrderMedicine.id)
+)
+
+def fetch_invoices_for_print(db: Session, batch: InvoicePrintBatch) -> List[InvoiceWithDetails]:
+    """Every invoice the batch selects, with its lines, in two queries however many there are"""
+    has_filter = batch.created_from or batch.created_to or batch.status
+    if not batch.invoice_ids and not has_filter:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Give invoice_ids or at least one filter")
+    if batch.created_from and batch.created_to and batch.created_from > batch.created_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="created_from must not be after created_to")
+    if batch.invoice_ids and len(set(batch.invoice_ids)) > PRINT_BATCH_MAX:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {PRINT_BATCH_MAX} invoices per batch")
+
+    stmt = _PRINT_INVOICES
+    if batch.invoice_ids:
+        stmt = stmt.where(Invoice.id.in_(set(batch.invoice_ids)))
+    if batch.created_from:
+        stmt = stmt.where(Invoice.created_at >= datetime.combine(batch.created_from, datetime.min.time()))
+    if batch.created_to:
+        # inclusive of the whole 'to' day
+        stmt = stmt.where(Invoice.created_at < datetime.combine(batch.created_to + timedelta(days=1), datetime.min.time()))
+    if batch.status:
+        stmt = stmt.where(Invoice.status.in_(batch.status))
+    rows = db.execute(stmt.order_by(Invoice.created_at, Invoice.id).limit(PRINT_BATCH_MAX + 1)).mappings().all()
+    if len(rows) > PRINT_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"More than {PRINT_BATCH_MAX} invoices match; narrow the filter",
+        )
+    if not rows:
+        return []
+
+    lines: Dict[int, List[OrderMedicineDetail]] = {row["order_id"]: [] for row in rows}
+    for line in db.execute(_PRINT_LINES.where(OrderMedicine.order_id.in_(lines))).mappings():
+        lines[line["order_id"]].append(_line_detail(line))
+
+    invoices = [_invoice_details(row, lines[row["order_id"]]) for row in rows]
+    if batch.invoice_ids:
+        # In the order they were asked for
+        position = {invoice_id: i for i, invoice_id in reversed(list(enumerate(batch.invoice_ids)))}
+        invoices.sort(key=lambda invoice: position[invoice.id])
+    return invoices
 
-def create_invoice(db: Session, invoice_in: InvoiceCreate, user_id: int) -> Invoice:
+def create_invoice(db: Session, invoice_in: InvoiceCreate, user_id: int, commit: bool = True) -> Invoice:
+    """Invoice an order and mark it completed.
+
+    With ``commit=False`` the writes are only flushed and the caller commits them.
+    """
     # Check if order exists
     order = db.query(Order).filter(Order.id == invoice_in.order_id).first()
     if not order:
@@ -81,6 +147,13 @@ def create_invoice(db: Session, invoice_in: InvoiceCreate, user_id: int) -> Invo
             detail=f"Order with ID {invoice_in.order_id} not found",
         )
     
+    # A cancelled order's stock is back on the shelf, so it can't be billed
+    if order.status == OrderStatus.CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Order with ID {invoice_in.order_id} is cancelled",
+        )
+    
     # Check if invoice for this order already exists
     existing_invoice = fetch_invoice_by_order_id(db, order_id=invoice_in.order_id)
     if existing_invoice:
@@ -89,9 +162,8 @@ def create_invoice(db: Session, invoice_in: InvoiceCreate, user_id: int) -> Invo
             detail=f"Invoice for order ID {invoice_in.order_id} already exists",
         )
     
-    # Generate invoice number with current year
-    current_year = datetime.now().year
-    invoice_number = f"INV-{current_year}-{uuid.uuid4().hex[:8].upper()}"
+    # Sequential per-year number; taken before this transaction writes anything
+    invoice_number = next_invoice_number(db.get_bind())
     
     # Calculate total amount: amount - discount + tax
     total_amount = invoice_in.amount - invoice_in.discount + invoice_in.tax
@@ -118,12 +190,40 @@ def create_invoice(db: Session, invoice_in: InvoiceCreate, user_id: int) -> Invo
         issued_date=datetime.now()
     )
     
-    # Update order status to completed
-    order.status = OrderStatus.COMPLETED
-    db.add(order)
+    # Update order status to completed. The status guard loses to a cancel that
+    # committed since the check above, which has already restocked the order.
+    completed = db.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.status != OrderStatus.CANCELLED)
+        .values(status=OrderStatus.COMPLETED)
+    ).rowcount
+    if not completed:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Order with ID {invoice_in.order_id} is cancelled",
+        )
     
     db.add(db_invoice)
-    db.commit()
+    try:
+        db.flush()  # Assigns the id
+    except IntegrityError:
+        db.rollback()
+        # Either a concurrent request invoiced the order first, or the user doesn't exist
+        if fetch_invoice_by_order_id(db, order_id=invoice_in.order_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invoice for order ID {invoice_in.order_id} already exists",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found",
+        )
+    apply_invoices(db, [db_invoice.id])
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     db.refresh(db_invoice)
     return db_invoice
 
@@ -136,6 +236,8 @@ def update_invoice(db: Session, invoice_id: int, invoice_in: InvoiceUpdate) -> I
         )
     
     update_data = invoice_in.model_dump(exclude_unset=True)
+    # Off the rollup as it was, back on below as updated
+    apply_invoices(db, [invoice_id], sign=-1)
     
     for field, value in update_data.items():
         if field == "paid_date" and value and db_invoice.status != InvoiceStatus.PAID:
@@ -148,6 +250,7 @@ def update_invoice(db: Session, invoice_id: int, invoice_in: InvoiceUpdate) -> I
         db_invoice.total_amount = db_invoice.amount - db_invoice.discount + db_invoice.tax
     
     db.add(db_invoice)
+    apply_invoices(db, [invoice_id])
     db.commit()
     db.refresh(db_invoice)
     return db_invoice
@@ -167,12 +270,13 @@ def delete_invoice(db: Session, invoice_id: int) -> dict:
             detail="Cannot delete a paid invoice",
         )
     
+    apply_invoices(db, [invoice_id], sign=-1)
     db.delete(db_invoice)
     db.commit()
     return {"detail": "Invoice deleted successfully"}
 
-def mark_invoice_as_paid(db: Session, invoice_id: int) -> Invoice:
-    """Mark an invoice as paid"""
+def mark_invoice_as_paid(db: Session, invoice_id: int, commit: bool = True) -> Invoice:
+    """Mark an invoice as paid; with ``commit=False`` the caller commits"""
     db_invoice = fetch_invoice_by_id(db, invoice_id=invoice_id)
     if not db_invoice:
         raise HTTPException(
@@ -190,25 +294,76 @@ def mark_invoice_as_paid(db: Session, invoice_id: int) -> Invoice:
     db_invoice.paid_date = datetime.now()
     
     db.add(db_invoice)
-    db.commit()
+    # Its tax and discount are already on the rollup; only the payment is new
+    apply_invoices(db, [invoice_id], payments_only=True)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     db.refresh(db_invoice)
     return db_invoice
 
 def get_overdue_invoices(db: Session) -> List[Invoice]:
-    """Get all overdue invoices"""
+    """Invoices marked overdue, plus unpaid ones past due that the sweeper hasn't reached yet"""
     current_date = datetime.now()
     return db.query(Invoice).filter(
-        Invoice.due_date < current_date,
-        Invoice.status.in_([InvoiceStatus.SENT, InvoiceStatus.DRAFT])
-    ).all()
+        or_(
+            Invoice.status == InvoiceStatus.OVERDUE,
+            and_(
+                Invoice.status.in_([InvoiceStatus.SENT, InvoiceStatus.DRAFT]),
+                Invoice.due_date < current_date,
+            ),
+        )
+    ).order_by(Invoice.due_date, Invoice.id).all()
 
-def update_overdue_invoices(db: Session) -> int:
-    """Update overdue invoice statuses and return count"""
-    current_date = datetime.now()
-    overdue_count = db.query(Invoice).filter(
-        Invoice.due_date < current_date,
-        Invoice.status == InvoiceStatus.SENT
-    ).update({"status": InvoiceStatus.OVERDUE})
-    
-    db.commit()
-    return overdue_count
\ No newline at end of file
+def update_overdue_invoices(db: Session, chunk_size: int = 500, now: Optional[datetime] = None) -> int:
+    """Mark sent invoices past their due date as overdue and return how many changed.
+
+    Works through the (status, due_date) index ``chunk_size`` rows at a time and
+    commits after each chunk, so no single write transaction holds the lock for long.
+    """
+    current_date = now or datetime.now()
+    updated = 0
+    while True:
+        ids = list(db.execute(
+            select(Invoice.id)
+            .where(Invoice.status == InvoiceStatus.SENT, Invoice.due_date < current_date)
+            .order_by(Invoice.due_date)
+            .limit(chunk_size)
+        ).scalars())
+        if not ids:
+            return updated
+        # Status re-checked so an invoice paid since the select is left alone
+        updated += db.execute(
+            update(Invoice)
+            .where(Invoice.id.in_(ids), Invoice.status == InvoiceStatus.SENT)
+            .values(status=InvoiceStatus.OVERDUE)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if len(ids) < chunk_size:
+            return updated
+
+def next_invoice_due_date(db: Session) -> Optional[datetime]:
+    """The earliest due date among sent invoices, i.e. when the next one can become overdue"""
+    return db.execute(
+        select(func.min(Invoice.due_date)).where(Invoice.status == InvoiceStatus.SENT)
+    ).scalar()
+
+
+# Async variants used when USE_ASYNC_DB is enabled (see Views/order.py)
+async def fetch_invoices_page_async(db: AsyncSession, limit: int, after: Optional[list] = None) -> Tuple[List[Invoice], Optional[str]]:
+    return await keyset_page_async(db, select(Invoice), [Invoice.created_at, Invoice.id], limit, after, descending=True)
+
+async def fetch_invoice_with_details_async(db: AsyncSession, invoice_id: int) -> Optional[InvoiceWithDetails]:
+    return await db.run_sync(fetch_invoice_with_details, invoice_id)
+
+async def create_invoice_async(db: AsyncSession, invoice_in: InvoiceCreate, user_id: int,
+                                commit: bool = True) -> Invoice:
+    return await db.run_sync(create_invoice, invoice_in, user_id, commit)
+
+async def get_overdue_invoices_async(db: AsyncSession) -> List[Invoice]:
+    return await db.run_sync(get_overdue_invoices)
+
+async def mark_invoice_as_paid_async(db: AsyncSession, invoice_id: int, commit: bool = True) -> Invoice:
+    return await db.run_sync(mark_invoice_as_paid, invoice_id, commit)
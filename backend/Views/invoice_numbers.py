@@ -0,0 +1,79 @@
+"""Sequential per-year invoice numbers (INV-2026-000123).
+
+``invoice_sequences`` holds, per year, the next number nobody has reserved. A worker
+reserves INVOICE_NUMBER_BLOCK numbers at a time by bumping that counter in one short
+transaction of its own, then hands them out from memory. The bump is a single UPDATE,
+so the database serializes concurrent reservations and two processes can never get
+overlapping blocks. Numbers only go unused when a worker exits (or a create fails)
+before using its whole block, so a crash leaves a gap of at most one block.
+
+Numbers rise within a worker, so new rows land at the right-hand end of the unique
+index on invoice_number instead of at random positions.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from Models.invoice import InvoiceSequence
+
+INVOICE_NUMBER_BLOCK = int(os.getenv("INVOICE_NUMBER_BLOCK", "20"))
+INVOICE_NUMBER_DIGITS = 6
+
+_sequences = InvoiceSequence.__table__
+_lock = threading.Lock()
+# year -> (next number to hand out, end of the reserved block, exclusive)
+_blocks: Dict[int, Tuple[int, int]] = {}
+
+
+def format_invoice_number(year: int, number: int) -> str:
+    return f"INV-{year}-{number:0{INVOICE_NUMBER_DIGITS}d}"
+
+
+def _bump(conn: Connection, year: int, size: int) -> Optional[int]:
+    """Advance the counter by ``size``; returns the new next_value, or None if there is no row"""
+    stmt = (
+        update(_sequences)
+        .where(_sequences.c.year == year)
+        .values(next_value=_sequences.c.next_value + size)
+    )
+    if conn.dialect.update_returning:
+        return conn.execute(stmt.returning(_sequences.c.next_value)).scalar()
+    if conn.execute(stmt).rowcount == 0:
+        return None
+    # The UPDATE holds the row lock until commit, so this reads our own increment
+    return conn.execute(select(_sequences.c.next_value).where(_sequences.c.year == year)).scalar()
+
+
+def reserve_block(engine: Engine, year: int, size: int = INVOICE_NUMBER_BLOCK) -> Tuple[int, int]:
+    """Reserve ``size`` numbers for ``year`` and return them as [start, end)"""
+    while True:
+        try:
+            with engine.begin() as conn:
+                end = _bump(conn, year, size)
+                if end is None:
+                    conn.execute(insert(_sequences).values(year=year, next_value=1 + size))
+                    end = 1 + size
+            return end - size, end
+        except IntegrityError:
+            # Another worker created the year's row first; bump that one instead
+            continue
+
+
+def next_invoice_number(engine: Engine, year: Optional[int] = None) -> str:
+    """The next invoice number for ``year`` (default: this year).
+
+    Uses its own connection, so call it before the caller's transaction writes
+    anything: on SQLite, a second writer would otherwise wait on the caller's lock.
+    """
+    year = year or datetime.now().year
+    with _lock:
+        start, end = _blocks.get(year, (0, 0))
+        if start >= end:
+            start, end = reserve_block(engine, year)
+        _blocks[year] = (start + 1, end)
+    return format_invoice_number(year, start)
@@ -0,0 +1,325 @@
+"""PDF invoices for GET /invoices/{id}/pdf.
+
+The layout runs in a ProcessPoolExecutor of PDF_WORKERS processes, so a long
+invoice never holds the GIL that the API threads need. At most PDF_QUEUE_DEPTH
+renders wait behind the busy workers. Further requests get 503 at once instead of
+piling up. The route awaits the render, so a waiting request holds no threadpool
+worker; only its database reads run on one. Finished files are kept in
+PDF_CACHE_DIR, named by invoice id and a hash of the invoice's version token (see
+Views.render_cache) and the layout version. A cached file is served after a single
+version lookup, and an edit makes the old file unreachable (it is deleted when the
+new one is written).
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from Views.invoice import fetch_invoice_with_details
+from Views.pdf_writer import PdfPage, PdfWriter, wrap_text
+from Views.render_cache import invoice_version
+
+logger = logging.getLogger("mediq.invoice_pdf")
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+PDF_QUEUE_DEPTH = int(os.getenv("PDF_QUEUE_DEPTH", "8"))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "30"))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "mediq-pdf")
+
+# Bump when the layout changes so cached files from the old layout are not served
+PDF_LAYOUT_VERSION = "1"
+
+_MARGIN = 50
+_MUTED = (0.4, 0.4, 0.4)
+_ACCENT = (0.15, 0.39, 0.92)
+_RULE = (0.85, 0.85, 0.85)
+_HEADER_FILL = (0.95, 0.96, 0.97)
+
+COMPANY = [
+    "123 Health Street, Medical City, MC 12345",
+    "Phone: +1 (555) 123-4567",
+    "Email: info@mediq.com",
+    "Website: www.mediq.com",
+]
+
+
+def _money(value: float) -> str:
+    # The rupee sign isn't in the standard PDF fonts' encoding
+    return f"Rs. {value:,.2f}"
+
+
+def _longdate(value: Optional[datetime]) -> str:
+    return value.strftime("%B %d, %Y") if value else ""
+
+
+class _Layout:
+    """Cursor over the pages of one invoice, starting a new page when one fills up"""
+
+    def __init__(self, writer: PdfWriter):
+        self.writer = writer
+        self.page: PdfPage = writer.add_page()
+        self.y = writer.page_height - _MARGIN
+        self.left = _MARGIN
+        self.right = writer.page_width - _MARGIN
+
+    def ensure(self, height: float) -> bool:
+        """Start a new page unless ``height`` more points fit; True if it did"""
+        if self.y - height >= _MARGIN + 20:
+            return False
+        self.page = self.writer.add_page()
+        self.y = self.writer.page_height - _MARGIN
+        return True
+
+
+def _table_header(layout: _Layout, columns: List[tuple]) -> None:
+    layout.page.rect(layout.left, layout.y - 18, layout.right - layout.left, 18, fill=_HEADER_FILL)
+    for title, x, align in columns:
+        layout.page.text(x, layout.y - 12.5, title, size=9, bold=True, align=align)
+    layout.y -= 18
+
+
+def layout_invoice_pdf(invoice: dict) -> bytes:
+    """Lay out one invoice (an InvoiceWithDetails dumped to a dict) as PDF bytes.
+
+    Runs in the worker processes, so it takes and returns only plain data.
+    """
+    writer = PdfWriter(title=f"Invoice {invoice['invoice_number']}")
+    layout = _Layout(writer)
+    page, left, right = layout.page, layout.left, layout.right
+    status_value = getattr(invoice["status"], "value", invoice["status"])
+
+    # Header
+    page.text(left, layout.y - 20, "MediQ Pharmacy", size=20, bold=True, color=_ACCENT)
+    for i, line in enumerate(COMPANY):
+        page.text(left, layout.y - 38 - i * 12, line, size=9, color=_MUTED)
+    page.text(right, layout.y - 20, "INVOICE", size=18, bold=True, align="right")
+    page.text(right, layout.y - 38, invoice["invoice_number"], size=10, bold=True, align="right")
+    page.text(right, layout.y - 52, status_value.upper(), size=9, bold=True, align="right", color=_ACCENT)
+    layout.y -= 38 + len(COMPANY) * 12 + 10
+    page.line(left, layout.y, right, layout.y, width=1.5, color=_ACCENT)
+    layout.y -= 24
+
+    # Bill to / invoice information
+    middle = left + (right - left) / 2 + 10
+    bill_to = [invoice["customer_name"]] + [
+        invoice[field] for field in ("customer_email", "customer_phone", "customer_address") if invoice[field]
+    ]
+    info = [
+        ("Invoice Date:", _longdate(invoice["issued_date"])),
+        ("Due Date:", _longdate(invoice["due_date"])) if invoice["due_date"] else None,
+        ("Order ID:", f"#{invoice['order_id']}"),
+        ("Order Date:", _longdate(invoice["order_date"])),
+        ("Payment Date:", _longdate(invoice["paid_date"])) if invoice["paid_date"] else None,
+    ]
+    info = [item for item in info if item]
+    page.text(left, layout.y, "Bill To:", size=11, bold=True)
+    page.text(middle, layout.y, "Invoice Information:", size=11, bold=True)
+    y = layout.y - 16
+    for i, line in enumerate(bill_to):
+        for wrapped in wrap_text(line, middle - left - 20, 10, bold=i == 0):
+            page.text(left, y, wrapped, size=10, bold=i == 0)
+            y -= 13
+    info_y = layout.y - 16
+    for label, value in info:
+        page.text(middle, info_y, label, size=10, bold=True)
+        page.text(middle + 90, info_y, value, size=10)
+        info_y -= 13
+    layout.y = min(y, info_y) - 18
+
+    # Lines
+    qty_x, price_x, total_x = right - 190, right - 90, right - 6
+    columns = [("Medicine", left + 6, "left"), ("Quantity", qty_x, "right"),
+               ("Unit Price", price_x, "right"), ("Total", total_x, "right")]
+    name_width = qty_x - left - 60
+    _table_header(layout, columns)
+    for item in invoice["order_medicines"]:
+        names = wrap_text(item["medicine_name"], name_width, 10)
+        height = 8 + 13 * len(names)
+        if layout.ensure(height):
+            _table_header(layout, columns)
+        page = layout.page
+        y = layout.y - 14
+        for name in names:
+            page.text(left + 6, y, name, size=10)
+            y -= 13
+        page.text(qty_x, layout.y - 14, str(item["quantity"]), size=10, align="right")
+        page.text(price_x, layout.y - 14, _money(item["unit_price"]), size=10, align="right")
+        page.text(total_x, layout.y - 14, _money(item["total_price"]), size=10, align="right")
+        layout.y -= height
+        page.line(left, layout.y, right, layout.y, color=_RULE)
+
+    # Totals
+    subtotal = sum(item["total_price"] for item in invoice["order_medicines"])
+    totals = [("Subtotal:", _money(subtotal))]
+    if invoice["discount"] > 0:
+        totals.append(("Discount:", "-" + _money(invoice["discount"])))
+    if invoice["tax"] > 0:
+        totals.append(("Tax:", _money(invoice["tax"])))
+    layout.ensure(16 * len(totals) + 40)
+    page = layout.page
+    layout.y -= 20
+    label_x = right - 200
+    for label, value in totals:
+        page.text(label_x, layout.y, label, size=10)
+        page.text(right - 6, layout.y, value, size=10, align="right")
+        layout.y -= 16
+    page.line(label_x, layout.y + 10, right, layout.y + 10, width=1)
+    layout.y -= 6
+    page.text(label_x, layout.y, "Total Amount:", size=12, bold=True)
+    page.text(right - 6, layout.y, _money(invoice["total_amount"]), size=12, bold=True, align="right")
+    layout.y -= 30
+
+    # Notes and terms
+    for heading, text in (("Notes:", invoice["notes"]), ("Terms & Conditions:", invoice["terms"])):
+        if not text:
+            continue
+        lines = wrap_text(text, right - left, 9)
+        layout.ensure(30 + 12 * min(len(lines), 3))
+        layout.page.text(left, layout.y, heading, size=10, bold=True)
+        layout.y -= 14
+        for line in lines:
+            layout.ensure(12)
+            layout.page.text(left, layout.y, line, size=9, color=_MUTED)
+            layout.y -= 12
+        layout.y -= 10
+
+    # Footer on the last page, page numbers on every page
+    layout.ensure(40)
+    layout.page.text(writer.page_width / 2, layout.y - 10, "Thank you for your business!", size=10,
+                     align="center")
+    layout.page.text(writer.page_width / 2, layout.y - 24,
+                     "If you have any questions about this invoice, please contact us at info@mediq.com",
+                     size=8, align="center", color=_MUTED)
+    for number, pdf_page in enumerate(writer.pages, start=1):
+        pdf_page.text(right, _MARGIN / 2, f"{invoice['invoice_number']}  -  Page {number} of {len(writer.pages)}",
+                      size=8, align="right", color=_MUTED)
+    return writer.to_bytes()
+
+
+class CachedPdf(NamedTuple):
+    path: str
+    etag: str
+    filename: str
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+# Renders running or waiting for a worker, bounded so a burst can't queue without limit
+_slots = threading.BoundedSemaphore(PDF_WORKERS + PDF_QUEUE_DEPTH)
+# Renders in flight by target path, so concurrent requests for one invoice share a render
+_inflight_lock = threading.Lock()
+_inflight: Dict[str, Future] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forked copies of a threaded server process (engines, locks) are unsafe
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _prune_old_versions(invoice_id: int, keep: str) -> None:
+    prefix = f"invoice-{invoice_id}-"
+    try:
+        names = os.listdir(PDF_CACHE_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.startswith(prefix) and name.endswith(".pdf") and name != keep:
+            try:
+                os.unlink(os.path.join(PDF_CACHE_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+async def _render(path: str, invoice: dict) -> None:
+    """Render ``invoice`` to ``path`` on the pool, sharing a render already in flight"""
+    with _inflight_lock:
+        future = _inflight.get(path)
+        owner = future is None
+        if owner:
+            if not _slots.acquire(blocking=False):
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many PDFs are being rendered; try again shortly",
+                    headers={"Retry-After": "5"},
+                )
+            try:
+                future = _get_pool().submit(layout_invoice_pdf, invoice)
+            except BaseException:
+                _slots.release()
+                raise
+            _inflight[path] = future
+            future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        # Shielded, so a timeout or a client disconnect doesn't cancel a render other requests share
+        data = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), PDF_RENDER_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="PDF rendering timed out",
+                            headers={"Retry-After": "5"})
+    except BrokenProcessPool:
+        # A worker died (killed, out of memory); start a fresh pool for the next request
+        logger.exception("PDF worker pool broke; restarting it")
+        shutdown_pdf_pool()
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="PDF rendering failed",
+                            headers={"Retry-After": "5"})
+    finally:
+        if owner:
+            with _inflight_lock:
+                _inflight.pop(path, None)
+    # Whoever gets here first writes it; the replace is atomic, so a second write is harmless
+    if not os.path.exists(path):
+        await run_in_threadpool(_write_atomically, path, data)
+
+
+async def invoice_pdf(db: Session, invoice_id: int) -> Optional[CachedPdf]:
+    """The cached PDF for the current version of ``invoice_id``, rendering it if needed"""
+    row = await run_in_threadpool(invoice_version, db, invoice_id)
+    if row is None:
+        return None
+    digest = hashlib.sha256(repr((PDF_LAYOUT_VERSION, tuple(row))).encode()).hexdigest()[:24]
+    name = f"invoice-{invoice_id}-{digest}.pdf"
+    cached = CachedPdf(os.path.join(PDF_CACHE_DIR, name), f'"{digest}"', f"{row.invoice_number}.pdf")
+    if os.path.exists(cached.path):
+        return cached
+
+    invoice = await run_in_threadpool(fetch_invoice_with_details, db, invoice_id)
+    if invoice is None:
+        return None
+    await _render(cached.path, invoice.model_dump())
+    await run_in_threadpool(_prune_old_versions, invoice_id, name)
+    return cached
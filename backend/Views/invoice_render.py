@@ -0,0 +1,169 @@
+"""Invoice HTML rendering.
+
+The Jinja2 environment is built once per process: templates are compiled on first use
+(or by warm_templates() at startup), kept in the environment's cache and never
+re-checked on disk, and the compiled bytecode is persisted so other workers and
+restarts skip compilation too. Autoescaping is on, so customer-supplied fields such as
+notes can't inject markup.
+
+Rendering is 3-5x slower than the f-string this replaced (bench/invoice_render.py),
+so the move to templates did not meet its speed goal. Compilation isn't the cost: it
+happens once and get_template() is a dict lookup. What remains is Jinja itself, about
+40µs of context and include set-up per invoice plus autoescaping, which runs every
+value of every item row through markupsafe. The f-string escaped nothing. Repeat
+prints come from the render cache.
+
+The stylesheet is served from /static with a content hash in its URL so browsers cache
+it instead of receiving it inline with every invoice. Files in a batch zip are read
+offline, so those get the stylesheet inline instead.
+"""
+import hashlib
+import io
+import os
+import zipfile
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+from Schemas.invoice import InvoiceWithDetails
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")  # default: a per-user temp directory
+
+INVOICE_TEMPLATE = "invoice.html"
+INVOICE_BATCH_TEMPLATE = "invoice_batch.html"
+INVOICE_STYLESHEET = "invoice.css"
+
+
+def _money(value: float) -> str:
+    # A plain str, escaped by autoescape like any other value: wrapping it in Markup
+    # here costs more than escaping the few characters of a formatted number
+    return f"₹{value:.2f}"
+
+
+def _subtotal(items) -> float:
+    # The sum filter's attribute lookup costs more than the item rows' own lookups
+    return sum(item.total_price for item in items)
+
+
+def _longdate(value: Optional[datetime]) -> str:
+    return value.strftime("%B %d, %Y") if value else ""
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache:
+    if TEMPLATE_CACHE_DIR:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    return FileSystemBytecodeCache()
+
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    bytecode_cache=_bytecode_cache(),
+    auto_reload=False,
+)
+env.filters["money"] = _money
+env.filters["longdate"] = _longdate
+env.filters["subtotal"] = _subtotal
+
+
+def _file_version(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+STYLESHEET_VERSION = _file_version(os.path.join(STATIC_DIR, INVOICE_STYLESHEET))
+
+# Bytes handed to a streaming response at a time, rather than one tiny chunk per template fragment
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _stylesheet_url(static_url: str) -> str:
+    return f"{static_url.rstrip('/')}/{INVOICE_STYLESHEET}?v={STYLESHEET_VERSION}"
+
+
+def _inline_stylesheet() -> Markup:
+    with open(os.path.join(STATIC_DIR, INVOICE_STYLESHEET), encoding="utf-8") as f:
+        return Markup(f.read())
+
+
+def warm_templates() -> None:
+    """Compile the invoice templates now rather than on the first print request"""
+    env.get_template(INVOICE_TEMPLATE)
+    env.get_template(INVOICE_BATCH_TEMPLATE)
+
+
+def render_invoice_html(invoice: InvoiceWithDetails, static_url: str = "/static",
+                        inline_stylesheet: Optional[Markup] = None) -> str:
+    """Render the printable invoice; ``static_url`` is where /static is reachable"""
+    return env.get_template(INVOICE_TEMPLATE).render(
+        invoice=invoice,
+        stylesheet_url=_stylesheet_url(static_url),
+        inline_stylesheet=inline_stylesheet,
+    )
+
+
+def _buffered(chunks: Iterable[str], size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    buffer: List[str] = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def render_invoice_batch(invoices: List[InvoiceWithDetails], static_url: str = "/static") -> Iterator[str]:
+    """Stream one HTML document with every invoice on its own printed page"""
+    stream = env.get_template(INVOICE_BATCH_TEMPLATE).generate(
+        invoices=invoices,
+        count=len(invoices),
+        stylesheet_url=_stylesheet_url(static_url),
+    )
+    return _buffered(stream)
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink for ZipFile that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_name(invoice: InvoiceWithDetails) -> str:
+    return invoice.invoice_number.replace("/", "-").replace("\\", "-") + ".html"
+
+
+def stream_invoice_zip(invoices: List[InvoiceWithDetails]) -> Iterator[bytes]:
+    """Stream a zip of standalone HTML files, one per invoice, built as it is sent"""
+    stylesheet = _inline_stylesheet()
+    sink = _ZipStream()
+    # The sink can't seek, so ZipFile writes each entry's sizes after its data
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for invoice in invoices:
+            archive.writestr(_zip_name(invoice), render_invoice_html(invoice, inline_stylesheet=stylesheet))
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()  # the central directory
@@ -0,0 +1,136 @@
+"""Invoice totals per status for GET /invoices/stats.
+
+One grouped aggregate over ``invoices`` gives each status's count and amount, and how
+many of those invoices are overdue: marked OVERDUE, or sent/draft past their due date
+(the same rule as GET /invoices/overdue). Results are cached per date range for
+INVOICE_STATS_TTL_SECONDS. A Session hook drops the whole cache when a transaction
+that wrote invoices commits in this process, so only writes from other workers (and
+invoices falling past due) can take up to the TTL to show.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, event, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from Models.invoice import Invoice, InvoiceStatus
+from Schemas.invoice import InvoiceStats, InvoiceStatusTotals
+
+INVOICE_STATS_TTL_SECONDS = float(os.getenv("INVOICE_STATS_TTL_SECONDS", "10"))
+# Distinct date ranges kept at once; the cache starts over when full
+_MAX_ENTRIES = 256
+
+_WRITTEN = "invoice_stats_written"
+
+_lock = threading.Lock()
+# (created_from, created_to) -> (stats, time computed)
+_cache: Dict[Tuple[Optional[date], Optional[date]], Tuple[InvoiceStats, float]] = {}
+# Bumped on every invalidation, so a result computed before a commit isn't stored after it
+_generation = 0
+
+
+def _compute(db: Session, created_from: Optional[date], created_to: Optional[date]) -> InvoiceStats:
+    overdue = or_(
+        Invoice.status == InvoiceStatus.OVERDUE,
+        and_(
+            Invoice.status.in_([InvoiceStatus.SENT, InvoiceStatus.DRAFT]),
+            Invoice.due_date < datetime.now(),
+        ),
+    )
+    stmt = select(
+        Invoice.status,
+        func.count(),
+        func.coalesce(func.sum(Invoice.total_amount), 0),
+        func.coalesce(func.sum(case((overdue, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((overdue, Invoice.total_amount), else_=0)), 0),
+    ).group_by(Invoice.status)
+    if created_from:
+        stmt = stmt.where(Invoice.created_at >= datetime.combine(created_from, datetime.min.time()))
+    if created_to:
+        # Inclusive: everything before the start of the next day
+        stmt = stmt.where(Invoice.created_at < datetime.combine(created_to + timedelta(days=1), datetime.min.time()))
+
+    rows = {row[0]: row[1:] for row in db.execute(stmt)}
+    by_status = []
+    overdue_count, overdue_amount = 0, 0.0
+    for invoice_status in InvoiceStatus:
+        count, amount, late_count, late_amount = rows.get(invoice_status, (0, 0, 0, 0))
+        by_status.append(InvoiceStatusTotals(status=invoice_status, count=count, total_amount=round(amount, 2)))
+        overdue_count += late_count
+        overdue_amount += late_amount
+    return InvoiceStats(
+        created_from=created_from,
+        created_to=created_to,
+        count=sum(entry.count for entry in by_status),
+        total_amount=round(sum(entry.total_amount for entry in by_status), 2),
+        overdue_count=overdue_count,
+        overdue_amount=round(overdue_amount, 2),
+        by_status=by_status,
+    )
+
+
+def fetch_invoice_stats(db: Session, created_from: Optional[date] = None,
+                        created_to: Optional[date] = None) -> InvoiceStats:
+    if created_from and created_to and created_from > created_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="created_from must not be after created_to")
+
+    key = (created_from, created_to)
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(key)
+        generation = _generation
+    if cached is not None and now - cached[1] < INVOICE_STATS_TTL_SECONDS:
+        return cached[0]
+
+    stats = _compute(db, created_from, created_to)
+    with _lock:
+        if generation == _generation:
+            if len(_cache) >= _MAX_ENTRIES:
+                _cache.clear()
+            _cache[key] = (stats, now)
+    return stats
+
+
+def clear_invoice_stats() -> None:
+    global _generation
+    with _lock:
+        _cache.clear()
+        _generation += 1
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Invoice):
+            session.info[_WRITTEN] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_writes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) == Invoice.__tablename__:
+        orm_execute_state.session.info[_WRITTEN] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    if session.info.pop(_WRITTEN, False):
+        clear_invoice_stats()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written(session: Session) -> None:
+    session.info.pop(_WRITTEN, None)
+
+
+async def fetch_invoice_stats_async(db: AsyncSession, created_from: Optional[date] = None,
+                                    created_to: Optional[date] = None) -> InvoiceStats:
+    return await db.run_sync(fetch_invoice_stats, created_from, created_to)
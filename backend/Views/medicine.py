@@ -1,7 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from databases.pagination import keyset_page
+
 from Models.medicine import Medicine
 from Schemas.medicine import MedicineCreate, MedicineUpdate
 from Models.stock import Stock
@@ -15,8 +17,8 @@ def fetch_medicine_by_name(db: Session, name: str) -> Optional[Medicine]:
     return db.query(Medicine).filter(Medicine.name == name).first()
 
 
-def fetch_all_medicines(db: Session) -> List[Medicine]:
-    return db.query(Medicine).all()
+def fetch_medicines_page(db: Session, limit: int, after: Optional[list] = None) -> Tuple[List[Medicine], Optional[str]]:
+    return keyset_page(db, db.query(Medicine), [Medicine.id], limit, after)
 
 def create_new_medicine(db: Session, medicine_data: MedicineCreate) -> Medicine:
     new_medicine = Medicine(
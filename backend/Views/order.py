@@ -1,24 +1,127 @@
-from typing import List, Optional
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import and_, bindparam, delete, exists, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from Models.order import Order, OrderMedicine
+from databases.pagination import keyset_rows, keyset_rows_async
+
+from Models.customer import Customer
+from Models.invoice import Invoice
+from Models.order import Order, OrderMedicine, OrderStatus
 from Models.medicine import Medicine
 from Models.stock import Stock
 
-from Schemas.order import OrderCreate, OrderUpdate
+from Schemas.order import OrderCancel, OrderCreate, OrderMedicineCreate, OrderUpdate
+from Views.daily_sales import apply_orders
 
-def fetch_all_orders(db: Session) -> List[Order]:
-    try:
-        return db.query(Order).options(
-            joinedload(Order.customer),
-            joinedload(Order.order_medicines).joinedload(OrderMedicine.medicine),
-            joinedload(Order.invoice)
-        ).all()
-    except Exception as e:
-        # If joinedload fails, try without it
-        print(f"Error in fetch_all_orders: {str(e)}")
-        return db.query(Order).all()
+# Orders validated and written per transaction by the bulk ingestion endpoint
+ORDER_BULK_CHUNK_SIZE = int(os.getenv("ORDER_BULK_CHUNK_SIZE", "500"))
+
+# Column-only projections behind GET /orders and GET /orders/{id}. Rows are mapped
+# straight into response dicts: nothing enters the identity map and there is no
+# joinedload cartesian product to de-duplicate. Lines and invoices come from one
+# batched query each, so a page costs three statements however many orders it holds.
+_ORDER_SUMMARY = select(
+    Order.id,
+    Order.customer_id,
+    Order.total_amount,
+    Order.order_date,
+    Order.status,
+    Customer.id.label("customer__id"),
+    Customer.name.label("customer__name"),
+    Customer.email.label("customer__email"),
+    Customer.phone.label("customer__phone"),
+    Customer.address.label("customer__address"),
+).outerjoin(Customer, Customer.id == Order.customer_id)
+
+_ORDER_LINES = select(
+    OrderMedicine.id,
+    OrderMedicine.order_id,
+    OrderMedicine.medicine_id,
+    OrderMedicine.quantity,
+    OrderMedicine.unit_price,
+    Medicine.id.label("medicine__id"),
+    Medicine.name.label("medicine__name"),
+    Medicine.price.label("medicine__price"),
+).outerjoin(Medicine, Medicine.id == OrderMedicine.medicine_id)
+
+_ORDER_INVOICES = select(Invoice.__table__)
+
+
+def _lines_and_invoices_stmts(order_ids: List[int]):
+    lines = _ORDER_LINES.where(OrderMedicine.order_id.in_(order_ids)).order_by(OrderMedicine.id)
+    return lines, _ORDER_INVOICES.where(Invoice.order_id.in_(order_ids))
+
+
+def _order_dicts(rows, line_rows, invoice_rows) -> List[dict]:
+    lines: Dict[int, List[dict]] = defaultdict(list)
+    for line in line_rows:
+        lines[line["order_id"]].append({
+            "id": line["id"],
+            "order_id": line["order_id"],
+            "medicine_id": line["medicine_id"],
+            "quantity": line["quantity"],
+            "unit_price": line["unit_price"],
+            "medicine": (
+                {"id": line["medicine__id"], "name": line["medicine__name"], "price": line["medicine__price"]}
+                if line["medicine__id"] is not None else None
+            ),
+        })
+    invoices = {invoice["order_id"]: dict(invoice) for invoice in invoice_rows}
+
+    return [
+        {
+            "id": row["id"],
+            "customer_id": row["customer_id"],
+            "total_amount": row["total_amount"],
+            "order_date": row["order_date"],
+            "status": getattr(row["status"], "value", row["status"]),
+            "customer": (
+                {
+                    "id": row["customer__id"],
+                    "name": row["customer__name"],
+                    "email": row["customer__email"],
+                    "phone": row["customer__phone"],
+                    "address": row["customer__address"],
+                }
+                if row["customer__id"] is not None else None
+            ),
+            "order_medicines": lines.get(row["id"], []),
+            "invoice": invoices.get(row["id"]),
+        }
+        for row in rows
+    ]
+
+
+def _map_order_rows(db: Session, rows) -> List[dict]:
+    if not rows:
+        return []
+    lines, invoices = _lines_and_invoices_stmts([row["id"] for row in rows])
+    return _order_dicts(rows, db.execute(lines).mappings(), db.execute(invoices).mappings())
+
+
+async def _map_order_rows_async(db: AsyncSession, rows) -> List[dict]:
+    if not rows:
+        return []
+    lines, invoices = _lines_and_invoices_stmts([row["id"] for row in rows])
+    line_rows = (await db.execute(lines)).mappings().all()
+    invoice_rows = (await db.execute(invoices)).mappings().all()
+    return _order_dicts(rows, line_rows, invoice_rows)
+
+
+def fetch_order_summaries_page(db: Session, limit: int, after: Optional[list] = None,
+                               descending: bool = False) -> Tuple[List[dict], Optional[str]]:
+    rows, next_cursor = keyset_rows(db, _ORDER_SUMMARY, [Order.id], limit, after, descending=descending)
+    return _map_order_rows(db, rows), next_cursor
+
+def fetch_order_summary(db: Session, order_id: int) -> Optional[dict]:
+    row = db.execute(_ORDER_SUMMARY.where(Order.id == order_id)).mappings().first()
+    return _map_order_rows(db, [row])[0] if row else None
 
 def fetch_order_by_id(db: Session, order_id: int) -> Optional[Order]:
     return db.query(Order).filter(Order.id == order_id).first()
@@ -32,60 +135,287 @@ def fetch_order_with_details(db: Session, order_id: int) -> Optional[Order]:
 
 
 
-def create_order(db: Session, order_in: OrderCreate) -> Order:
-    # Create the order first
-    db_order = Order(
-        customer_id=order_in.customer_id,
-    )
-    db.add(db_order)
-    db.flush()  # Get the order ID without committing yet
-    
-    total_amount = 0.0
-    
-    # Add the medicines to the order
-    for item in order_in.order_medicines:
-        # Get the medicine to check price and stock
-        medicine = db.query(Medicine).filter(Medicine.id == item.medicine_id).first()
+def _stocks_by_medicine(db: Session, medicine_ids) -> Dict[int, Stock]:
+    if not medicine_ids:
+        return {}
+    return {
+        stock.medicine_id: stock
+        for stock in db.query(Stock).filter(Stock.medicine_id.in_(medicine_ids))
+    }
+
+def _medicines_by_id(db: Session, medicine_ids) -> Dict[int, Medicine]:
+    if not medicine_ids:
+        return {}
+    return {
+        medicine.id: medicine
+        for medicine in db.query(Medicine).filter(Medicine.id.in_(medicine_ids))
+    }
+
+def _resolve_line_items(
+    db: Session,
+    items: List[OrderMedicineCreate],
+    available: Dict[int, int],
+    medicines: Optional[Dict[int, Medicine]] = None,
+) -> Tuple[List[dict], float, Dict[int, int]]:
+    """Validate and price order lines in memory.
+
+    Medicines are fetched with one IN query unless ``medicines`` is given;
+    ``available`` maps medicine_id to the quantity that may be sold. Returns the line
+    rows to insert, the order total and the quantity requested per medicine.
+    """
+    if medicines is None:
+        medicines = _medicines_by_id(db, {item.medicine_id for item in items})
+
+    # Repeated medicines in one order draw from the same stock row
+    requested: Dict[int, int] = defaultdict(int)
+    for item in items:
+        medicine = medicines.get(item.medicine_id)
         if not medicine:
-            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Medicine with ID {item.medicine_id} not found",
             )
-        
-        # Check if there's enough stock
-        stock = db.query(Stock).filter(Stock.medicine_id == item.medicine_id).first()
-        if not stock or stock.quantity < item.quantity:
-            db.rollback()
+
+        requested[item.medicine_id] += item.quantity
+        if available.get(item.medicine_id, 0) < requested[item.medicine_id]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Not enough stock for medicine {medicine.name}",
             )
-        
-        # Deduct the quantity from stock
-        stock.quantity -= item.quantity
-        db.add(stock)
-        
+
+    lines = []
+    total_amount = 0.0
+    for item in items:
         # Use the medicine price if unit_price is not provided
-        unit_price = item.unit_price if item.unit_price else medicine.price
-        
-        # Create the order medicine relation
-        db_order_medicine = OrderMedicine(
-            order_id=db_order.id,
-            medicine_id=item.medicine_id,
-            quantity=item.quantity,
-            unit_price=unit_price
+        unit_price = item.unit_price if item.unit_price else medicines[item.medicine_id].price
+        lines.append(
+            {
+                "medicine_id": item.medicine_id,
+                "quantity": item.quantity,
+                "unit_price": unit_price,
+            }
         )
-        db.add(db_order_medicine)
-        
-        # Add to total
         total_amount += unit_price * item.quantity
-    
-    # Update order total
-    db_order.total_amount = total_amount
+
+    return lines, total_amount, requested
+
+# Guarded decrement: the row only changes when enough stock is left, so two
+# concurrent checkouts can never both take the last boxes. This is atomic on every
+# dialect, which is why it's used instead of SELECT ... FOR UPDATE.
+_TAKE_STOCK = (
+    update(Stock.__table__)
+    .where(
+        Stock.__table__.c.medicine_id == bindparam("stock_medicine_id"),
+        Stock.__table__.c.quantity >= bindparam("amount"),
+    )
+    .values(quantity=Stock.__table__.c.quantity - bindparam("amount"))
+)
+_RETURN_STOCK = (
+    update(Stock.__table__)
+    .where(Stock.__table__.c.medicine_id == bindparam("stock_medicine_id"))
+    .values(quantity=Stock.__table__.c.quantity + bindparam("amount"))
+)
+
+def _apply_stock_deltas(db: Session, deltas: Dict[int, int]) -> bool:
+    """Apply net per-medicine stock changes as relative, set-based UPDATEs.
+
+    Positive deltas return stock, negative deltas take it through the guarded
+    UPDATE. Returns False when a decrement found too little stock; the caller must
+    roll back because the other rows may already have changed.
+    """
+    returned = [
+        {"stock_medicine_id": medicine_id, "amount": delta}
+        for medicine_id, delta in deltas.items() if delta > 0
+    ]
+    taken = [
+        {"stock_medicine_id": medicine_id, "amount": -delta}
+        for medicine_id, delta in deltas.items() if delta < 0
+    ]
+    if returned:
+        db.execute(_RETURN_STOCK, returned)
+    if not taken:
+        return True
+
+    if len(taken) == 1 or not db.get_bind().dialect.supports_sane_multi_rowcount:
+        return all(db.execute(_TAKE_STOCK, row).rowcount == 1 for row in taken)
+    return db.execute(_TAKE_STOCK, taken).rowcount == len(taken)
+
+def _raise_stock_conflict(
+    db: Session, items: List[OrderMedicineCreate], returned: Dict[int, int]
+) -> None:
+    """Roll back after a failed guarded UPDATE and re-check fresh stock to name the medicine.
+
+    ``returned`` holds quantities the order already owns (its existing lines), which
+    count as available again.
+    """
+    db.rollback()
+    stocks = _stocks_by_medicine(db, {item.medicine_id for item in items})
+    available = {
+        medicine_id: stock.quantity + returned.get(medicine_id, 0)
+        for medicine_id, stock in stocks.items()
+    }
+    _resolve_line_items(db, items, available)
+    # Stock changed again between the failed UPDATE and the re-check
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Stock changed while the order was being placed, please retry",
+    )
+
+def _insert_lines(db: Session, order_id: int, lines: List[dict]) -> None:
+    """Insert order lines as one executemany (no per-row RETURNING)"""
+    if lines:
+        db.execute(insert(OrderMedicine), [{**line, "order_id": order_id} for line in lines])
+
+_UPDATE_LINE = (
+    update(OrderMedicine.__table__)
+    .where(OrderMedicine.__table__.c.id == bindparam("line_id"))
+    .values(quantity=bindparam("new_quantity"), unit_price=bindparam("new_unit_price"))
+)
+
+def _diff_lines(
+    existing: List[OrderMedicine], lines: List[dict]
+) -> Tuple[List[dict], List[dict], List[OrderMedicine]]:
+    """Match requested lines against the order's current lines.
+
+    Identical lines (same medicine, quantity and price) are kept untouched; the rest
+    of a medicine's lines are rewritten in place before anything is inserted or
+    deleted. Returns the lines to insert, the UPDATE parameters and the lines to delete.
+    """
+    unmatched: Dict[int, List[OrderMedicine]] = defaultdict(list)
+    for line in existing:
+        unmatched[line.medicine_id].append(line)
+
+    changed = []
+    for line in lines:
+        candidates = unmatched[line["medicine_id"]]
+        same = next(
+            (c for c in candidates if c.quantity == line["quantity"] and c.unit_price == line["unit_price"]),
+            None,
+        )
+        if same is not None:
+            candidates.remove(same)
+        else:
+            changed.append(line)
+
+    inserts, updates = [], []
+    for line in changed:
+        candidates = unmatched[line["medicine_id"]]
+        if candidates:
+            updates.append({
+                "line_id": candidates.pop(0).id,
+                "new_quantity": line["quantity"],
+                "new_unit_price": line["unit_price"],
+            })
+        else:
+            inserts.append(line)
+
+    deletes = [line for candidates in unmatched.values() for line in candidates]
+    return inserts, updates, deletes
+
+def _restock_orders(db: Session, order_ids: List[int]) -> None:
+    """Return the stock held by ``order_ids`` with one aggregated UPDATE.
+
+    UPDATE stocks SET quantity = quantity + (SELECT SUM(quantity) FROM order_medicines
+    WHERE order_id IN (...) AND medicine_id = stocks.medicine_id) for every medicine
+    on those orders. The correlated form runs on every dialect, unlike UPDATE ... FROM.
+    """
+    if not order_ids:
+        return
+    stocks = Stock.__table__
+    lines = OrderMedicine.__table__
+    returned = (
+        select(func.sum(lines.c.quantity))
+        .where(lines.c.order_id.in_(order_ids), lines.c.medicine_id == stocks.c.medicine_id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(stocks)
+        .where(stocks.c.medicine_id.in_(select(lines.c.medicine_id).where(lines.c.order_id.in_(order_ids))))
+        .values(quantity=stocks.c.quantity + returned)
+    )
+
+def _cancellable(orders):
+    """Orders that may still be cancelled: not cancelled or completed, and not invoiced.
+
+    An invoiced order's stock left with the invoice and its payment is in the rollup, so
+    cancelling it would restock goods that were sold and drop only half of the sale.
+    """
+    invoices = Invoice.__table__
+    return and_(
+        orders.c.status.notin_([OrderStatus.CANCELLED, OrderStatus.COMPLETED]),
+        ~exists().where(invoices.c.order_id == orders.c.id),
+    )
+
+def _mark_cancelled(db: Session, order_ids: List[int]) -> List[int]:
+    """Cancel the orders that can still be cancelled and return the ids this call changed.
+
+    The status flip is the guard: only the transaction that actually moves an order
+    to cancelled restocks it, so concurrent cancels can't return stock twice, and an
+    order invoiced in the meantime is left alone.
+    """
+    if not order_ids:
+        return []
+    orders = Order.__table__
+    stmt = (
+        update(orders)
+        .where(orders.c.id.in_(order_ids), _cancellable(orders))
+        .values(status=OrderStatus.CANCELLED)
+    )
+    if db.get_bind().dialect.update_returning:
+        return list(db.execute(stmt.returning(orders.c.id)).scalars())
+    return [
+        order_id for order_id in order_ids
+        if db.execute(
+            update(orders)
+            .where(orders.c.id == order_id, _cancellable(orders))
+            .values(status=OrderStatus.CANCELLED)
+        ).rowcount == 1
+    ]
+
+def _cancel_and_restock(db: Session, order_ids: List[int]) -> List[int]:
+    cancelled = _mark_cancelled(db, order_ids)
+    _restock_orders(db, cancelled)
+    apply_orders(db, cancelled, sign=-1, include_cancelled=True)
+    return cancelled
+
+def _customer_not_found(db: Session, customer_id: int) -> None:
+    """Roll back an order write the customers foreign key rejected and answer 404"""
+    db.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Customer with ID {customer_id} not found",
+    )
+
+def create_order(db: Session, order_in: OrderCreate, commit: bool = True) -> Order:
+    """Place an order and take its items off stock.
+
+    With ``commit=False`` the writes are only flushed and the caller commits them.
+    """
+    medicine_ids = {item.medicine_id for item in order_in.order_medicines}
+    stocks = _stocks_by_medicine(db, medicine_ids)
+    available = {medicine_id: stock.quantity for medicine_id, stock in stocks.items()}
+    lines, total_amount, requested = _resolve_line_items(db, order_in.order_medicines, available)
+
+    # Deduct the quantities from stock
+    if not _apply_stock_deltas(db, {medicine_id: -qty for medicine_id, qty in requested.items()}):
+        _raise_stock_conflict(db, order_in.order_medicines, {})
+
+    db_order = Order(
+        customer_id=order_in.customer_id,
+        total_amount=total_amount,
+    )
     db.add(db_order)
-    
-    db.commit()
+    try:
+        db.flush()  # Get the order ID without committing yet
+    except IntegrityError:
+        _customer_not_found(db, order_in.customer_id)
+    _insert_lines(db, db_order.id, lines)
+    apply_orders(db, [db_order.id])
+
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     db.refresh(db_order)
     return db_order
 
@@ -99,6 +429,8 @@ def update_order(db: Session, order_id: int, order_in: OrderUpdate) -> Order:
 
     update_data = order_in.model_dump(exclude_unset=True)
     new_items = update_data.pop("order_medicines", None)
+    new_status = update_data.pop("status", None)
+    was_cancelled = db_order.status == OrderStatus.CANCELLED
 
     if new_items is not None:
         # Don't allow mutating items if invoice exists
@@ -107,64 +439,181 @@ def update_order(db: Session, order_id: int, order_in: OrderUpdate) -> Order:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot modify order items after an invoice is generated",
             )
+        # Lines of a cancelled order hold no stock, so the deltas below would be wrong
+        if was_cancelled:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot modify items of a cancelled order",
+            )
 
-        # Return existing quantities to stock
-        existing_items = db.query(OrderMedicine).filter(OrderMedicine.order_id == order_id).all()
-        for existing in existing_items:
-            stock = db.query(Stock).filter(Stock.medicine_id == existing.medicine_id).first()
-            if stock:
-                stock.quantity += existing.quantity
-                db.add(stock)
-
-        # Remove existing items
-        db.query(OrderMedicine).filter(OrderMedicine.order_id == order_id).delete(synchronize_session=False)
-
-        total_amount = 0.0
-        for item in new_items:
-            medicine_id = item["medicine_id"]
-            quantity = item["quantity"]
-            unit_price = item.get("unit_price")
-
-            medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
-            if not medicine:
-                db.rollback()
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Medicine with ID {medicine_id} not found",
-                )
+        # Off the rollup at the old total, back on below at the new one
+        apply_orders(db, [db_order.id], sign=-1)
 
-            stock = db.query(Stock).filter(Stock.medicine_id == medicine_id).first()
-            if not stock or stock.quantity < quantity:
-                db.rollback()
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Not enough stock for medicine {medicine.name}",
-                )
+        existing_items = list(db_order.order_medicines)
+        medicine_ids = {item.medicine_id for item in existing_items}
+        medicine_ids.update(item.medicine_id for item in order_in.order_medicines)
+        stocks = _stocks_by_medicine(db, medicine_ids)
+
+        # Existing quantities count as returned to stock
+        returned: Dict[int, int] = defaultdict(int)
+        for existing in existing_items:
+            returned[existing.medicine_id] += existing.quantity
+        available = {
+            medicine_id: stock.quantity + returned[medicine_id]
+            for medicine_id, stock in stocks.items()
+        }
 
-            stock.quantity -= quantity
-            db.add(stock)
+        lines, total_amount, requested = _resolve_line_items(db, order_in.order_medicines, available)
+        deltas = dict(returned)
+        for medicine_id, quantity in requested.items():
+            deltas[medicine_id] = deltas.get(medicine_id, 0) - quantity
+        if not _apply_stock_deltas(db, deltas):
+            _raise_stock_conflict(db, order_in.order_medicines, returned)
 
-            final_unit_price = unit_price if unit_price else medicine.price
-            db.add(
-                OrderMedicine(
-                    order_id=db_order.id,
-                    medicine_id=medicine_id,
-                    quantity=quantity,
-                    unit_price=final_unit_price,
-                )
-            )
-            total_amount += final_unit_price * quantity
+        # Write only the lines that changed
+        inserts, updates, deletes = _diff_lines(existing_items, lines)
+        if deletes:
+            db.execute(delete(OrderMedicine).where(OrderMedicine.id.in_([line.id for line in deletes])))
+        if updates:
+            db.execute(_UPDATE_LINE, updates)
+        _insert_lines(db, db_order.id, inserts)
+        # The ORM DELETE already evicted deleted lines; the Core UPDATE didn't touch the session
+        updated = {update["line_id"] for update in updates}
+        for line in existing_items:
+            if line.id in updated:
+                db.expire(line)
+        db.expire(db_order, ["order_medicines"])
 
         db_order.total_amount = total_amount
+        apply_orders(db, [db_order.id])
+
+    if new_status == OrderStatus.CANCELLED:
+        if not was_cancelled and not _cancel_and_restock(db, [db_order.id]):
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Cannot cancel an order that is completed or has an invoice",
+            )
+        db.expire(db_order, ["status"])
+    elif new_status is not None:
+        if was_cancelled:
+            # Reopening: the order takes its stock back, if it is still there
+            items = [
+                OrderMedicineCreate(medicine_id=line.medicine_id, quantity=line.quantity)
+                for line in db_order.order_medicines
+            ]
+            taken: Dict[int, int] = defaultdict(int)
+            for item in items:
+                taken[item.medicine_id] -= item.quantity
+            if not _apply_stock_deltas(db, taken):
+                _raise_stock_conflict(db, items, {})
+        db_order.status = new_status
+        if was_cancelled:
+            apply_orders(db, [db_order.id])
 
     for field, value in update_data.items():
         setattr(db_order, field, value)
 
     db.add(db_order)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        _customer_not_found(db, order_in.customer_id)
     db.refresh(db_order)
     return db_order
 
+def _bulk_error(index: int, status_code: int, detail: Any) -> dict:
+    return {"index": index, "status": "error", "status_code": status_code, "detail": detail}
+
+def ingest_order_chunk(db: Session, payloads: List[Any], offset: int = 0) -> List[dict]:
+    """Validate and create a chunk of orders in one transaction.
+
+    Customers, medicines and stocks for the whole chunk are resolved with one IN
+    query each, orders are checked against a running in-memory stock count, and the
+    accepted orders are written with bulk INSERTs plus one guarded stock UPDATE.
+    Returns one result per payload; ``offset`` is the index of the first payload in
+    the overall upload.
+    """
+    results: List[Optional[dict]] = [None] * len(payloads)
+    parsed: List[Tuple[int, OrderCreate]] = []
+    for i, raw in enumerate(payloads):
+        if isinstance(raw, ValueError):
+            results[i] = _bulk_error(offset + i, 422, f"Invalid JSON: {raw}")
+            continue
+        try:
+            parsed.append((i, OrderCreate.model_validate(raw)))
+        except ValidationError as e:
+            results[i] = _bulk_error(offset + i, 422, e.errors(include_url=False, include_context=False))
+
+    # A concurrent checkout can invalidate the in-memory plan; re-plan once on fresh stock
+    for attempt in range(2):
+        medicine_ids = {item.medicine_id for _, order in parsed for item in order.order_medicines}
+        customer_ids = {order.customer_id for _, order in parsed}
+        customers = {
+            customer_id
+            for (customer_id,) in db.query(Customer.id).filter(Customer.id.in_(customer_ids))
+        } if customer_ids else set()
+        medicines = _medicines_by_id(db, medicine_ids)
+        available = {
+            medicine_id: stock.quantity
+            for medicine_id, stock in _stocks_by_medicine(db, medicine_ids).items()
+        }
+
+        accepted = []
+        deltas: Dict[int, int] = defaultdict(int)
+        for i, order in parsed:
+            if order.customer_id not in customers:
+                results[i] = _bulk_error(offset + i, 404, f"Customer with ID {order.customer_id} not found")
+                continue
+            try:
+                lines, total_amount, requested = _resolve_line_items(
+                    db, order.order_medicines, available, medicines
+                )
+            except HTTPException as e:
+                results[i] = _bulk_error(offset + i, e.status_code, e.detail)
+                continue
+            for medicine_id, quantity in requested.items():
+                available[medicine_id] -= quantity
+                deltas[medicine_id] -= quantity
+            accepted.append((i, order, lines, total_amount))
+
+        if not accepted:
+            break
+        if not _apply_stock_deltas(db, deltas):
+            db.rollback()
+            conflict = "Stock changed while the batch was being placed, please retry"
+        else:
+            try:
+                order_ids = db.execute(
+                    insert(Order).returning(Order.id, sort_by_parameter_order=True),
+                    [{"customer_id": order.customer_id, "total_amount": total} for _, order, _, total in accepted],
+                ).scalars().all()
+                db.execute(
+                    insert(OrderMedicine),
+                    [
+                        {**line, "order_id": order_id}
+                        for order_id, (_, _, lines, _) in zip(order_ids, accepted)
+                        for line in lines
+                    ],
+                )
+                apply_orders(db, order_ids)
+                db.commit()
+            except IntegrityError:
+                # A customer or medicine was deleted after the lookups above; the
+                # re-plan reports it as not found
+                db.rollback()
+                conflict = "A customer or medicine was deleted while the batch was being placed, please retry"
+            else:
+                for order_id, (i, _, _, total) in zip(order_ids, accepted):
+                    results[i] = {"index": offset + i, "status": "created", "order_id": order_id, "total_amount": total}
+                break
+
+        if attempt == 1:
+            for i, *_ in accepted:
+                results[i] = _bulk_error(offset + i, status.HTTP_409_CONFLICT, conflict)
+
+    return results
+
 def delete_order(db: Session, order_id: int) -> Order:
     db_order = fetch_order_by_id(db, order_id=order_id)
     if not db_order:
@@ -172,17 +621,75 @@ def delete_order(db: Session, order_id: int) -> Order:
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found",
         )
-    
-    # Return items to stock
-    order_medicines = db.query(OrderMedicine).filter(OrderMedicine.order_id == order_id).all()
-    for order_med in order_medicines:
-        stock = db.query(Stock).filter(Stock.medicine_id == order_med.medicine_id).first()
-        if stock:
-            stock.quantity += order_med.quantity
-            db.add(stock)
-    
+
+    if db_order.status == OrderStatus.COMPLETED or db.scalar(
+        select(exists().where(Invoice.order_id == order_id))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cannot delete an order that is completed or has an invoice",
+        )
+
+    # Return items to stock unless the order was already cancelled (and restocked)
+    _cancel_and_restock(db, [order_id])
+    db.execute(delete(OrderMedicine.__table__).where(OrderMedicine.__table__.c.order_id == order_id))
+
     # Store the order before deletion
     deleted_order = db_order
     db.delete(db_order)
     db.commit()
-    return deleted_order
\ No newline at end of file
+    return deleted_order
+
+def cancel_orders(db: Session, request: OrderCancel) -> dict:
+    """Cancel many orders in one transaction, restocking them with one UPDATE.
+
+    Orders are picked by ``order_ids`` and/or as pending orders placed before
+    ``placed_before``. Orders that are already cancelled, completed or invoiced, or
+    that don't exist, are reported as skipped.
+    """
+    if request.order_ids is None and request.placed_before is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide order_ids and/or placed_before",
+        )
+
+    query = select(Order.id).where(_cancellable(Order.__table__))
+    if request.order_ids is not None:
+        query = query.where(Order.id.in_(request.order_ids))
+    if request.placed_before is not None:
+        query = query.where(Order.status == OrderStatus.PENDING, Order.order_date < request.placed_before)
+    candidates = list(db.execute(query).scalars())
+
+    cancelled = _cancel_and_restock(db, candidates)
+    db.commit()
+
+    cancelled_ids = set(cancelled)
+    skipped = [order_id for order_id in request.order_ids or [] if order_id not in cancelled_ids]
+    return {"cancelled": sorted(cancelled), "skipped": skipped}
+
+# Async variants used when USE_ASYNC_DB is enabled. The GET /orders reads await their
+# queries; the writes run the sync implementations above on the AsyncSession's
+# connection through run_sync, so their stock and rollup logic exists once.
+async def fetch_order_summaries_page_async(db: AsyncSession, limit: int, after: Optional[list] = None,
+                                           descending: bool = False) -> Tuple[List[dict], Optional[str]]:
+    rows, next_cursor = await keyset_rows_async(db, _ORDER_SUMMARY, [Order.id], limit, after, descending=descending)
+    return await _map_order_rows_async(db, rows), next_cursor
+
+async def fetch_order_summary_async(db: AsyncSession, order_id: int) -> Optional[dict]:
+    row = (await db.execute(_ORDER_SUMMARY.where(Order.id == order_id))).mappings().first()
+    return (await _map_order_rows_async(db, [row]))[0] if row else None
+
+async def fetch_order_with_details_async(db: AsyncSession, order_id: int) -> Optional[Order]:
+    return await db.run_sync(fetch_order_with_details, order_id)
+
+async def create_order_async(db: AsyncSession, order_in: OrderCreate, commit: bool = True) -> Order:
+    return await db.run_sync(create_order, order_in, commit)
+
+async def update_order_async(db: AsyncSession, order_id: int, order_in: OrderUpdate) -> Order:
+    return await db.run_sync(update_order, order_id, order_in)
+
+async def delete_order_async(db: AsyncSession, order_id: int) -> Order:
+    return await db.run_sync(delete_order, order_id)
+
+async def cancel_orders_async(db: AsyncSession, request: OrderCancel) -> dict:
+    return await db.run_sync(cancel_orders, request)
@@ -0,0 +1,180 @@
+"""Background sweep that marks sent invoices overdue once their due date passes.
+
+Started from the app lifespan. Every worker runs the loop, but only the one holding
+the ``overdue_sweeper`` lease in ``background_jobs`` sweeps: the lease is a row
+claimed with a conditional UPDATE (or the first INSERT) and renewed on every pass,
+so it moves to another worker, on this host or another, when the leader stops or
+dies. After a sweep the leader sleeps until the next sent invoice falls due, capped
+at OVERDUE_SWEEP_INTERVAL so invoices created meanwhile are picked up and the lease
+stays fresh. Leader start and stop times and each run's start, finish, count and
+error are kept on the same row.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from databases.database import SessionLocal
+from Models.background_job import BackgroundJob
+from Views.invoice import next_invoice_due_date, update_overdue_invoices
+
+logger = logging.getLogger("mediq.overdue_sweeper")
+
+OVERDUE_SWEEP_ENABLED = os.getenv("OVERDUE_SWEEP_ENABLED", "1").lower() not in ("0", "false", "no")
+OVERDUE_SWEEP_INTERVAL = float(os.getenv("OVERDUE_SWEEP_INTERVAL", "60"))
+OVERDUE_SWEEP_CHUNK = int(os.getenv("OVERDUE_SWEEP_CHUNK", "500"))
+
+JOB_NAME = "overdue_sweeper"
+# A leader that misses this many passes in a row loses the lease
+_LEASE_PASSES = 3
+_MIN_SLEEP = 1.0
+
+_holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+_task: Optional[asyncio.Task] = None
+
+
+def _lease_seconds() -> float:
+    return OVERDUE_SWEEP_INTERVAL * _LEASE_PASSES
+
+
+def _claim_lease() -> bool:
+    """Take or renew the lease; True if this worker is the leader"""
+    now = datetime.now()
+    expires = now + timedelta(seconds=_lease_seconds())
+    jobs = BackgroundJob.__table__
+    with SessionLocal() as db:
+        claimed = db.execute(
+            update(jobs)
+            .where(
+                jobs.c.name == JOB_NAME,
+                or_(jobs.c.holder == _holder, jobs.c.holder.is_(None), jobs.c.lease_expires_at < now),
+            )
+            .values(
+                holder=_holder,
+                lease_expires_at=expires,
+                # Evaluated against the old row: only a change of leader resets these
+                leader_since=case((jobs.c.holder == _holder, jobs.c.leader_since), else_=now),
+                stopped_at=case((jobs.c.holder == _holder, jobs.c.stopped_at), else_=None),
+            )
+        ).rowcount == 1
+        if not claimed:
+            exists = db.execute(select(jobs.c.name).where(jobs.c.name == JOB_NAME)).first()
+            if exists:
+                db.rollback()
+                return False
+            db.add(BackgroundJob(name=JOB_NAME, holder=_holder, lease_expires_at=expires, leader_since=now))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker inserted the row first
+            db.rollback()
+            return False
+    return True
+
+
+def _release_lease() -> None:
+    jobs = BackgroundJob.__table__
+    with SessionLocal() as db:
+        db.execute(
+            update(jobs)
+            .where(jobs.c.name == JOB_NAME, jobs.c.holder == _holder)
+            .values(holder=None, lease_expires_at=None, stopped_at=datetime.now())
+        )
+        db.commit()
+
+
+def _record_run(started: datetime, count: Optional[int], error: Optional[str]) -> None:
+    jobs = BackgroundJob.__table__
+    with SessionLocal() as db:
+        db.execute(
+            update(jobs)
+            .where(jobs.c.name == JOB_NAME, jobs.c.holder == _holder)
+            .values(last_run_started_at=started, last_run_finished_at=datetime.now(),
+                    last_run_count=count, last_error=error)
+        )
+        db.commit()
+
+
+def _seconds_until(moment: Optional[datetime]) -> float:
+    if moment is None:
+        return OVERDUE_SWEEP_INTERVAL
+    now = datetime.now(timezone.utc).astimezone(moment.tzinfo) if moment.tzinfo else datetime.now()
+    return (moment - now).total_seconds()
+
+
+def sweep_once() -> float:
+    """Sweep now and return how long to sleep before the next pass"""
+    started = datetime.now()
+    try:
+        with SessionLocal() as db:
+            count = update_overdue_invoices(db, chunk_size=OVERDUE_SWEEP_CHUNK, now=started)
+            next_due = next_invoice_due_date(db)
+    except Exception as e:
+        logger.exception("Overdue sweep failed")
+        _record_run(started, None, repr(e))
+        return OVERDUE_SWEEP_INTERVAL
+    _record_run(started, count, None)
+    if count:
+        logger.info("Marked %s invoice(s) overdue", count)
+    return _seconds_until(next_due)
+
+
+def _pass() -> float:
+    if not _claim_lease():
+        return OVERDUE_SWEEP_INTERVAL
+    return sweep_once()
+
+
+async def _run() -> None:
+    while True:
+        try:
+            delay = await asyncio.to_thread(_pass)
+        except Exception:
+            # e.g. the database is briefly unreachable; try again on the next pass
+            logger.exception("Overdue sweeper pass failed")
+            delay = OVERDUE_SWEEP_INTERVAL
+        await asyncio.sleep(min(max(delay, _MIN_SLEEP), OVERDUE_SWEEP_INTERVAL))
+
+
+def start_overdue_sweeper() -> None:
+    global _task
+    if not OVERDUE_SWEEP_ENABLED or _task is not None:
+        return
+    _task = asyncio.get_running_loop().create_task(_run(), name=JOB_NAME)
+    logger.info("Overdue sweeper started (%s)", _holder)
+
+
+async def stop_overdue_sweeper() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+    try:
+        await asyncio.to_thread(_release_lease)
+    except Exception:
+        logger.exception("Could not release the overdue sweeper lease")
+    logger.info("Overdue sweeper stopped")
+
+
+def sweeper_status() -> dict:
+    with SessionLocal() as db:
+        job = db.get(BackgroundJob, JOB_NAME)
+        row = {column.name: getattr(job, column.name) for column in BackgroundJob.__table__.c} if job else {}
+    return {
+        "enabled": OVERDUE_SWEEP_ENABLED,
+        "interval_seconds": OVERDUE_SWEEP_INTERVAL,
+        "this_worker": _holder,
+        "running_here": _task is not None,
+        "job": row,
+    }
@@ -0,0 +1,185 @@
+"""A minimal PDF writer: positioned text, lines and filled rectangles.
+
+Text uses the standard Helvetica and Helvetica-Bold fonts, which every PDF viewer
+has, so nothing is embedded and no external binary is needed. Those fonts are
+WinAnsi-encoded, so characters outside cp1252 print as "?". Widths come from
+the fonts' published metrics, which is what right alignment and wrapping use. Page
+content streams are Flate-compressed.
+"""
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+A4 = (595.28, 841.89)
+
+FONTS = {
+    False: ("F1", "Helvetica"),
+    True: ("F2", "Helvetica-Bold"),
+}
+
+# Advance widths (1/1000 em) of the printable ASCII range, code points 32..126
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_DEFAULT_WIDTH = 556
+
+Color = Tuple[float, float, float]
+BLACK: Color = (0, 0, 0)
+
+
+def _encode(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    widths = _HELVETICA_BOLD_WIDTHS if bold else _HELVETICA_WIDTHS
+    total = 0
+    for char in text:
+        code = ord(char)
+        total += widths[code - 32] if 32 <= code <= 126 else _DEFAULT_WIDTH
+    return total * size / 1000
+
+
+def wrap_text(text: str, width: float, size: float, bold: bool = False) -> List[str]:
+    """Split ``text`` into lines no wider than ``width``; explicit newlines are kept"""
+    lines: List[str] = []
+    for paragraph in text.splitlines() or [""]:
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if text_width(candidate, size, bold) <= width or not line:
+                line = candidate
+            else:
+                lines.append(line)
+                line = word
+            # A single word wider than the line is cut wherever it overflows
+            while text_width(line, size, bold) > width and len(line) > 1:
+                cut = len(line) - 1
+                while cut > 1 and text_width(line[:cut], size, bold) > width:
+                    cut -= 1
+                lines.append(line[:cut])
+                line = line[cut:]
+        lines.append(line)
+    return lines
+
+
+def _number(value: float) -> bytes:
+    return (b"%.2f" % value).rstrip(b"0").rstrip(b".") or b"0"
+
+
+def _color(color: Color, stroke: bool) -> bytes:
+    op = b"RG" if stroke else b"rg"
+    return b" ".join(_number(c) for c in color) + b" " + op
+
+
+class PdfPage:
+    """One page; coordinates are points from the bottom-left corner"""
+
+    def __init__(self, width: float, height: float):
+        self.width = width
+        self.height = height
+        self._ops: List[bytes] = []
+
+    def text(self, x: float, y: float, text: str, size: float = 10, bold: bool = False,
+             align: str = "left", color: Color = BLACK) -> None:
+        if align == "right":
+            x -= text_width(text, size, bold)
+        elif align == "center":
+            x -= text_width(text, size, bold) / 2
+        font = FONTS[bold][0].encode()
+        self._ops.append(
+            b"BT " + _color(color, stroke=False) + b" /" + font + b" " + _number(size) + b" Tf "
+            + _number(x) + b" " + _number(y) + b" Td (" + _encode(text) + b") Tj ET"
+        )
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.5,
+             color: Color = BLACK) -> None:
+        self._ops.append(
+            _number(width) + b" w " + _color(color, stroke=True) + b" "
+            + _number(x1) + b" " + _number(y1) + b" m " + _number(x2) + b" " + _number(y2) + b" l S"
+        )
+
+    def rect(self, x: float, y: float, width: float, height: float, fill: Color) -> None:
+        self._ops.append(
+            _color(fill, stroke=False) + b" " + _number(x) + b" " + _number(y) + b" "
+            + _number(width) + b" " + _number(height) + b" re f"
+        )
+
+    def content(self) -> bytes:
+        return b"\n".join(self._ops)
+
+
+class PdfWriter:
+    """Collects pages and serializes them as a PDF 1.4 file"""
+
+    def __init__(self, page_size: Sequence[float] = A4, title: Optional[str] = None):
+        self.page_width, self.page_height = page_size
+        self.title = title
+        self.pages: List[PdfPage] = []
+
+    def add_page(self) -> PdfPage:
+        page = PdfPage(self.page_width, self.page_height)
+        self.pages.append(page)
+        return page
+
+    def to_bytes(self) -> bytes:
+        if not self.pages:
+            self.add_page()
+
+        objects: List[bytes] = []  # objects[n - 1] is object number n
+
+        def add(body: bytes) -> int:
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(b"")  # filled in once the page tree exists
+        pages = add(b"")
+        fonts = {
+            name: add(b"<< /Type /Font /Subtype /Type1 /BaseFont /" + base.encode()
+                      + b" /Encoding /WinAnsiEncoding >>")
+            for name, base in FONTS.values()
+        }
+        font_resources = b" ".join(b"/" + name.encode() + b" %d 0 R" % number for name, number in fonts.items())
+
+        kids = []
+        for page in self.pages:
+            stream = zlib.compress(page.content())
+            content = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            kids.append(add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 " % pages
+                + _number(page.width) + b" " + _number(page.height)
+                + b"] /Resources << /Font << " + font_resources + b" >> >> /Contents %d 0 R >>" % content
+            ))
+        objects[pages - 1] = (
+            b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % kid for kid in kids)
+            + b"] /Count %d >>" % len(kids)
+        )
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+        info = add(b"<< /Title (" + _encode(self.title) + b") /Producer (MediQ) >>") if self.title else None
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root %d 0 R" % (len(objects) + 1, catalog)
+        if info:
+            out += b" /Info %d 0 R" % info
+        out += b" >>\nstartxref\n%d\n%%%%EOF\n" % xref
+        return bytes(out)
@@ -0,0 +1,314 @@
+"""Versioned cache for rendered invoices (the print HTML and the print-data JSON).
+
+An entry is keyed on the invoice id and stored with a version token: the invoice
+row, the customer fields and the medicine names printed on it, read by one
+primary-key lookup. A changed version, including one written by another worker,
+means a re-render. Writes made in this process also drop entries straight away. A
+Session ``after_flush`` hook collects the invoices touched through Invoice, Order,
+OrderMedicine and Customer objects, and invalidates them at flush and again at
+commit; a changed or deleted Medicine drops every entry. Each entry carries a
+strong ETag (a hash of the body), so a client that already holds the current copy
+gets a 304.
+
+With RENDER_CACHE_VERIFY=0 a hit skips the version lookup and costs no query at all.
+That is only safe when a single process handles writes.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from itertools import chain
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import bindparam, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from Models.customer import Customer
+from Models.invoice import Invoice
+from Models.medicine import Medicine
+from Models.order import Order, OrderMedicine
+
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "512"))
+RENDER_CACHE_VERIFY = os.getenv("RENDER_CACHE_VERIFY", "1").lower() not in ("0", "false", "no")
+
+RENDER_KINDS = ("print", "print-data")
+
+# Names of the medicines on the invoice's lines, folded into one value so the version
+# stays a single row. The lines themselves can't change once an invoice exists
+# (update_order refuses item edits on invoiced orders), but a medicine can be renamed.
+_MEDICINE_NAMES = (
+    select(func.aggregate_strings(Medicine.name, "\n"))
+    .select_from(OrderMedicine)
+    .join(Medicine, Medicine.id == OrderMedicine.medicine_id)
+    .where(OrderMedicine.order_id == Invoice.order_id)
+    .scalar_subquery()
+)
+
+# Everything the invoice prints
+_VERSION = (
+    select(
+        Order.id.label("order_id"),
+        Order.customer_id,
+        Order.order_date,
+        Invoice.invoice_number,
+        Invoice.updated_at,
+        Invoice.status,
+        Invoice.amount,
+        Invoice.tax,
+        Invoice.discount,
+        Invoice.total_amount,
+        Invoice.notes,
+        Invoice.terms,
+        Invoice.due_date,
+        Invoice.issued_date,
+        Invoice.paid_date,
+        Customer.name,
+        Customer.email,
+        Customer.phone,
+        Customer.address,
+        _MEDICINE_NAMES.label("medicine_names"),
+    )
+    .select_from(Invoice)
+    .outerjoin(Order, Order.id == Invoice.order_id)
+    .outerjoin(Customer, Customer.id == Order.customer_id)
+    .where(Invoice.id == bindparam("invoice_id"))
+)
+
+# Session.info keys for what the current transaction has written
+_TOUCHED = "render_cache_touched"
+_TOUCHED_ALL = "render_cache_touched_all"
+
+
+class CachedRender(NamedTuple):
+    version: tuple
+    etag: str
+    body: bytes
+
+
+class _RenderCache:
+    """Bounded LRU of rendered invoices keyed by (kind, invoice id, variant)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, CachedRender]" = OrderedDict()
+        self._keys_by_invoice: Dict[int, Set[tuple]] = {}
+        # invoice id -> (order id, customer id), to find the entries an order or customer write affects
+        self._owners: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
+        # Bumped by every invalidation; a render that overlapped one isn't stored
+        self.generation = 0
+        self._stats = {kind: {"hits": 0, "misses": 0, "not_modified": 0} for kind in RENDER_KINDS}
+        self._invalidations = 0
+        self._evictions = 0
+
+    def get(self, key: tuple, version: Optional[tuple] = None) -> Optional[CachedRender]:
+        """The entry for ``key``, if present and (when ``version`` is given) current"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and version is not None and entry.version != version:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._stats[key[0]]["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats[key[0]]["hits"] += 1
+            return entry
+
+    def put(self, key: tuple, entry: CachedRender, owner: Tuple[Optional[int], Optional[int]],
+            generation: int) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._keys_by_invoice.setdefault(key[1], set()).add(key)
+            self._owners[key[1]] = owner
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _drop(self, key: tuple) -> None:
+        del self._entries[key]
+        keys = self._keys_by_invoice.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_invoice[key[1]]
+                self._owners.pop(key[1], None)
+
+    def invalidate(self, invoice_ids: Iterable[int] = (), order_ids: Iterable[int] = (),
+                   customer_ids: Iterable[int] = ()) -> None:
+        invoice_ids, order_ids, customer_ids = set(invoice_ids), set(order_ids), set(customer_ids)
+        for ids in (invoice_ids, order_ids, customer_ids):
+            ids.discard(None)
+        if not (invoice_ids or order_ids or customer_ids):
+            return
+        with self._lock:
+            self.generation += 1
+            if order_ids or customer_ids:
+                invoice_ids.update(
+                    invoice_id for invoice_id, (order_id, customer_id) in self._owners.items()
+                    if order_id in order_ids or customer_id in customer_ids
+                )
+            for invoice_id in invoice_ids:
+                for key in list(self._keys_by_invoice.get(invoice_id, ())):
+                    self._drop(key)
+                    self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_invoice.clear()
+            self._owners.clear()
+
+    def note_not_modified(self, kind: str) -> None:
+        with self._lock:
+            self._stats[kind]["not_modified"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            kinds = {}
+            for kind, counts in self._stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                kinds[kind] = {**counts, "hit_rate": round(counts["hits"] / lookups, 4) if lookups else None}
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "verify": RENDER_CACHE_VERIFY,
+                "invalidations": self._invalidations,
+                "evictions": self._evictions,
+                "kinds": kinds,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for counts in self._stats.values():
+                counts.update(hits=0, misses=0, not_modified=0)
+            self._invalidations = 0
+            self._evictions = 0
+
+
+render_cache = _RenderCache(RENDER_CACHE_SIZE)
+
+
+def invoice_version(db: Session, invoice_id: int):
+    """The version row of ``invoice_id`` (``tuple(row)`` is the token), or None if it doesn't exist"""
+    return db.execute(_VERSION, {"invoice_id": invoice_id}).first()
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_render(db: Session, kind: str, invoice_id: int, render: Callable[[], Optional[bytes]],
+                  variant: str = "") -> Optional[CachedRender]:
+    """Return the cached render of ``invoice_id``, calling ``render`` on a miss.
+
+    ``render`` returns the body, or None when the invoice can't be rendered. Returns
+    None when the invoice doesn't exist. ``variant`` separates renders of one
+    invoice that differ by request, such as the static URL baked into the HTML.
+    """
+    key = (kind, invoice_id, variant)
+    if not RENDER_CACHE_VERIFY:
+        entry = render_cache.get(key)
+        if entry is not None:
+            return entry
+
+    generation = render_cache.generation
+    # Read before rendering: a write landing in between leaves the body newer than the
+    # version, which only costs a re-render on the next request
+    row = invoice_version(db, invoice_id)
+    if row is None:
+        return None
+    version = tuple(row)
+    if RENDER_CACHE_VERIFY:
+        entry = render_cache.get(key, version)
+        if entry is not None:
+            return entry
+
+    body = render()
+    if body is None:
+        return None
+    entry = CachedRender(version, strong_etag(body), body)
+    render_cache.put(key, entry, (row.order_id, row.customer_id), generation)
+    return entry
+
+
+def etag_response(request: Request, kind: str, entry: CachedRender, media_type: str) -> Response:
+    """The cached body with its ETag, or an empty 304 if the client already has it"""
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        render_cache.note_not_modified(kind)
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=media_type, headers=headers)
+
+
+def _loaded(obj, name: str):
+    # Only what's already loaded: after_flush must not emit SQL to find an id
+    return inspect(obj).dict.get(name)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session: Session, flush_context) -> None:
+    touched = session.info.setdefault(_TOUCHED, {"invoice_ids": set(), "order_ids": set(), "customer_ids": set()})
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Invoice):
+            touched["invoice_ids"].add(_loaded(obj, "id"))
+        elif isinstance(obj, Order):
+            touched["order_ids"].add(_loaded(obj, "id"))
+        elif isinstance(obj, OrderMedicine):
+            touched["order_ids"].add(_loaded(obj, "order_id"))
+        elif isinstance(obj, Customer):
+            touched["customer_ids"].add(_loaded(obj, "id"))
+        elif isinstance(obj, Medicine) and obj not in session.new:
+            # Which invoices print it isn't known here; edits to medicines are rare
+            session.info[_TOUCHED_ALL] = True
+    if session.info.get(_TOUCHED_ALL):
+        render_cache.clear()
+    else:
+        render_cache.invalidate(**touched)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk_writes(orm_execute_state) -> None:
+    # UPDATE/DELETE statements skip the flush, and which rows they hit isn't known
+    # here. The order and line statements in Views.order only change status, stock
+    # and the lines of orders without an invoice, none of which is printed.
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in (Invoice.__tablename__, Customer.__tablename__, Medicine.__tablename__):
+        orm_execute_state.session.info[_TOUCHED_ALL] = True
+        render_cache.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    # Again at commit: a render that read the old rows between flush and commit
+    # could otherwise have been stored
+    touched = session.info.pop(_TOUCHED, None)
+    if session.info.pop(_TOUCHED_ALL, False):
+        render_cache.clear()
+    elif touched:
+        render_cache.invalidate(**touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_touched(session: Session) -> None:
+    session.info.pop(_TOUCHED, None)
+    session.info.pop(_TOUCHED_ALL, None)
@@ -1,7 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
+from databases.pagination import keyset_page, keyset_page_async
+
 from Models.stock import Stock
 from Models.medicine import Medicine
 
@@ -11,8 +15,9 @@ from Schemas.stock import StockCreate, StockUpdate
 def fetch_stock_by_id(db: Session, stock_id: int) -> Optional[Stock]:
     return db.query(Stock).filter(Stock.id == stock_id).first()
 
-def fetch_all_stocks(db: Session) -> List[Stock]:
-    return db.query(Stock).options(joinedload(Stock.medicine)).all()
+def fetch_stocks_page(db: Session, limit: int, after: Optional[list] = None) -> Tuple[List[Stock], Optional[str]]:
+    query = db.query(Stock).options(joinedload(Stock.medicine))
+    return keyset_page(db, query, [Stock.id], limit, after)
 
 def fetch_stock_by_medicine_id(db: Session, medicine_id: int) -> Optional[Stock]:
     return db.query(Stock).filter(Stock.medicine_id == medicine_id).first()
@@ -82,3 +87,15 @@ def delete_stock(db: Session, stock_id: int) -> Stock:
     db.delete(db_stock)
     db.commit()
     return {"detail": "Stock deleted successfully"}
+
+
+# Async variants used when USE_ASYNC_DB is enabled (see Views/order.py)
+async def fetch_stocks_page_async(db: AsyncSession, limit: int, after: Optional[list] = None) -> Tuple[List[Stock], Optional[str]]:
+    stmt = select(Stock).options(joinedload(Stock.medicine))
+    return await keyset_page_async(db, stmt, [Stock.id], limit, after)
+
+async def fetch_stock_by_id_async(db: AsyncSession, stock_id: int) -> Optional[Stock]:
+    return await db.scalar(select(Stock).where(Stock.id == stock_id).limit(1))
+
+async def fetch_stock_by_medicine_id_async(db: AsyncSession, medicine_id: int) -> Optional[Stock]:
+    return await db.scalar(select(Stock).where(Stock.medicine_id == medicine_id).limit(1))
@@ -1,7 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from databases.pagination import keyset_page
+
 from Models.user import User
 from Schemas.user import UserCreate, UserUpdate
 
@@ -18,8 +20,8 @@ def fetch_user_by_id(db: Session, user_id: int) -> Optional[User]:
 def fetch_user_by_username(db: Session, username: str) -> Optional[User]:
     return db.query(User).filter(User.username == username).first()
 
-def fetch_all_users(db: Session) -> List[User]:
-    return db.query(User).all()
+def fetch_users_page(db: Session, limit: int, after: Optional[list] = None) -> Tuple[List[User], Optional[str]]:
+    return keyset_page(db, db.query(User), [User.id], limit, after)
 
 def fetch_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
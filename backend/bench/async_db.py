@@ -0,0 +1,50 @@
+"""Throughput of the hot read endpoints with and without USE_ASYNC_DB.
+
+Sends a mix of order, stock and invoice list/detail GETs with ``--concurrency``
+requests in flight, once on the sync handlers and once on the AsyncSession path:
+    python bench/async_db.py [--requests 4000] [--concurrency 32]
+"""
+import argparse
+import os
+import sys
+
+from harness import prepare, print_result, run_load, run_variants, seed
+
+VARIANTS = {
+    "sync": {"USE_ASYNC_DB": "0"},
+    "async": {"USE_ASYNC_DB": "1"},
+}
+
+
+def request_mix(count: int):
+    paths = ["/orders?limit=50", "/orders/{id}", "/stocks?limit=50", "/invoices?limit=50", "/invoices/{id}"]
+    return [("GET", paths[i % len(paths)].format(id=i % 10 + 1), None) for i in range(count)]
+
+
+def child(args) -> None:
+    prepare()
+    seed()
+    import main
+
+    print_result(run_load(main.app, request_mix(args.requests), args.concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    results = run_variants(os.path.abspath(__file__), VARIANTS,
+                           ["--requests", str(args.requests), "--concurrency", str(args.concurrency)])
+    print(f"{'mode':<6} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'5xx':>4}")
+    for name, result in results.items():
+        print(f"{name:<6} {result['per_second']:>7.0f} {result['p50_ms']:>7.1f} "
+              f"{result['p95_ms']:>7.1f} {result['errors']:>4}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Shared setup for the scripts in bench/.
+
+Each benchmark runs against a throwaway SQLite file seeded by setup_db, and drives the
+app in-process through httpx's ASGI transport, so no server has to be started. A
+setting that is read at import time (USE_ASYNC_DB, SQLITE_*) is compared by running
+the script once per variant in a child process with that variant's environment.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (method, path, json body or None)
+Request = Tuple[str, str, Optional[dict]]
+
+
+def prepare(backend_dir: str = BACKEND_DIR) -> str:
+    """Point DATABASE_URL at a new temporary file and make ``backend_dir`` importable.
+
+    Call before importing anything from the backend; returns the database path.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="mediq-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("OVERDUE_SWEEP_ENABLED", "0")
+    os.chdir(backend_dir)
+    sys.path.insert(0, backend_dir)
+    return path
+
+
+def seed() -> None:
+    """Create the schema and setup_db's sample data, without its console output"""
+    import setup_db
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_db.setup_database()
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def _run_load(app, requests: Sequence[Request], concurrency: int) -> dict:
+    import httpx
+
+    queue = list(reversed(requests))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(client):
+        nonlocal errors
+        while queue:
+            method, path, body = queue.pop()
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 500:
+                errors += 1
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "per_second": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+    }
+
+
+def run_load(app, requests: Sequence[Request], concurrency: int) -> dict:
+    """Send ``requests`` with ``concurrency`` in flight; server errors are counted, not raised"""
+    return asyncio.run(_run_load(app, requests, concurrency))
+
+
+def run_variants(script: str, variants: Dict[str, Dict[str, str]], args: Sequence[str] = ()) -> Dict[str, dict]:
+    """Run ``script --child`` once per variant environment and collect its JSON result line"""
+    results = {}
+    for name, env in variants.items():
+        completed = subprocess.run(
+            [sys.executable, script, "--child", *args],
+            env={**os.environ, **env}, capture_output=True, text=True,
+        )
+        if completed.returncode:
+            raise RuntimeError(f"{name} run failed:\n{completed.stderr}")
+        results[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+    return results
+
+
+def print_result(result: dict) -> None:
+    """What a ``--child`` run prints for run_variants to pick up"""
+    print(json.dumps(result))
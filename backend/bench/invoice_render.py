@@ -0,0 +1,364 @@
+"""Invoice HTML render throughput: the Jinja templates against the old f-string.
+
+The f-string baseline is the ``generate_invoice_html`` Routes/invoice.py had before
+the templates replaced it, copied below as ``fstring_invoice_html``:
+    python bench/invoice_render.py [--rounds 5]
+Prints renders per second (best of ``--rounds``) for invoices of 1, 50 and 500 lines.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from Schemas.invoice import InvoiceWithDetails
+from Views.invoice_render import render_invoice_html
+
+LINE_COUNTS = (1, 50, 500)
+
+
+def fstring_invoice_html(invoice: InvoiceWithDetails) -> str:
+    """The f-string renderer Routes/invoice.py used before the templates, unchanged"""
+    
+    # Calculate subtotal
+    subtotal = sum(item.total_price for item in invoice.order_medicines)
+    
+    html = f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Invoice #{invoice.invoice_number}</title>
+        <style>
+            body {{
+                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+                margin: 0;
+                padding: 20px;
+                color: #333;
+                line-height: 1.6;
+            }}
+            .invoice-container {{
+                max-width: 800px;
+                margin: 0 auto;
+                background: white;
+                padding: 30px;
+                border-radius: 8px;
+                box-shadow: 0 0 10px rgba(0,0,0,0.1);
+            }}
+            .header {{
+                display: flex;
+                justify-content: space-between;
+                align-items: flex-start;
+                margin-bottom: 30px;
+                padding-bottom: 20px;
+                border-bottom: 2px solid #2563eb;
+            }}
+            .company-info h1 {{
+                color: #2563eb;
+                margin: 0;
+                font-size: 28px;
+            }}
+            .company-info p {{
+                margin: 5px 0;
+                color: #666;
+            }}
+            .invoice-title {{
+                text-align: right;
+            }}
+            .invoice-title h2 {{
+                color: #2563eb;
+                margin: 0;
+                font-size: 24px;
+            }}
+            .invoice-details {{
+                display: grid;
+                grid-template-columns: 1fr 1fr;
+                gap: 30px;
+                margin-bottom: 30px;
+            }}
+            .section h3 {{
+                color: #2563eb;
+                margin-bottom: 10px;
+                font-size: 16px;
+                text-transform: uppercase;
+                letter-spacing: 1px;
+            }}
+            .info-table {{
+                width: 100%;
+                border-collapse: collapse;
+                margin-bottom: 30px;
+            }}
+            .info-table th,
+            .info-table td {{
+                padding: 12px;
+                text-align: left;
+                border-bottom: 1px solid #e5e7eb;
+            }}
+            .info-table th {{
+                background-color: #f8fafc;
+                font-weight: 600;
+                color: #374151;
+            }}
+            .amount-column {{
+                text-align: right !important;
+            }}
+            .totals {{
+                margin-top: 20px;
+                padding-top: 20px;
+                border-top: 2px solid #e5e7eb;
+            }}
+            .totals-table {{
+                width: 300px;
+                margin-left: auto;
+                border-collapse: collapse;
+            }}
+            .totals-table td {{
+                padding: 8px 12px;
+                border: none;
+            }}
+            .totals-table .total-row {{
+                font-weight: bold;
+                font-size: 18px;
+                color: #2563eb;
+                border-top: 2px solid #2563eb;
+            }}
+            .notes {{
+                margin-top: 30px;
+                padding: 20px;
+                background-color: #f8fafc;
+                border-radius: 6px;
+            }}
+            .notes h4 {{
+                margin-top: 0;
+                color: #374151;
+            }}
+            .footer {{
+                margin-top: 40px;
+                text-align: center;
+                color: #6b7280;
+                font-size: 14px;
+                border-top: 1px solid #e5e7eb;
+                padding-top: 20px;
+            }}
+            .status {{
+                display: inline-block;
+                padding: 4px 12px;
+                border-radius: 20px;
+                font-size: 12px;
+                font-weight: bold;
+                text-transform: uppercase;
+            }}
+            .status-paid {{
+                background-color: #d1fae5;
+                color: #065f46;
+            }}
+            .status-sent {{
+                background-color: #dbeafe;
+                color: #1e40af;
+            }}
+            .status-overdue {{
+                background-color: #fee2e2;
+                color: #991b1b;
+            }}
+            .status-draft {{
+                background-color: #f3f4f6;
+                color: #374151;
+            }}
+            @media print {{
+                body {{
+                    padding: 0;
+                }}
+                .invoice-container {{
+                    box-shadow: none;
+                    padding: 0;
+                }}
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="invoice-container">
+            <!-- Header -->
+            <div class="header">
+                <div class="company-info">
+                    <h1>MediQ Pharmacy</h1>
+                    <p>123 Health Street, Medical City, MC 12345</p>
+                    <p>Phone: +1 (555) 123-4567</p>
+                    <p>Email: info@mediq.com</p>
+                    <p>Website: www.mediq.com</p>
+                </div>
+                <div class="invoice-title">
+                    <h2>INVOICE</h2>
+                    <p><strong>{invoice.invoice_number}</strong></p>
+                    <span class="status status-{invoice.status.value}">{invoice.status.value}</span>
+                </div>
+            </div>
+            
+            <!-- Invoice Details -->
+            <div class="invoice-details">
+                <div class="section">
+                    <h3>Bill To:</h3>
+                    <p><strong>{invoice.customer_name}</strong></p>
+                    {f'<p>{invoice.customer_email}</p>' if invoice.customer_email else ''}
+                    {f'<p>{invoice.customer_phone}</p>' if invoice.customer_phone else ''}
+                    {f'<p>{invoice.customer_address}</p>' if invoice.customer_address else ''}
+                </div>
+                <div class="section">
+                    <h3>Invoice Information:</h3>
+                    <p><strong>Invoice Date:</strong> {invoice.issued_date.strftime('%B %d, %Y')}</p>
+                    {f'<p><strong>Due Date:</strong> {invoice.due_date.strftime("%B %d, %Y")}</p>' if invoice.due_date else ''}
+                    <p><strong>Order ID:</strong> #{invoice.order_id}</p>
+                    <p><strong>Order Date:</strong> {invoice.order_date.strftime('%B %d, %Y')}</p>
+                    {f'<p><strong>Payment Date:</strong> {invoice.paid_date.strftime("%B %d, %Y")}</p>' if invoice.paid_date else ''}
+                </div>
+            </div>
+            
+            <!-- Items Table -->
+            <table class="info-table">
+                <thead>
+                    <tr>
+                        <th>Medicine</th>
+                        <th>Quantity</th>
+                        <th class="amount-column">Unit Price</th>
+                        <th class="amount-column">Total</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """
+    
+    # Add items
+    for item in invoice.order_medicines:
+        html += f"""
+                    <tr>
+                        <td>{item.medicine_name}</td>
+                        <td>{item.quantity}</td>
+                        <td class="amount-column">₹{item.unit_price:.2f}</td>
+                        <td class="amount-column">₹{item.total_price:.2f}</td>
+                    </tr>
+        """
+    
+    html += f"""
+                </tbody>
+            </table>
+            
+            <!-- Totals -->
+            <div class="totals">
+                <table class="totals-table">
+                    <tr>
+                        <td>Subtotal:</td>
+                        <td class="amount-column">₹{subtotal:.2f}</td>
+                    </tr>
+    """
+    
+    if invoice.discount > 0:
+        html += f"""
+                    <tr>
+                        <td>Discount:</td>
+                        <td class="amount-column">-₹{invoice.discount:.2f}</td>
+                    </tr>
+        """
+    
+    if invoice.tax > 0:
+        html += f"""
+                    <tr>
+                        <td>Tax:</td>
+                        <td class="amount-column">₹{invoice.tax:.2f}</td>
+                    </tr>
+        """
+    
+    html += f"""
+                    <tr class="total-row">
+                        <td>Total Amount:</td>
+                        <td class="amount-column">₹{invoice.total_amount:.2f}</td>
+                    </tr>
+                </table>
+            </div>
+    """
+    
+    # Add notes if available
+    if invoice.notes:
+        html += f"""
+            <div class="notes">
+                <h4>Notes:</h4>
+                <p>{invoice.notes}</p>
+            </div>
+        """
+    
+    # Add terms if available
+    if invoice.terms:
+        html += f"""
+            <div class="notes">
+                <h4>Terms & Conditions:</h4>
+                <p>{invoice.terms}</p>
+            </div>
+        """
+    
+    html += """
+            <!-- Footer -->
+            <div class="footer">
+                <p>Thank you for your business!</p>
+                <p>If you have any questions about this invoice, please contact us at info@mediq.com</p>
+            </div>
+        </div>
+        
+        <script>
+            // Auto-print when opened in new window
+            window.onload = function() {
+                if (window.location.search.includes('print=true')) {
+                    window.print();
+                }
+            }
+        </script>
+    </body>
+    </html>
+    """
+    
+    return html
+
+
+def sample_invoice(lines: int) -> InvoiceWithDetails:
+    day = datetime(2026, 10, 1)
+    return InvoiceWithDetails(
+        id=1, invoice_number="INV-2026-0001", order_id=7, user_id=1,
+        amount=100, tax=18, discount=5, total_amount=113, status="paid",
+        notes="Deliver <b>fast</b> & careful", terms="Net 30",
+        due_date=datetime(2026, 11, 1), issued_date=day, paid_date=datetime(2026, 10, 5),
+        created_at=day, updated_at=day, order_date=datetime(2026, 9, 30),
+        customer_name="Asha Rao", customer_email="asha@example.com",
+        customer_phone="555-0100", customer_address="12 Health Street",
+        order_medicines=[
+            {"medicine_name": f"Medicine {i}", "quantity": 2, "unit_price": 3.5, "total_price": 7.0}
+            for i in range(lines)
+        ],
+    )
+
+
+def renders_per_second(render, invoice, rounds: int) -> float:
+    count = max(20, 20000 // (len(invoice.order_medicines) + 10))
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(count):
+            render(invoice)
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'lines':>5} {'f-string/s':>11} {'jinja/s':>9} {'ratio':>6}")
+    for lines in LINE_COUNTS:
+        invoice = sample_invoice(lines)
+        old = renders_per_second(fstring_invoice_html, invoice, args.rounds)
+        new = renders_per_second(render_invoice_html, invoice, args.rounds)
+        print(f"{lines:>5} {old:>11.0f} {new:>9.0f} {old / new:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Save latency and SQL statements of POST /orders and PUT /orders/{id} by order size.
+
+For each line count an order is created with that many distinct medicines and then
+updated with every quantity changed, ``--repeat`` times; the median latency and the
+X-DB-Queries count of each call are printed:
+    python bench/order_statements.py [--lines 1,20,200] [--repeat 20]
+The baseline is the code from before order lines were resolved with batched lookups,
+when create_order and update_order still read each line's medicine and stock on their
+own. To measure it, check out that commit into a worktree and point ``--backend`` at
+its backend directory; this script and its harness stay in the current tree.
+"""
+import argparse
+import logging
+import os
+import statistics
+import time
+import warnings
+
+from harness import BACKEND_DIR, prepare
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", default="1,20,200", help="comma-separated line counts")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", default=BACKEND_DIR, help="backend directory to import the app from")
+    args = parser.parse_args()
+    line_counts = [int(count) for count in args.lines.split(",")]
+
+    # The older code logs N+1 warnings and SAWarnings on every request
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore")
+    prepare(os.path.abspath(args.backend))
+    import main as app_module
+    from fastapi.testclient import TestClient
+
+    from databases.database import SessionLocal
+    from Models.customer import Customer
+    from Models.medicine import Medicine
+    from Models.stock import Stock
+
+    with TestClient(app_module.app) as client:
+        with SessionLocal() as db:
+            customer = Customer(name="Bench Customer")
+            medicines = [Medicine(name=f"Bench Medicine {i}", price=10.0 + i) for i in range(max(line_counts))]
+            db.add_all([customer, *medicines])
+            db.flush()
+            db.add_all([Stock(medicine_id=medicine.id, quantity=10 ** 9) for medicine in medicines])
+            db.commit()
+            customer_id = customer.id
+            medicine_ids = [medicine.id for medicine in medicines]
+
+        print(f"{'lines':>5} {'POST ms':>8} {'stmts':>5} {'PUT ms':>8} {'stmts':>5}")
+        for count in line_counts:
+            lines = [{"medicine_id": medicine_id, "quantity": 1} for medicine_id in medicine_ids[:count]]
+            changed = [dict(line, quantity=2) for line in lines]
+            post_times, put_times = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                created = client.post("/orders", json={"customer_id": customer_id, "order_medicines": lines})
+                post_times.append(time.perf_counter() - start)
+                created.raise_for_status()
+
+                start = time.perf_counter()
+                updated = client.put(f"/orders/{created.json()['id']}", json={"order_medicines": changed})
+                put_times.append(time.perf_counter() - start)
+                updated.raise_for_status()
+            print(f"{count:>5} {statistics.median(post_times) * 1000:>8.1f} {created.headers['X-DB-Queries']:>5} "
+                  f"{statistics.median(put_times) * 1000:>8.1f} {updated.headers['X-DB-Queries']:>5}")
+
+
+if __name__ == "__main__":
+    main()
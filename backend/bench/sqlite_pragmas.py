@@ -0,0 +1,68 @@
+"""Mixed read/write throughput under the SQLite pragma profile against SQLite's defaults.
+
+One request in five places an order (POST /orders), the rest list and read orders,
+all with ``--concurrency`` requests in flight. "profile" is the default SQLITE_*
+configuration (WAL, synchronous=NORMAL, a 64 MB cache, mmap); "sqlite defaults" is a
+rollback journal with synchronous=FULL and the stock cache, with the same 5 s busy
+timeout pysqlite applies by default:
+    python bench/sqlite_pragmas.py [--requests 2000] [--concurrency 16]
+"""
+import argparse
+import os
+import sys
+
+from harness import prepare, print_result, run_load, run_variants, seed
+
+VARIANTS = {
+    "profile": {},
+    "sqlite defaults": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_TEMP_STORE": "DEFAULT",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",
+    },
+}
+
+
+def request_mix(count: int):
+    requests = []
+    for i in range(count):
+        if i % 5 == 0:
+            order = {"customer_id": i % 10 + 1, "order_medicines": [{"medicine_id": i % 20 + 1, "quantity": 1}]}
+            requests.append(("POST", "/orders", order))
+        elif i % 5 in (1, 2):
+            requests.append(("GET", "/orders?limit=50", None))
+        else:
+            requests.append(("GET", f"/orders/{i % 15 + 1}", None))
+    return requests
+
+
+def child(args) -> None:
+    prepare()
+    seed()
+    import main
+
+    print_result(run_load(main.app, request_mix(args.requests), args.concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    results = run_variants(os.path.abspath(__file__), VARIANTS,
+                           ["--requests", str(args.requests), "--concurrency", str(args.concurrency)])
+    print(f"{'pragmas':<16} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'5xx':>4}")
+    for name, result in results.items():
+        print(f"{name:<16} {result['per_second']:>7.0f} {result['p50_ms']:>7.1f} "
+              f"{result['p95_ms']:>7.1f} {result['errors']:>4}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Checkout throughput when many orders race for the same scarce stock.
+
+Fires ``--orders`` single-unit orders at one medicine holding ``--stock`` units from
+each of the ``--threads`` counts, through create_order on its own session per order,
+and reports attempts per second, accepted orders and the final stock. Accepted must
+equal the stock and the final stock must be 0; anything else is an oversell:
+    python bench/stock_contention.py [--orders 300] [--stock 100] [--threads 1,4,16]
+tests/test_stock_contention.py checks the same guarantee without timing it.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from harness import prepare
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--threads", default="1,4,16", help="comma-separated thread counts")
+    args = parser.parse_args()
+    thread_counts = [int(count) for count in args.threads.split(",")]
+
+    prepare()
+    # One connection per thread, so the pool isn't what they queue on
+    os.environ.setdefault("DB_POOL_SIZE", str(max(thread_counts)))
+    from fastapi import HTTPException
+    from sqlalchemy import select
+
+    from databases.database import SessionLocal, engine
+    from databases.migrations import run_migrations
+    from Models.customer import Customer
+    from Models.medicine import Medicine
+    from Models.stock import Stock
+    from Schemas.order import OrderCreate
+    from Views.order import create_order
+
+    run_migrations(engine)
+    with SessionLocal() as db:
+        customer = Customer(name="Bench Customer")
+        db.add(customer)
+        db.commit()
+        customer_id = customer.id
+
+    def stocked_medicine() -> int:
+        with SessionLocal() as db:
+            medicine = Medicine(name="Bench Medicine", price=10.0)
+            db.add(medicine)
+            db.flush()
+            db.add(Stock(medicine_id=medicine.id, quantity=args.stock))
+            db.commit()
+            return medicine.id
+
+    def place(order: OrderCreate) -> bool:
+        with SessionLocal() as db:
+            try:
+                create_order(db, order)
+            except HTTPException as exc:
+                if exc.status_code not in (400, 409):
+                    raise
+                return False
+        return True
+
+    print(f"{'threads':>7} {'attempts/s':>10} {'accepted':>8} {'final stock':>11}")
+    for threads in thread_counts:
+        medicine_id = stocked_medicine()
+        order = OrderCreate(customer_id=customer_id, order_medicines=[{"medicine_id": medicine_id, "quantity": 1}])
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            accepted = sum(pool.map(lambda _: place(order), range(args.orders)))
+        elapsed = time.perf_counter() - start
+        with SessionLocal() as db:
+            left = db.scalar(select(Stock.quantity).where(Stock.medicine_id == medicine_id))
+        print(f"{threads:>7} {args.orders / elapsed:>10.0f} {accepted:>8} {left:>11}")
+
+
+if __name__ == "__main__":
+    main()
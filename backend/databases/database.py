@@ -1,9 +1,13 @@
+import logging
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 
+from databases.pool_metrics import InstrumentedQueuePool, instrument_engine
+
 
 def _default_sqlite_url() -> str:
     data_dir = Path(__file__).resolve().parent.parent / "data"
@@ -13,17 +17,165 @@ def _default_sqlite_url() -> str:
     return f"sqlite:///{db_path.as_posix()}"
 
 
+def _env_flag(name: str, default: bool = False) -> bool:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:") or url.startswith("postgres:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+def _pool_kwargs(url: str, instrumented: bool = True) -> dict:
+    """Pool sizing from the environment (SQLAlchemy's defaults when unset)"""
+    kwargs = {"pool_pre_ping": _env_flag("DB_POOL_PRE_PING")}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:")):
+        # In-memory SQLite uses a singleton pool with no sizing options
+        return kwargs
+    if instrumented:
+        kwargs["poolclass"] = InstrumentedQueuePool
+    kwargs.update({
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+    })
+    return kwargs
+
+
+logger = logging.getLogger("mediq.db")
+
 DATABASE_URL = os.getenv("DATABASE_URL") or _default_sqlite_url()
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# SQLite production profile, applied to every new connection. WAL lets readers keep
+# going while a writer (e.g. create_order) holds the lock, and busy_timeout makes
+# concurrent writers wait instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # negative = KiB, i.e. 64 MB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "ON"),
+}
+
+
+# Read-only connections can't switch the journal mode, and query_only makes sure a
+# replica opened on a copied file is never written to by accident.
+SQLITE_READ_PRAGMAS = {
+    **{name: value for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"},
+    "query_only": "ON",
+}
+
+
+def _sqlite_pragma_listener(pragmas: dict):
+    def apply_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+
+_apply_sqlite_pragmas = _sqlite_pragma_listener(SQLITE_PRAGMAS)
 
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **_pool_kwargs(DATABASE_URL))
+if IS_SQLITE:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+instrument_engine(engine, "primary")
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
+# Read-only engine for list/detail endpoints so long report queries don't compete
+# with checkout writes for the primary pool. Locally this can be the same SQLite
+# file opened read-only (sqlite:///file:data/mediq.db?mode=ro&uri=true) or a copy.
+# Without READ_DATABASE_URL reads fall back to the primary engine.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+if READ_DATABASE_URL:
+    read_connect_args = {"check_same_thread": False} if READ_DATABASE_URL.startswith("sqlite") else {}
+    read_engine = create_engine(
+        READ_DATABASE_URL, connect_args=read_connect_args, **_pool_kwargs(READ_DATABASE_URL)
+    )
+    if READ_DATABASE_URL.startswith("sqlite"):
+        event.listen(read_engine, "connect", _sqlite_pragma_listener(SQLITE_READ_PRAGMAS))
+    instrument_engine(read_engine, "read")
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
+
+# Async engine (opt-in). When USE_ASYNC_DB is set, the hot routers (orders, stocks,
+# invoices) are served by async handlers so waiting on the database no longer
+# occupies a threadpool worker.
+USE_ASYNC_DB = _env_flag("USE_ASYNC_DB")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+async_engine = None
+AsyncSessionLocal = None
+if USE_ASYNC_DB:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=connect_args,
+        **_pool_kwargs(ASYNC_DATABASE_URL, instrumented=False),
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    if IS_SQLITE:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    instrument_engine(async_engine.sync_engine, "async")
+
+
+def sqlite_settings() -> dict:
+    """Read back the effective PRAGMA values from a pooled connection"""
+    if not IS_SQLITE:
+        return {}
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in SQLITE_PRAGMAS
+        }
+
+
+def log_sqlite_settings() -> None:
+    settings = sqlite_settings()
+    if settings:
+        logger.info(
+            "SQLite settings: %s",
+            ", ".join(f"{name}={value}" for name, value in settings.items()),
+        )
+
 # Dependency function
 def get_db():
     db: Session = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Read-only dependency function for GET endpoints
+def get_read_db():
+    db: Session = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Async dependency function
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled; set USE_ASYNC_DB=1 to enable it")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,159 @@
+"""Lightweight versioned schema migrations.
+
+The applied version lives in the ``schema_version`` table. On boot the runner does a
+single ``SELECT MAX(version)`` and returns immediately when the schema is current, so
+there is no metadata reflection on the hot path. Every migration is written to be
+idempotent (``IF NOT EXISTS`` / ``checkfirst``) so two workers booting at once can't
+break each other.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from databases.database import Base
+from Models.background_job import BackgroundJob
+from Models.customer import Customer
+from Models.daily_sales import DailySales
+from Models.idempotency import IdempotencyRecord
+from Models.invoice import Invoice, InvoiceSequence
+from Models.medicine import Medicine
+from Models.order import Order, OrderMedicine
+from Models.stock import Stock
+from Models.user import User
+
+logger = logging.getLogger("mediq.migrations")
+
+# Tables that existed before versioned migrations were introduced. Later tables are
+# created by their own migration so the version number keeps meaning something.
+BASELINE_TABLES = [
+    User.__table__,
+    Customer.__table__,
+    Medicine.__table__,
+    Stock.__table__,
+    Order.__table__,
+    OrderMedicine.__table__,
+    Invoice.__table__,
+]
+
+
+def _create_performance_indexes(conn: Connection) -> None:
+    # Names match what the model definitions generate, so fresh databases created
+    # from the models and upgraded production databases end up identical.
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_order_medicines_order_id ON order_medicines (order_id)",
+        "CREATE INDEX IF NOT EXISTS ix_order_medicines_medicine_id ON order_medicines (medicine_id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_customer_id ON orders (customer_id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_order_date ON orders (order_date)",
+        "CREATE INDEX IF NOT EXISTS ix_invoices_user_id ON invoices (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_invoices_created_at ON invoices (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_invoices_status_due_date ON invoices (status, due_date)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+def _create_idempotency_keys(conn: Connection) -> None:
+    IdempotencyRecord.__table__.create(bind=conn, checkfirst=True)
+
+
+def _create_background_jobs(conn: Connection) -> None:
+    BackgroundJob.__table__.create(bind=conn, checkfirst=True)
+
+
+def _create_invoice_sequences(conn: Connection) -> None:
+    InvoiceSequence.__table__.create(bind=conn, checkfirst=True)
+
+
+def _create_daily_sales(conn: Connection) -> None:
+    DailySales.__table__.create(bind=conn, checkfirst=True)
+    # Backfill from the orders and invoices already there. Fixed SQL rather than
+    # Views.daily_sales.rebuild_daily_sales, so later changes to the rollup code
+    # can't change what this migration does. Enums are stored by name.
+    conn.execute(text(
+        "INSERT INTO daily_sales (day, order_count, gross_amount, tax, discount, paid_amount) "
+        "SELECT day, SUM(order_count), SUM(gross_amount), SUM(tax), SUM(discount), SUM(paid_amount) "
+        "FROM ("
+        " SELECT date(order_date) AS day, COUNT(*) AS order_count,"
+        " COALESCE(SUM(total_amount), 0) AS gross_amount, 0 AS tax, 0 AS discount, 0 AS paid_amount"
+        " FROM orders WHERE status != 'CANCELLED' GROUP BY date(order_date)"
+        " UNION ALL"
+        " SELECT date(created_at), 0, 0, COALESCE(SUM(tax), 0), COALESCE(SUM(discount), 0), 0"
+        " FROM invoices GROUP BY date(created_at)"
+        " UNION ALL"
+        " SELECT date(paid_date), 0, 0, 0, 0, COALESCE(SUM(total_amount), 0)"
+        " FROM invoices WHERE status = 'PAID' GROUP BY date(paid_date)"
+        ") AS per_source "
+        "WHERE day IS NOT NULL "
+        "GROUP BY day"
+    ))
+
+
+# (version, description, apply(conn)) in ascending version order
+MIGRATIONS = [
+    (1, "performance indexes on hot foreign keys and invoice status/due_date", _create_performance_indexes),
+    (2, "idempotency_keys table for POST /orders and /invoices", _create_idempotency_keys),
+    (3, "background_jobs table for the overdue sweeper's leader lease and run times", _create_background_jobs),
+    (4, "invoice_sequences table for per-year invoice numbers", _create_invoice_sequences),
+    (5, "daily_sales revenue rollup, backfilled from orders and invoices", _create_daily_sales),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def _ensure_version_table(engine: Engine) -> None:
+    """Create schema_version and the baseline tables on first run"""
+    with engine.begin() as conn:
+        if inspect(conn).has_table("schema_version"):
+            return
+        Base.metadata.create_all(bind=conn, tables=BASELINE_TABLES)
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def current_version(conn: Connection) -> int:
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def run_migrations(engine: Engine) -> int:
+    """Bring the database up to LATEST_VERSION and return the resulting version"""
+    try:
+        with engine.connect() as conn:
+            version = current_version(conn)
+    except Exception:
+        # schema_version missing: fresh database, or one created before migrations
+        _ensure_version_table(engine)
+        version = 0
+
+    if version >= LATEST_VERSION:
+        logger.info("Database schema is current (version %s)", version)
+        return version
+
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        try:
+            with engine.begin() as conn:
+                if current_version(conn) >= target:
+                    continue  # applied by another worker in the meantime
+                apply(conn)
+                conn.execute(
+                    text(
+                        "INSERT INTO schema_version (version, description, applied_at) "
+                        "VALUES (:version, :description, :applied_at)"
+                    ),
+                    {"version": target, "description": description, "applied_at": datetime.now()},
+                )
+        except IntegrityError:
+            # Another worker recorded the same version first; its work is identical
+            continue
+        logger.info("Applied migration %s: %s", target, description)
+        version = target
+
+    return version
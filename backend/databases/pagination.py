@@ -0,0 +1,223 @@
+"""Keyset (cursor) pagination for the list endpoints.
+
+Pages are selected with ``WHERE (key) > (last key seen) ORDER BY key LIMIT n`` on an
+indexed sort key, so a deep page costs the same as the first one. Unlike OFFSET, no
+rows are skipped or repeated when rows are inserted between requests. The cursor is
+the last row's key encoded as opaque base64 JSON. List bodies stay plain JSON arrays.
+The next page is advertised in a ``Link: <...>; rel="next"`` header and in
+``X-Next-Cursor``. The optional approximate total goes in ``X-Total-Count``.
+"""
+import base64
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Request, Response, status
+from sqlalchemy import Select, String, and_, func, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as OrmQuery, Session
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+PAGE_TOTAL_TTL_SECONDS = float(os.getenv("PAGE_TOTAL_TTL_SECONDS", "30"))
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    return values
+
+
+class PageParams:
+    """Query parameters shared by every paginated list route"""
+
+    def __init__(
+        self,
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX, description="Rows per page"),
+        after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        include_total: bool = Query(False, description="Add an approximate X-Total-Count header"),
+    ):
+        self.limit = limit
+        self.after = decode_cursor(after) if after else None
+        self.include_total = include_total
+
+
+def _key_expression(column, dialect_name: str):
+    # SQLite keeps DATETIME as text in whatever format it was written with (server
+    # defaults have no fractional seconds, ORM writes do). Comparing the stored text
+    # against the stored text keeps the cursor exact and still uses the index.
+    return type_coerce(column, String) if dialect_name == "sqlite" else column
+
+
+def _cursor_value(column, value: Any, dialect_name: str) -> Any:
+    if dialect_name == "sqlite" or value is None:
+        return value
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def _keyset(db: Session, keys: Sequence[Any], after: Optional[list], descending: bool):
+    """Key expressions, the WHERE clause for rows past ``after`` and the ORDER BY"""
+    dialect_name = db.get_bind().dialect.name
+    expressions = [_key_expression(column, dialect_name) for column in keys]
+
+    clause = None
+    if after is not None:
+        if len(after) != len(keys):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+        values = [_cursor_value(column, value, dialect_name) for column, value in zip(keys, after)]
+        # (k1, k2) > (v1, v2) expanded so every dialect can use the index on k1
+        clauses = []
+        for i, expression in enumerate(expressions):
+            beyond = expression < values[i] if descending else expression > values[i]
+            clauses.append(and_(*[expressions[j] == values[j] for j in range(i)], beyond))
+        clause = or_(*clauses)
+
+    ordering = [e.desc() if descending else e.asc() for e in expressions]
+    labelled = [e.label(f"page_key_{i}") for i, e in enumerate(expressions)]
+    return labelled, clause, ordering
+
+
+def _split_page(rows: list, limit: int, cursor_of) -> Tuple[list, Optional[str]]:
+    """Drop the look-ahead row fetched past ``limit`` and encode the cursor it implies"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(cursor_of(rows[-1]))
+    return rows, None
+
+
+def keyset_page(
+    db: Session,
+    query: OrmQuery,
+    keys: Sequence[Any],
+    limit: int,
+    after: Optional[list],
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """Return up to ``limit`` rows of ``query`` after the cursor, plus the next cursor.
+
+    ``keys`` must be non-null columns that together identify a row, ending with the
+    primary key as the tie-breaker.
+    """
+    labelled, clause, ordering = _keyset(db, keys, after, descending)
+    if clause is not None:
+        query = query.filter(clause)
+    rows = query.add_columns(*labelled).order_by(*ordering).limit(limit + 1).all()
+    rows, next_cursor = _split_page(rows, limit, lambda row: row[1:])
+    return [row[0] for row in rows], next_cursor
+
+
+def _keyset_stmt(db, stmt: Select, keys: Sequence[Any], limit: int, after: Optional[list],
+                 descending: bool) -> Tuple[Select, list]:
+    labelled, clause, ordering = _keyset(db, keys, after, descending)
+    if clause is not None:
+        stmt = stmt.where(clause)
+    return stmt.add_columns(*labelled).order_by(*ordering).limit(limit + 1), labelled
+
+
+def keyset_rows(
+    db: Session,
+    stmt: Select,
+    keys: Sequence[Any],
+    limit: int,
+    after: Optional[list],
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """keyset_page for a column-only ``select()``: returns plain row mappings"""
+    stmt, labelled = _keyset_stmt(db, stmt, keys, limit, after, descending)
+    rows = db.execute(stmt).mappings().all()
+    return _split_page(rows, limit, lambda row: [row[label.name] for label in labelled])
+
+
+# Native AsyncSession versions: the query is awaited, so the event loop serves other
+# requests while the database works instead of handing the whole view to run_sync.
+async def keyset_page_async(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[Any],
+    limit: int,
+    after: Optional[list],
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """keyset_page for an entity ``select(Model)``: returns the entities"""
+    stmt, _ = _keyset_stmt(db, stmt, keys, limit, after, descending)
+    rows = (await db.execute(stmt)).all()
+    rows, next_cursor = _split_page(rows, limit, lambda row: row[1:])
+    return [row[0] for row in rows], next_cursor
+
+
+async def keyset_rows_async(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[Any],
+    limit: int,
+    after: Optional[list],
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    stmt, labelled = _keyset_stmt(db, stmt, keys, limit, after, descending)
+    rows = (await db.execute(stmt)).mappings().all()
+    return _split_page(rows, limit, lambda row: [row[label.name] for label in labelled])
+
+
+_totals_lock = threading.Lock()
+_totals: dict = {}
+
+
+def _cached_total(name: str, now: float) -> Optional[int]:
+    with _totals_lock:
+        cached = _totals.get(name)
+    if cached is not None and now - cached[1] < PAGE_TOTAL_TTL_SECONDS:
+        return cached[0]
+    return None
+
+
+def _store_total(name: str, total: int, now: float) -> int:
+    with _totals_lock:
+        _totals[name] = (total, now)
+    return total
+
+
+def approximate_total(db: Session, model) -> int:
+    """Row count for ``model``, cached for PAGE_TOTAL_TTL_SECONDS"""
+    name = model.__tablename__
+    now = time.monotonic()
+    cached = _cached_total(name, now)
+    if cached is not None:
+        return cached
+    return _store_total(name, db.query(func.count()).select_from(model).scalar(), now)
+
+
+async def approximate_total_async(db: AsyncSession, model) -> int:
+    name = model.__tablename__
+    now = time.monotonic()
+    cached = _cached_total(name, now)
+    if cached is not None:
+        return cached
+    return _store_total(name, await db.scalar(select(func.count()).select_from(model)), now)
+
+
+def set_page_headers(request: Request, response: Response, next_cursor: Optional[str],
+                     total: Optional[int] = None) -> None:
+    if next_cursor is not None:
+        next_url = request.url.include_query_params(after=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
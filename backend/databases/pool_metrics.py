@@ -0,0 +1,119 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Counters for one engine's pool, updated from pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_last = seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = self.wait_total / self.wait_count if self.wait_count else 0.0
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms": {
+                    "avg": round(avg * 1000, 3),
+                    "max": round(self.wait_max * 1000, 3),
+                    "last": round(self.wait_last * 1000, 3),
+                },
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long callers wait to check out a connection"""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.incr("timeouts")
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+_registry: dict = {}
+
+
+def instrument_engine(engine, name: str) -> PoolMetrics:
+    """Attach pool event listeners to an engine and register its metrics"""
+    if name in _registry:
+        return _registry[name][1]
+
+    metrics = PoolMetrics()
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+
+    event.listen(engine, "connect", lambda *_: metrics.incr("connects"))
+    event.listen(engine, "checkout", lambda *_: metrics.incr("checkouts"))
+    event.listen(engine, "checkin", lambda *_: metrics.incr("checkins"))
+    event.listen(engine, "invalidate", lambda *_: metrics.incr("invalidations"))
+
+    _registry[name] = (engine, metrics)
+    return metrics
+
+
+def pool_status(name: str) -> dict:
+    """Current pool occupancy plus the recorded counters for a registered engine"""
+    engine, metrics = _registry[name]
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        max_overflow = pool._max_overflow
+        in_use = pool.checkedout()
+        status.update({
+            "pool_size": size,
+            "max_overflow": max_overflow,
+            "in_use": in_use,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "capacity": size + max_overflow if max_overflow >= 0 else None,
+        })
+    status.update(metrics.snapshot())
+    return status
+
+
+def registered_pools() -> list:
+    return list(_registry)
@@ -0,0 +1,116 @@
+"""Per-request SQL statement counting and N+1 detection.
+
+Cursor execute events on every Engine add to a stats object held in a contextvar
+for the current request. QueryStatsMiddleware creates that object, reports it in
+the ``X-DB-Queries`` and ``Server-Timing`` response headers, and logs a warning
+when one statement shape repeats more than QUERY_REPEAT_THRESHOLD times.
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from databases import slow_queries
+
+logger = logging.getLogger("mediq.queries")
+
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+
+# Collapse expanded IN lists so "IN (?, ?)" and "IN (?, ?, ?)" count as one shape
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestQueryStats:
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "")
+        return f"{self.scope.get('method', '')} {path}".strip()
+
+    def record(self, shape: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int) -> list:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement_shape(statement), duration)
+    if duration * 1000 >= slow_queries.SLOW_QUERY_MS:
+        slow_queries.record_if_slow(
+            conn, statement, parameters, executemany, duration,
+            shape=statement_shape(statement),
+            route=stats.route if stats is not None else None,
+        )
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that attaches per-request DB statistics to the response"""
+
+    def __init__(self, app, repeat_threshold: int = QUERY_REPEAT_THRESHOLD):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            for shape, n in stats.repeated_shapes(self.repeat_threshold):
+                logger.warning(
+                    "Possible N+1 on %s: statement ran %d times: %s",
+                    stats.route, n, shape[:300],
+                )
@@ -0,0 +1,116 @@
+"""Slow-query log with captured query plans.
+
+Statements slower than SLOW_QUERY_MS are logged as one JSON line each (statement,
+parameters, duration, route and plan) and aggregated by statement shape so
+GET /admin/slow-queries can list the worst offenders. The plan comes from
+``EXPLAIN QUERY PLAN`` on SQLite and ``EXPLAIN`` elsewhere. It is captured once per
+shape, for SELECT (and WITH) statements only, on the raw DBAPI connection so it
+doesn't go back through the engine events. The EXPLAIN runs inside a savepoint: a
+failure is logged and rolled back to it, leaving the caller's transaction usable.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+logger = logging.getLogger("mediq.slow_queries")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_MAX_SHAPES = int(os.getenv("SLOW_QUERY_MAX_SHAPES", "200"))
+
+_EXPLAINABLE = ("select", "with")
+_SAVEPOINT = "slow_query_plan"
+_lock = threading.Lock()
+_shapes: dict = {}
+
+
+def _explain_prefix(dialect_name: str) -> str:
+    return "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+
+
+def _capture_plan(conn, statement: str, parameters) -> Optional[list]:
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return None
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            # A failed statement aborts the whole transaction on PostgreSQL
+            cursor.execute(f"SAVEPOINT {_SAVEPOINT}")
+            try:
+                cursor.execute(_explain_prefix(conn.dialect.name) + statement, parameters)
+                plan = [" | ".join(str(col) for col in row) for row in cursor.fetchall()]
+            except Exception:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+                raise
+            finally:
+                cursor.execute(f"RELEASE SAVEPOINT {_SAVEPOINT}")
+            return plan
+        finally:
+            cursor.close()
+    except Exception as e:
+        logger.warning("Could not capture the plan of a slow query: %s", statement[:200], exc_info=True)
+        # Stored, so the shape isn't explained again on every slow run
+        return [f"plan unavailable: {e}"]
+
+
+def record_if_slow(conn, statement: str, parameters, executemany: bool, duration: float,
+                   shape: str, route: Optional[str]) -> None:
+    duration_ms = duration * 1000
+    if duration_ms < SLOW_QUERY_MS:
+        return
+
+    with _lock:
+        entry = _shapes.get(shape)
+        needs_plan = entry is None or entry["plan"] is None
+    plan = _capture_plan(conn, statement, parameters) if needs_plan and not executemany else None
+
+    with _lock:
+        entry = _shapes.get(shape)
+        if entry is None:
+            if len(_shapes) >= SLOW_QUERY_MAX_SHAPES:
+                # Evict the shape that has cost the least so far
+                del _shapes[min(_shapes, key=lambda k: _shapes[k]["total_ms"])]
+            entry = _shapes[shape] = {
+                "shape": shape,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_route": None,
+                "last_parameters": None,
+                "plan": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["last_route"] = route
+        entry["last_parameters"] = repr(parameters)[:500]
+        if plan is not None:
+            entry["plan"] = plan
+        plan = entry["plan"]
+
+    logger.warning(json.dumps({
+        "event": "slow_query",
+        "duration_ms": round(duration_ms, 2),
+        "route": route,
+        "statement": statement,
+        "parameters": repr(parameters)[:500],
+        "plan": plan,
+    }))
+
+
+def worst_shapes(limit: int = 20, order_by: str = "total_ms") -> list:
+    with _lock:
+        entries = [dict(entry) for entry in _shapes.values()]
+    entries.sort(key=lambda entry: entry[order_by], reverse=True)
+    for entry in entries:
+        entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 2)
+        entry["total_ms"] = round(entry["total_ms"], 2)
+        entry["max_ms"] = round(entry["max_ms"], 2)
+        entry["full_scan"] = any("SCAN" in line and "USING" not in line for line in entry["plan"] or [])
+    return entries[:limit]
+
+
+def reset() -> None:
+    with _lock:
+        _shapes.clear()
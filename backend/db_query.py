@@ -1,7 +1,8 @@
 import os
 from urllib.parse import urlparse
 
-from databases.database import engine, Base, DATABASE_URL
+from databases.database import engine, DATABASE_URL
+from databases.migrations import run_migrations
 
 def delete_database():
     parsed = urlparse(DATABASE_URL)
@@ -34,7 +35,7 @@ def create_new_database():
     """Create new database with updated schema"""
     try:
         print("Creating new database with updated schema...")
-        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
         print("✅ New database created successfully!")
         return True
     except Exception as e:
@@ -1,9 +1,18 @@
+import logging
 import os
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
-from databases.database import Base, engine
-from Routes import medicine,order,customer,stock,user,invoice
+from databases.database import engine, async_engine, log_sqlite_settings
+from databases.migrations import run_migrations
+from databases.pool_metrics import pool_status, registered_pools
+from databases.query_stats import QueryStatsMiddleware
+from Routes import medicine,order,customer,stock,user,invoice,admin,export,report
+from Views.invoice_pdf import shutdown_pdf_pool
+from Views.overdue_sweeper import start_overdue_sweeper, stop_overdue_sweeper
+from Views.invoice_render import STATIC_DIR, warm_templates
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
@@ -11,6 +20,8 @@ from contextlib import asynccontextmanager
 # Load environment variables from .env if present (safe no-op in production)
 load_dotenv()
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
 
 def _cors_origins() -> list[str]:
     raw = os.getenv("CORS_ORIGINS", "").strip()
@@ -26,9 +37,16 @@ def _cors_origins() -> list[str]:
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    # Ensure DB tables exist (safe to run repeatedly)
-    Base.metadata.create_all(bind=engine)
+    # Bring the schema up to date (a single version lookup when already current)
+    run_migrations(engine)
+    log_sqlite_settings()
+    warm_templates()
+    start_overdue_sweeper()
     yield
+    await stop_overdue_sweeper()
+    shutdown_pdf_pool()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -38,18 +56,64 @@ app.add_middleware(
     allow_origins=_cors_origins(),
     allow_credentials=False,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "Server-Timing", "Idempotent-Replayed", "Link", "X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
+# Per-request SQL count/time headers and N+1 warnings
+app.add_middleware(QueryStatsMiddleware)
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static assets are linked with a content-hash query string, so they can be cached for good"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+
 
 @app.get("/health", tags=["Health"])
 def health():
     return {"status": "ok"}
 
+
+@app.get("/health/ready", tags=["Health"])
+def ready():
+    """Readiness probe: fails when the primary pool is exhausted or the DB is unreachable"""
+    pools = {name: pool_status(name) for name in registered_pools()}
+    primary = pools["primary"]
+
+    # Check saturation before pinging so a saturated worker answers immediately
+    # instead of queueing behind pool_timeout.
+    capacity = primary.get("capacity")
+    if capacity is not None and primary["in_use"] >= capacity:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "saturated", "database": "unknown", "pools": pools},
+        )
+
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "database": str(e), "pools": pools},
+        )
+
+    return {"status": "ready", "database": "ok", "pools": pools}
+
 # Include routes
 app.include_router(medicine.router, prefix="/medicines", tags=["Medicine"])
 app.include_router(order.router, prefix="/orders", tags=["Order"])
 app.include_router(customer.router, prefix="/customers", tags=["Customer"])
 app.include_router(stock.router, prefix="/stocks", tags=["Stock"])
 app.include_router(user.router, prefix="/users", tags=["User"])
-app.include_router(invoice.router, prefix="/invoices", tags=["Invoice"])
\ No newline at end of file
+app.include_router(invoice.router, prefix="/invoices", tags=["Invoice"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(export.router, prefix="/exports", tags=["Export"])
+app.include_router(report.router, prefix="/reports", tags=["Report"])
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""Recompute the daily_sales rollup from orders and invoices.
+
+Run after loading or fixing orders/invoices outside the API:
+    python rebuild_daily_sales.py
+"""
+from databases.database import engine
+from databases.migrations import run_migrations
+from Views.daily_sales import rebuild_daily_sales
+
+def main():
+    run_migrations(engine)
+    with engine.begin() as conn:
+        days = rebuild_daily_sales(conn)
+    print(f"✅ daily_sales rebuilt: {days} day(s)")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 import os
 from datetime import datetime, timedelta
 from sqlalchemy.orm import sessionmaker
-from databases.database import engine, Base, SessionLocal
+from databases.database import engine, SessionLocal
+from databases.migrations import run_migrations
 from Models.user import User
 from Models.customer import Customer
 from Models.medicine import Medicine
 from Models.stock import Stock
 from Models.order import Order, OrderMedicine, OrderStatus
 from Models.invoice import Invoice
+from Views.daily_sales import rebuild_daily_sales
+from Views.invoice_numbers import format_invoice_number, reserve_block
 import random
 import hashlib
 
@@ -17,7 +20,7 @@ def get_password_hash(password: str) -> str:
 
 def create_tables():
     """Create all database tables"""
-    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     print("Database tables created successfully!")
 
 def populate_users(db):
@@ -183,8 +186,13 @@ def populate_orders_and_invoices(db):
     users = db.query(User).all()
     
     order_statuses = [OrderStatus.PENDING, OrderStatus.COMPLETED, OrderStatus.CANCELLED]
+    order_count = 15
     
-    for i in range(15):  # Create 15 orders
+    # Reserve invoice numbers now, before this session starts writing
+    invoice_year = datetime.now().year
+    next_number, _ = reserve_block(engine, invoice_year, order_count)
+    
+    for i in range(order_count):  # Create 15 orders
         customer = random.choice(customers)
         order_date = datetime.now() - timedelta(days=random.randint(1, 30))
         
@@ -219,14 +227,14 @@ def populate_orders_and_invoices(db):
         # Create invoice for completed orders
         if order.status == OrderStatus.COMPLETED:
             from Models.invoice import InvoiceStatus
-            import uuid
             
             tax = total_amount * 0.18  # 18% GST
             discount = 0  # No discount for dummy data
             total_with_tax = total_amount - discount + tax
             
             # Generate invoice number
-            invoice_number = f"INV-{datetime.now().year}-{uuid.uuid4().hex[:8].upper()}"
+            invoice_number = format_invoice_number(invoice_year, next_number)
+            next_number += 1
             
             # Set due date (30 days from order date)
             due_date = order_date + timedelta(days=30)
@@ -250,6 +258,9 @@ def populate_orders_and_invoices(db):
             )
             db.add(invoice)
     
+    # The seed rows skip the views that keep the rollup current
+    db.flush()
+    rebuild_daily_sales(db)
     db.commit()
     print("Added orders and invoices to the database!")
 
@@ -0,0 +1,61 @@
+"""Point the app at a throwaway SQLite file before anything imports the engine."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="mediq-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_tmp, 'test.db').as_posix()}"
+# Enough connections for every test thread to hold one
+os.environ.setdefault("DB_POOL_SIZE", "20")
+os.environ.setdefault("DB_MAX_OVERFLOW", "20")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from databases.database import SessionLocal, engine  # noqa: E402
+from databases.migrations import run_migrations  # noqa: E402
+from Models.customer import Customer  # noqa: E402
+from Models.medicine import Medicine  # noqa: E402
+from Models.stock import Stock  # noqa: E402
+from Models.user import User  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    run_migrations(engine)
+    return engine
+
+
+@pytest.fixture
+def customer_id(db_engine) -> int:
+    with SessionLocal() as db:
+        customer = Customer(name="Test Customer")
+        db.add(customer)
+        db.commit()
+        return customer.id
+
+
+@pytest.fixture
+def stocked_medicine(db_engine):
+    """Factory for a new medicine with ``quantity`` units in stock; returns its id"""
+    def make(quantity: int, price: float = 10.0) -> int:
+        with SessionLocal() as db:
+            medicine = Medicine(name=f"Test Medicine {quantity}", price=price)
+            db.add(medicine)
+            db.flush()
+            db.add(Stock(medicine_id=medicine.id, quantity=quantity))
+            db.commit()
+            return medicine.id
+    return make
+
+
+@pytest.fixture
+def user_id(db_engine) -> int:
+    with SessionLocal() as db:
+        user = User(username=f"tester{os.urandom(4).hex()}", email=f"{os.urandom(4).hex()}@example.com",
+                    hashed_password="x")
+        db.add(user)
+        db.commit()
+        return user.id
@@ -0,0 +1,28 @@
+"""Invoice numbers handed out from many threads at once are unique and gap-free."""
+from concurrent.futures import ThreadPoolExecutor
+
+from Views.invoice_numbers import format_invoice_number, next_invoice_number, reserve_block
+
+THREADS = 16
+
+
+def test_reserved_blocks_never_overlap(db_engine):
+    year, size = 2091, 7
+    with ThreadPoolExecutor(THREADS) as pool:
+        blocks = list(pool.map(lambda _: reserve_block(db_engine, year, size), range(60)))
+
+    assert all(end - start == size for start, end in blocks)
+    # Sorted, each block starts where the previous one ended: no overlap, no gap
+    blocks.sort()
+    assert blocks[0][0] == 1
+    assert all(prev_end == start for (_, prev_end), (start, _) in zip(blocks, blocks[1:]))
+
+
+def test_next_invoice_number_is_unique_and_sequential(db_engine):
+    year, count = 2092, 500
+    with ThreadPoolExecutor(THREADS) as pool:
+        numbers = list(pool.map(lambda _: next_invoice_number(db_engine, year), range(count)))
+
+    assert len(set(numbers)) == count
+    # One process uses each block fully before reserving the next
+    assert sorted(numbers) == [format_invoice_number(year, n) for n in range(1, count + 1)]
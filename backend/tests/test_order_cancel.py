@@ -0,0 +1,76 @@
+"""Invoiced orders keep their stock and their place in the rollup: they can't be cancelled."""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from databases.database import SessionLocal
+from Models.daily_sales import DailySales
+from Models.order import Order, OrderStatus
+from Models.stock import Stock
+from Schemas.invoice import InvoiceCreate
+from Schemas.order import OrderCancel, OrderCreate, OrderUpdate
+from Views.invoice import create_invoice, mark_invoice_as_paid
+from Views.order import cancel_orders, create_order, delete_order, update_order
+
+
+def _paid_order(customer_id: int, user_id: int, medicine_id: int) -> int:
+    with SessionLocal() as db:
+        order = create_order(db, OrderCreate(
+            customer_id=customer_id, order_medicines=[{"medicine_id": medicine_id, "quantity": 4}],
+        ))
+        invoice = create_invoice(db, InvoiceCreate(order_id=order.id, amount=order.total_amount), user_id)
+        mark_invoice_as_paid(db, invoice.id)
+        return order.id
+
+
+def _state(order_id: int, medicine_id: int):
+    with SessionLocal() as db:
+        return (
+            db.scalar(select(Order.status).where(Order.id == order_id)),
+            db.scalar(select(Stock.quantity).where(Stock.medicine_id == medicine_id)),
+            db.execute(select(DailySales.order_count, DailySales.gross_amount, DailySales.paid_amount)
+                       .order_by(DailySales.day.desc())).first(),
+        )
+
+
+def test_cancel_orders_skips_invoiced_orders(customer_id, user_id, stocked_medicine):
+    medicine_id = stocked_medicine(10)
+    order_id = _paid_order(customer_id, user_id, medicine_id)
+    before = _state(order_id, medicine_id)
+
+    with SessionLocal() as db:
+        result = cancel_orders(db, OrderCancel(order_ids=[order_id]))
+
+    assert result == {"cancelled": [], "skipped": [order_id]}
+    assert before[0] == OrderStatus.COMPLETED
+    assert before[1] == 6
+    assert _state(order_id, medicine_id) == before
+
+
+def test_update_and_delete_refuse_invoiced_orders(customer_id, user_id, stocked_medicine):
+    medicine_id = stocked_medicine(10)
+    order_id = _paid_order(customer_id, user_id, medicine_id)
+    before = _state(order_id, medicine_id)
+
+    with SessionLocal() as db:
+        with pytest.raises(HTTPException) as cancelled:
+            update_order(db, order_id, OrderUpdate(status=OrderStatus.CANCELLED))
+    with SessionLocal() as db:
+        with pytest.raises(HTTPException) as deleted:
+            delete_order(db, order_id)
+
+    assert cancelled.value.status_code == 409
+    assert deleted.value.status_code == 409
+    assert _state(order_id, medicine_id) == before
+
+
+def test_pending_orders_still_cancel_and_restock(customer_id, stocked_medicine):
+    medicine_id = stocked_medicine(10)
+    with SessionLocal() as db:
+        order_id = create_order(db, OrderCreate(
+            customer_id=customer_id, order_medicines=[{"medicine_id": medicine_id, "quantity": 4}],
+        )).id
+        result = cancel_orders(db, OrderCancel(order_ids=[order_id]))
+
+    assert result == {"cancelled": [order_id], "skipped": []}
+    assert _state(order_id, medicine_id)[:2] == (OrderStatus.CANCELLED, 10)
@@ -0,0 +1,66 @@
+"""Concurrent orders against one SQLite file must never sell more than is in stock."""
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from databases.database import SessionLocal
+from Models.order import Order, OrderMedicine
+from Models.stock import Stock
+from Schemas.order import OrderCreate
+from Views.order import create_order
+
+THREADS = 16
+
+
+def _place(customer_id: int, items: list) -> str:
+    with SessionLocal() as db:
+        try:
+            create_order(db, OrderCreate(customer_id=customer_id, order_medicines=items))
+        except HTTPException as exc:
+            assert exc.status_code in (400, 409), exc.detail
+            return "short"
+    return "ok"
+
+
+def _stock(medicine_id: int) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(Stock.quantity).where(Stock.medicine_id == medicine_id))
+
+
+def _sold(medicine_id: int) -> int:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(func.coalesce(func.sum(OrderMedicine.quantity), 0))
+            .join(Order, Order.id == OrderMedicine.order_id)
+            .where(OrderMedicine.medicine_id == medicine_id)
+        )
+
+
+def test_concurrent_orders_never_oversell(customer_id, stocked_medicine):
+    medicine_id = stocked_medicine(25)
+    items = [{"medicine_id": medicine_id, "quantity": 1}]
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(lambda _: _place(customer_id, items), range(100)))
+
+    assert results.count("ok") == 25
+    assert results.count("short") == 75
+    assert _stock(medicine_id) == 0
+    assert _sold(medicine_id) == 25
+
+
+def test_multi_item_orders_take_all_or_nothing(customer_id, stocked_medicine):
+    plenty = stocked_medicine(1000)
+    scarce = stocked_medicine(10)
+    # Each order needs both; once the scarce one runs out the plentiful one must stay put
+    items = [{"medicine_id": plenty, "quantity": 3}, {"medicine_id": scarce, "quantity": 2}]
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(lambda _: _place(customer_id, items), range(40)))
+
+    assert results.count("ok") == 5
+    assert _stock(scarce) == 0
+    assert _sold(scarce) == 10
+    assert _stock(plenty) == 1000 - 5 * 3
+    assert _sold(plenty) == 5 * 3
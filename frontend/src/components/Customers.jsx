@@ -1,11 +1,15 @@
 import { useState, useEffect } from 'react';
 import { FaPlus, FaEdit, FaTrash, FaUsers, FaSearch, FaEye } from 'react-icons/fa';
 import ApiService from '../services/ApiService';
+import usePagedList from '../hooks/usePagedList';
 import CustomerModalForm from '../inputforms/CustomerModalForm';
 import Table from '../resuables/Table';
+import LoadMore from '../resuables/LoadMore';
 import SearchBar from '../resuables/SearchBar';
 import StatusMessages from '../resuables/StatusMessages';
 
+const fetchCustomerPage = (page) => ApiService.getCustomers(page);
+
 const Customers = () => {
   const [customers, setCustomers] = useState([]);
   const [filteredCustomers, setFilteredCustomers] = useState([]);
@@ -13,6 +17,7 @@ const Customers = () => {
   const [showModal, setShowModal] = useState(false);
   const [selectedCustomer, setSelectedCustomer] = useState(null);
   const [message, setMessage] = useState({ type: '', text: '' });
+  const { firstPage, nextPage, hasMore, isLoadingMore } = usePagedList(fetchCustomerPage);
 
   useEffect(() => {
     fetchCustomers();
@@ -21,7 +26,7 @@ const Customers = () => {
   const fetchCustomers = async (showLoading = true) => {
     try {
       if (showLoading) setLoading(true);
-      const data = await ApiService.getCustomers();
+      const data = await firstPage();
       setCustomers(data);
       setFilteredCustomers(data);
     } catch (error) {
@@ -31,6 +36,16 @@ const Customers = () => {
     }
   };
 
+  const loadMoreCustomers = async () => {
+    try {
+      const data = [...customers, ...(await nextPage())];
+      setCustomers(data);
+      setFilteredCustomers(data);
+    } catch (error) {
+      setMessage({ type: 'error', text: 'Failed to fetch customers' });
+    }
+  };
+
   const handleSearch = (searchTerm) => {
     const filtered = customers.filter(customer =>
       customer.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -193,7 +208,7 @@ const Customers = () => {
       <div className="bg-white border border-gray-200 rounded-md">
         <div className="p-6 border-b border-gray-200">
           <h2 className="text-lg font-semibold text-gray-900">
-            All Customers ({filteredCustomers.length})
+            All Customers ({filteredCustomers.length}{hasMore ? '+' : ''})
           </h2>
         </div>
         
@@ -208,6 +223,9 @@ const Customers = () => {
             emptyMessage="No customers found. Add your first customer to get started."
           />
         )}
+        {!loading && (
+          <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMoreCustomers} />
+        )}
       </div>
 
       {/* Modal */}
@@ -29,30 +29,32 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      // Fetch statistics
-      const [medicines, customers, orders, stocks] = await Promise.all([
-        ApiService.getMedicines(),
-        ApiService.getCustomers(),
-        ApiService.getOrders(),
-        ApiService.getStocks()
+      // Counts come from the list endpoints' X-Total-Count; only stock is loaded in
+      // full, to find the low items
+      const [medicines, customers, orders, stocks, revenue] = await Promise.all([
+        ApiService.getMedicines({ limit: 1, include_total: true }),
+        ApiService.getCustomers({ limit: 1, include_total: true }),
+        ApiService.getOrders({ limit: 5, newest_first: true, include_total: true }),
+        ApiService.getAllStocks(),
+        ApiService.getRevenueReport({ bucket: 'month' })
       ]);
 
-      // Calculate total revenue from orders
-      const totalRevenue = orders.reduce((sum, order) => sum + order.total_amount, 0);
+      // Order value of all non-cancelled orders, from the server's daily rollup
+      const totalRevenue = revenue.total.gross_amount;
 
       // Find low stock items (quantity < 10)
       const lowStock = stocks.filter(stock => stock.quantity < 10);
 
       setStats({
-        medicines: medicines.length,
-        customers: customers.length,
-        orders: orders.length,
+        medicines: medicines.total,
+        customers: customers.total,
+        orders: orders.total,
         totalRevenue: totalRevenue,
         lowStockItems: lowStock.length
       });
 
       // Set recent orders (last 5)
-      setRecentOrders(orders.slice(-5).reverse());
+      setRecentOrders(orders.items);
       setLowStockMedicines(lowStock.slice(0, 5));
 
     } catch (error) {
@@ -23,8 +23,8 @@ const Inventory = () => {
     try {
       if (showLoading) setLoading(true);
       const [stocksData, medicinesData] = await Promise.all([
-        ApiService.getStocks(),
-        ApiService.getMedicines()
+        ApiService.getAllStocks(),
+        ApiService.getAllMedicines()
       ]);
 
       // Create a medicine lookup map
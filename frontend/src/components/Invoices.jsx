@@ -1,18 +1,24 @@
 import { useState, useEffect } from 'react';
 import { FaPlus, FaEdit, FaTrash, FaFileInvoice, FaSearch, FaEye, FaPrint, FaMoneyCheckAlt, FaExclamationTriangle, FaDownload } from 'react-icons/fa';
 import ApiService from '../services/ApiService';
+import usePagedList from '../hooks/usePagedList';
 import Table from '../resuables/Table';
+import LoadMore from '../resuables/LoadMore';
 import SearchBar from '../resuables/SearchBar';
 import StatusMessages from '../resuables/StatusMessages';
 import InvoiceModalForm from '../inputforms/InvoiceModalForm';
 import { formatCurrency } from '../utils/currency';
 
+const fetchInvoicePage = (page) => ApiService.getInvoices(page);
+
 const Invoices = () => {
   const [invoices, setInvoices] = useState([]);
+  const [stats, setStats] = useState(null);
   const [filteredInvoices, setFilteredInvoices] = useState([]);
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
   const [message, setMessage] = useState({ type: '', text: '' });
+  const { firstPage, nextPage, hasMore, isLoadingMore } = usePagedList(fetchInvoicePage);
   const [showModal, setShowModal] = useState(false);
   const [editingInvoice, setEditingInvoice] = useState(null);
   const [statusFilter, setStatusFilter] = useState('all');
@@ -25,8 +31,9 @@ const Invoices = () => {
   const fetchInvoices = async (showLoading = true) => {
     try {
       if (showLoading) setLoading(true);
-      const data = await ApiService.getInvoices();
+      const [data, summary] = await Promise.all([firstPage(), ApiService.getInvoiceStats()]);
       setInvoices(data);
+      setStats(summary);
       applyFilters(data);
     } catch (error) {
       setMessage({ type: 'error', text: 'Failed to fetch invoices' });
@@ -35,9 +42,20 @@ const Invoices = () => {
     }
   };
 
+  const loadMoreInvoices = async () => {
+    try {
+      const data = [...invoices, ...(await nextPage())];
+      setInvoices(data);
+      applyFilters(data);
+    } catch (error) {
+      setMessage({ type: 'error', text: 'Failed to fetch invoices' });
+    }
+  };
+
+  // The invoice form picks from every order, so this one loads the whole list
   const fetchOrders = async () => {
     try {
-      const data = await ApiService.getOrders();
+      const data = await ApiService.getAllOrders();
       setOrders(data);
     } catch (error) {
       console.error('Failed to fetch orders:', error);
@@ -137,6 +155,25 @@ const Invoices = () => {
     }
   };
 
+  const handlePrintAll = async () => {
+    if (filteredInvoices.length === 0) return;
+    try {
+      const htmlContent = await ApiService.getInvoiceBatchHTML({
+        invoice_ids: filteredInvoices.map(inv => inv.id),
+      });
+      const printWindow = window.open('', '_blank', 'width=800,height=600');
+      printWindow.document.write(htmlContent);
+      printWindow.document.close();
+
+      // Trigger print after a short delay
+      setTimeout(() => {
+        printWindow.print();
+      }, 500);
+    } catch (error) {
+      setMessage({ type: 'error', text: 'Failed to print invoices' });
+    }
+  };
+
   const handleMarkAsPaid = async (invoice) => {
     if (window.confirm(`Mark invoice #${invoice.invoice_number} as paid?`)) {
       try {
@@ -289,21 +326,20 @@ const Invoices = () => {
     }
   ];
 
-  // Calculate stats
-  const totalInvoices = invoices.length;
-  const totalRevenue = invoices.filter(inv => inv.status === 'paid')
-    .reduce((sum, inv) => sum + parseFloat(inv.total_amount), 0);
-  const pendingAmount = invoices.filter(inv => inv.status === 'sent')
-    .reduce((sum, inv) => sum + parseFloat(inv.total_amount), 0);
-  const overdueInvoices = invoices.filter(inv => isOverdue(inv)).length;
-  const paidInvoices = invoices.filter(inv => inv.status === 'paid').length;
+  // Summary figures come from GET /invoices/stats (one grouped query on the server)
+  const statusTotals = (status) => stats?.by_status.find(entry => entry.status === status) ?? { count: 0, total_amount: 0 };
+  const totalInvoices = stats?.count ?? 0;
+  const totalRevenue = statusTotals('paid').total_amount;
+  const pendingAmount = statusTotals('sent').total_amount;
+  const overdueInvoices = stats?.overdue_count ?? 0;
+  const paidInvoices = statusTotals('paid').count;
 
   const statusOptions = [
     { value: 'all', label: 'All Invoices', count: totalInvoices },
-    { value: 'sent', label: 'Sent', count: invoices.filter(inv => inv.status === 'sent').length },
+    { value: 'sent', label: 'Sent', count: statusTotals('sent').count },
     { value: 'paid', label: 'Paid', count: paidInvoices },
     { value: 'overdue', label: 'Overdue', count: overdueInvoices },
-    { value: 'draft', label: 'Draft', count: invoices.filter(inv => inv.status === 'draft').length },
+    { value: 'draft', label: 'Draft', count: statusTotals('draft').count },
   ];
 
   return (
@@ -317,13 +353,23 @@ const Invoices = () => {
           </h1>
           <p className="text-gray-600 mt-1">Manage and track all invoices</p>
         </div>
-        <button
-          onClick={handleCreateInvoice}
-          className="bg-blue-600 text-white px-4 py-2 rounded-lg hover:bg-blue-700 transition-colors flex items-center"
-        >
-          <FaPlus className="mr-2" />
-          Create Invoice
-        </button>
+        <div className="flex items-center space-x-3">
+          <button
+            onClick={handlePrintAll}
+            disabled={filteredInvoices.length === 0}
+            className="bg-white text-gray-700 border border-gray-300 px-4 py-2 rounded-lg hover:bg-gray-50 transition-colors flex items-center disabled:opacity-50"
+          >
+            <FaPrint className="mr-2" />
+            Print List
+          </button>
+          <button
+            onClick={handleCreateInvoice}
+            className="bg-blue-600 text-white px-4 py-2 rounded-lg hover:bg-blue-700 transition-colors flex items-center"
+          >
+            <FaPlus className="mr-2" />
+            Create Invoice
+          </button>
+        </div>
       </div>
 
       {/* Status Messages */}
@@ -410,7 +456,7 @@ const Invoices = () => {
         <div className="p-6 border-b border-gray-200">
           <h2 className="text-lg font-semibold text-gray-900">
             {statusFilter === 'all' ? 'All Invoices' : `${statusOptions.find(opt => opt.value === statusFilter)?.label} Invoices`}
-            ({filteredInvoices.length})
+            ({filteredInvoices.length}{hasMore ? '+' : ''})
           </h2>
         </div>
 
@@ -429,6 +475,9 @@ const Invoices = () => {
             }
           />
         )}
+        {!loading && (
+          <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMoreInvoices} />
+        )}
       </div>
 
       {/* Invoice Modal */}
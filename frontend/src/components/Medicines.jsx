@@ -1,12 +1,16 @@
 import { useState, useEffect } from 'react';
 import { FaPlus, FaEdit, FaTrash, FaPills, FaSearch } from 'react-icons/fa';
 import ApiService from '../services/ApiService';
+import usePagedList from '../hooks/usePagedList';
 import MedicineModalForm from '../inputforms/MedicineModalForm';
 import Table from '../resuables/Table';
+import LoadMore from '../resuables/LoadMore';
 import SearchBar from '../resuables/SearchBar';
 import StatusMessages from '../resuables/StatusMessages';
 import { formatCurrency } from '../utils/currency';
 
+const fetchMedicinePage = (page) => ApiService.getMedicines(page);
+
 const Medicines = () => {
   const [medicines, setMedicines] = useState([]);
   const [filteredMedicines, setFilteredMedicines] = useState([]);
@@ -14,6 +18,7 @@ const Medicines = () => {
   const [showModal, setShowModal] = useState(false);
   const [selectedMedicine, setSelectedMedicine] = useState(null);
   const [message, setMessage] = useState({ type: '', text: '' });
+  const { firstPage, nextPage, hasMore, isLoadingMore } = usePagedList(fetchMedicinePage);
 
   useEffect(() => {
     fetchMedicines();
@@ -22,7 +27,7 @@ const Medicines = () => {
   const fetchMedicines = async (showLoading = true) => {
     try {
       if (showLoading) setLoading(true);
-      const data = await ApiService.getMedicines();
+      const data = await firstPage();
       setMedicines(data);
       setFilteredMedicines(data);
     } catch (error) {
@@ -32,6 +37,16 @@ const Medicines = () => {
     }
   };
 
+  const loadMoreMedicines = async () => {
+    try {
+      const data = [...medicines, ...(await nextPage())];
+      setMedicines(data);
+      setFilteredMedicines(data);
+    } catch (error) {
+      setMessage({ type: 'error', text: 'Failed to fetch medicines' });
+    }
+  };
+
   const handleSearch = (searchTerm) => {
     const filtered = medicines.filter(medicine =>
       medicine.name.toLowerCase().includes(searchTerm.toLowerCase())
@@ -162,7 +177,7 @@ const Medicines = () => {
       <div className="bg-white border border-gray-200 rounded-md">
         <div className="p-6 border-b border-gray-200">
           <h2 className="text-lg font-semibold text-gray-900">
-            All Medicines ({filteredMedicines.length})
+            All Medicines ({filteredMedicines.length}{hasMore ? '+' : ''})
           </h2>
         </div>
 
@@ -177,6 +192,9 @@ const Medicines = () => {
             emptyMessage="No medicines found. Add your first medicine to get started."
           />
         )}
+        {!loading && (
+          <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMoreMedicines} />
+        )}
       </div>
 
       {/* Modal */}
@@ -1,12 +1,16 @@
 import { useState, useEffect } from 'react';
 import { FaPlus, FaEdit, FaTrash, FaShoppingCart, FaSearch, FaEye } from 'react-icons/fa';
 import ApiService from '../services/ApiService';
+import usePagedList from '../hooks/usePagedList';
 import OrderModalForm from '../inputforms/OrderModalForm';
 import Table from '../resuables/Table';
+import LoadMore from '../resuables/LoadMore';
 import SearchBar from '../resuables/SearchBar';
 import StatusMessages from '../resuables/StatusMessages';
 import { formatCurrency } from '../utils/currency';
 
+const fetchOrderPage = (page) => ApiService.getOrders(page);
+
 const Orders = () => {
   const [orders, setOrders] = useState([]);
   const [filteredOrders, setFilteredOrders] = useState([]);
@@ -14,6 +18,7 @@ const Orders = () => {
   const [showModal, setShowModal] = useState(false);
   const [selectedOrder, setSelectedOrder] = useState(null);
   const [message, setMessage] = useState({ type: '', text: '' });
+  const { firstPage, nextPage, hasMore, isLoadingMore } = usePagedList(fetchOrderPage);
 
   useEffect(() => {
     fetchOrders();
@@ -22,7 +27,7 @@ const Orders = () => {
   const fetchOrders = async (showLoading = true) => {
     try {
       if (showLoading) setLoading(true);
-      const data = await ApiService.getOrders();
+      const data = await firstPage();
       setOrders(data);
       setFilteredOrders(data);
     } catch (error) {
@@ -32,6 +37,16 @@ const Orders = () => {
     }
   };
 
+  const loadMoreOrders = async () => {
+    try {
+      const data = [...orders, ...(await nextPage())];
+      setOrders(data);
+      setFilteredOrders(data);
+    } catch (error) {
+      setMessage({ type: 'error', text: 'Failed to fetch orders' });
+    }
+  };
+
   const handleSearch = (searchTerm) => {
     const filtered = orders.filter(order =>
       order.id.toString().includes(searchTerm) ||
@@ -195,7 +210,7 @@ const Orders = () => {
       <div className="bg-white border border-gray-200 rounded-md">
         <div className="p-6 border-b border-gray-200">
           <h2 className="text-lg font-semibold text-gray-900">
-            All Orders ({filteredOrders.length})
+            All Orders ({filteredOrders.length}{hasMore ? '+' : ''})
           </h2>
         </div>
 
@@ -210,6 +225,9 @@ const Orders = () => {
             emptyMessage="No orders found. Create your first order to get started."
           />
         )}
+        {!loading && (
+          <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMoreOrders} />
+        )}
       </div>
 
       {/* Modal */}
@@ -5,6 +5,7 @@ import Toolbar from "../resuables/Toolbar";
 import Table from "../resuables/Table";
 import UserModalForm from "../inputforms/UserModalForm";
 import StatusMessages from "../resuables/StatusMessages";
+import LoadMore from "../resuables/LoadMore";
 import { FaEdit, FaTrash } from "react-icons/fa";
 
 import useAdminCRUD from "../hooks/useAdminCRUD";
@@ -78,6 +79,9 @@ const Users = () => {
     error: apiError,
     success,
     fetchAll,
+    loadMore,
+    hasMore,
+    isLoadingMore,
     createItem,
     updateItem,
     deleteItem,
@@ -185,6 +189,7 @@ const Users = () => {
         onDelete={handleDelete}
         isLoading={isLoading}
       />
+      <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMore} />
 
       <UserModalForm
         isOpen={!!editingUser || isCreating}
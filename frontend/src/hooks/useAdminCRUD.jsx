@@ -1,31 +1,61 @@
 import { useState, useCallback, useEffect } from "react";
 
+// Rows per request; the list endpoints page with a cursor (X-Next-Cursor)
+const PAGE_SIZE = 100;
+
 const useAdminCRUD = (endpoint) => {
   const [data, setData] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState(null);
   const [success, setSuccess] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  const fetchPage = useCallback(async (after = null) => {
+    const query = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (after) query.set('after', after);
+    const response = await fetch(`${endpoint}?${query}`);
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || "Failed to fetch data");
+    }
+    return { items: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
+  }, [endpoint]);
 
+  // Reloads from the first page; loadMore appends the pages after it
   const fetchAll = useCallback(async () => {
     setIsLoading(true);
     setError(null);
     setSuccess(null);
     try {
-      const response = await fetch(endpoint);
-      if (!response.ok) {
-        const errorData = await response.json();
-        throw new Error(errorData.detail || "Failed to fetch data");
-      }
-      const result = await response.json();
-      setData(result);
-      return result;
+      const page = await fetchPage();
+      setData(page.items);
+      setNextCursor(page.nextCursor);
+      return page.items;
     } catch (err) {
       setError(err.message);
       throw err;
     } finally {
       setIsLoading(false);
     }
-  }, [endpoint]);
+  }, [fetchPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return [];
+    setIsLoadingMore(true);
+    setError(null);
+    try {
+      const page = await fetchPage(nextCursor);
+      setData(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+      return page.items;
+    } catch (err) {
+      setError(err.message);
+      return [];
+    } finally {
+      setIsLoadingMore(false);
+    }
+  }, [fetchPage, nextCursor]);
 
   useEffect(() => {
     fetchAll();
@@ -125,6 +155,9 @@ const useAdminCRUD = (endpoint) => {
     error,
     success,
     fetchAll,
+    loadMore,
+    hasMore: Boolean(nextCursor),
+    isLoadingMore,
     createItem,
     updateItem,
     deleteItem,
@@ -0,0 +1,30 @@
+import { useState, useCallback } from "react";
+
+// Cursor paging for a list screen. fetchPage is an ApiService list getter (e.g.
+// getOrders) and must be stable; the screen keeps the rows in its own state.
+const usePagedList = (fetchPage, pageSize = 100) => {
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  const firstPage = useCallback(async () => {
+    const page = await fetchPage({ limit: pageSize });
+    setNextCursor(page.nextCursor);
+    return page.items;
+  }, [fetchPage, pageSize]);
+
+  const nextPage = useCallback(async () => {
+    if (!nextCursor) return [];
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage({ limit: pageSize, after: nextCursor });
+      setNextCursor(page.nextCursor);
+      return page.items;
+    } finally {
+      setIsLoadingMore(false);
+    }
+  }, [fetchPage, pageSize, nextCursor]);
+
+  return { firstPage, nextPage, hasMore: Boolean(nextCursor), isLoadingMore };
+};
+
+export default usePagedList;
@@ -30,8 +30,8 @@ const OrderModalForm = ({ order, onSubmit, onClose }) => {
   const fetchCustomersAndMedicines = async () => {
     try {
       const [customersData, medicinesData] = await Promise.all([
-        ApiService.getCustomers(),
-        ApiService.getMedicines()
+        ApiService.getAllCustomers(),
+        ApiService.getAllMedicines()
       ]);
       setCustomers(customersData);
       setMedicines(medicinesData);
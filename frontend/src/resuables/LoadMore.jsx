@@ -0,0 +1,17 @@
+const LoadMore = ({ hasMore, isLoading, onClick }) => {
+  if (!hasMore) return null;
+
+  return (
+    <div className="flex justify-center p-4 border-t border-gray-200">
+      <button
+        onClick={onClick}
+        disabled={isLoading}
+        className="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-lg hover:bg-gray-50 disabled:opacity-50 transition-colors"
+      >
+        {isLoading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMore;
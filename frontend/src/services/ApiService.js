@@ -30,9 +30,45 @@ class ApiService {
     }
   }
 
+  // List endpoints are cursor-paginated. One call fetches one page: its rows, the
+  // cursor for the next page (null on the last one) and, with include_total, the
+  // approximate row count.
+  static async requestPage(endpoint, { limit = 100, after = null, ...params } = {}) {
+    const query = new URLSearchParams({ limit: String(limit), ...params });
+    if (after) query.set('after', after);
+    const response = await fetch(`${API_BASE_URL}${endpoint}?${query}`);
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+    }
+    const total = response.headers.get('X-Total-Count');
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+      total: total === null ? null : Number(total),
+    };
+  }
+
+  // Follows the cursor through every page. Only for pickers and screens that need
+  // the whole table; lists page with requestPage and load more on demand.
+  static async requestAllPages(endpoint, pageSize = 500) {
+    const items = [];
+    let after = null;
+    do {
+      const page = await this.requestPage(endpoint, { limit: pageSize, after });
+      items.push(...page.items);
+      after = page.nextCursor;
+    } while (after);
+    return items;
+  }
+
   // Medicines
-  static async getMedicines() {
-    return this.request('/medicines');
+  static async getMedicines(page = {}) {
+    return this.requestPage('/medicines', page);
+  }
+
+  static async getAllMedicines() {
+    return this.requestAllPages('/medicines');
   }
 
   static async getMedicineById(id) {
@@ -60,8 +96,12 @@ class ApiService {
   }
 
   // Customers
-  static async getCustomers() {
-    return this.request('/customers');
+  static async getCustomers(page = {}) {
+    return this.requestPage('/customers', page);
+  }
+
+  static async getAllCustomers() {
+    return this.requestAllPages('/customers');
   }
 
   static async getCustomerById(id) {
@@ -89,8 +129,12 @@ class ApiService {
   }
 
   // Orders
-  static async getOrders() {
-    return this.request('/orders');
+  static async getOrders(page = {}) {
+    return this.requestPage('/orders', page);
+  }
+
+  static async getAllOrders() {
+    return this.requestAllPages('/orders');
   }
 
   static async getOrderById(id) {
@@ -118,8 +162,12 @@ class ApiService {
   }
 
   // Stocks
-  static async getStocks() {
-    return this.request('/stocks');
+  static async getStocks(page = {}) {
+    return this.requestPage('/stocks', page);
+  }
+
+  static async getAllStocks() {
+    return this.requestAllPages('/stocks');
   }
 
   static async getStockById(id) {
@@ -151,8 +199,12 @@ class ApiService {
   }
 
   // Invoices
-  static async getInvoices() {
-    return this.request('/invoices');
+  static async getInvoices(page = {}) {
+    return this.requestPage('/invoices', page);
+  }
+
+  static async getAllInvoices() {
+    return this.requestAllPages('/invoices');
   }
 
   static async getInvoiceById(id) {
@@ -176,6 +228,27 @@ class ApiService {
     return await response.text();
   }
 
+  // One printable document for many invoices: { invoice_ids } and/or { created_from, created_to, status }
+  static async getInvoiceBatchHTML(selection) {
+    const url = `${API_BASE_URL}/invoices/print-batch`;
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ ...selection, format: 'html' }),
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return await response.text();
+  }
+
+  // Counts and amounts per status; range is optional { created_from, created_to } (YYYY-MM-DD)
+  static async getInvoiceStats(range = {}) {
+    const params = new URLSearchParams(Object.entries(range).filter(([, value]) => value));
+    const query = params.toString();
+    return this.request(`/invoices/stats${query ? `?${query}` : ''}`);
+  }
+
   static async getOverdueInvoices() {
     return this.request('/invoices/overdue');
   }
@@ -206,9 +279,20 @@ class ApiService {
     });
   }
 
+  // Reports
+  // Per-period totals from the daily_sales rollup: { from, to } as YYYY-MM-DD, bucket 'day' | 'week' | 'month'
+  static async getRevenueReport(params = {}) {
+    const query = new URLSearchParams(Object.entries(params).filter(([, value]) => value)).toString();
+    return this.request(`/reports/revenue${query ? `?${query}` : ''}`);
+  }
+
   // Users
-  static async getUsers() {
-    return this.request('/users');
+  static async getUsers(page = {}) {
+    return this.requestPage('/users', page);
+  }
+
+  static async getAllUsers() {
+    return this.requestAllPages('/users');
   }
 
   static async getUserById(id) {